@@ -0,0 +1,250 @@
+"""Benchmarks of the Intcode engines and day solutions.
+
+    python benchmark.py run [--output benchmark.json] [--repeat 3] [--only boost]
+    python benchmark.py compare benchmark_baseline.json benchmark.json [--tolerance 0.1]
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import pathlib
+import platform
+import sys
+import time
+import tracemalloc
+import typing as t
+
+from intcode import Intcode, Tracer
+from intcode_compiler import CompiledIntcode
+from intcode_acceleration import AcceleratingIntcode
+from intcode_fusion import FusingIntcode
+from intcode_int64 import Int64Intcode
+import solution_02
+import solution_13
+
+DEFAULT_OUTPUT = 'benchmark.json'
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_TOLERANCE = 0.1
+
+# differences below these are noise, whatever their relative size:
+NOISE_FLOORS = {'wall_time': 0.01, 'peak_memory': 16 * 1024}
+
+# engines are timed with tracing disabled, it is only enabled to count instructions:
+ENGINES = (Intcode, Int64Intcode, FusingIntcode, AcceleratingIntcode, CompiledIntcode)
+
+
+class CountingTracer(Tracer):
+    """Counts executed instructions."""
+
+    enabled = True
+
+    def __init__(self):
+        self.count = 0
+
+    def reset(self):
+        pass
+
+    def record(self, address, relative_base, decoded, operands, result):
+        self.count += 1
+
+
+class Workload(t.NamedTuple):
+    name: str
+    run: t.Callable[[], None]
+    count_instructions: t.Callable[[], int]
+
+
+def countdown_program(n: int) -> t.List[int]:
+    """Decrements a counter from n to 0, outputs nothing."""
+    return [
+        1101, n, 0, 100,  # mem[100] = n
+        1001, 100, -1, 100,  # mem[100] -= 1
+        1005, 100, 4,  # loop while mem[100]
+        99,
+    ]
+
+
+def sum_of_squares_program(n: int) -> t.List[int]:
+    """Outputs the sum of the squares of 1..n, kept in relative memory."""
+    return [
+        109, 100,  # relative base = 100
+        21101, n, 0, 0,  # /0/ = n
+        21101, 0, 0, 1,  # /1/ = 0
+        22202, 0, 0, 2,  # /2/ = /0/ * /0/
+        22201, 1, 2, 1,  # /1/ += /2/
+        21201, 0, -1, 0,  # /0/ -= 1
+        1205, 0, 10,  # loop while /0/
+        204, 1,  # output /1/
+        99,
+    ]
+
+
+def _run_program(engine: t.Type[Intcode], program: t.List[int], inputs=(), tracer: Tracer = None):
+    computer = engine(*program)
+    computer.tracer = tracer or Tracer()
+    computer.run(inputs)
+
+
+def _play_arcade(engine: t.Type[Intcode], tracer: Tracer = None):
+    arcade = engine.from_file('input_13.txt')
+    arcade.program[0] = 2
+    arcade.tracer = tracer or Tracer()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution_13.Player().play(arcade)
+
+
+def _sweep_day_2():
+    program = solution_02.load_program()
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution_02.brute_force(program, 19690720)
+
+
+def _count_sweep_day_2() -> int:
+    program = solution_02.load_program()
+    tracer = CountingTracer()
+    for noun in range(100):
+        for verb in range(100):
+            computer = Intcode(*program)
+            computer.program[1:3] = noun, verb
+            computer.tracer = tracer
+            computer.stack_trace_on_error = False
+            try:
+                computer.run()
+            except ValueError:
+                pass
+    return tracer.count
+
+
+def _counted(run: t.Callable[..., None]) -> int:
+    tracer = CountingTracer()
+    run(tracer=tracer)
+    return tracer.count
+
+
+def workloads() -> t.List[Workload]:
+    result = []
+
+    for engine in ENGINES:
+        programs = {
+            'boost_part_2': (Intcode.from_file('input_09.txt').program, [2]),
+            'countdown_100k': (countdown_program(100_000), []),
+            'sum_of_squares_50k': (sum_of_squares_program(50_000), []),
+        }
+        for name, (program, inputs) in programs.items():
+            run = functools.partial(_run_program, engine, program, inputs)
+            result.append(Workload(f'{name}[{engine.__name__}]', run, functools.partial(_counted, run)))
+
+        arcade = functools.partial(_play_arcade, engine)
+        result.append(Workload(f'arcade_game[{engine.__name__}]', arcade, functools.partial(_counted, arcade)))
+
+    result.append(Workload('day_2_sweep[batch]', _sweep_day_2, _count_sweep_day_2))
+    return result
+
+
+def measure(workload: Workload, repeat: int) -> t.Dict[str, float]:
+    instructions = workload.count_instructions()
+
+    wall_time = min(_timed(workload.run) for _ in range(repeat))
+
+    tracemalloc.start()
+    try:
+        workload.run()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'instructions': instructions,
+        'wall_time': wall_time,
+        'instructions_per_second': instructions / wall_time,
+        'peak_memory': peak_memory,
+    }
+
+
+def _timed(run: t.Callable[[], None]) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def run_benchmarks(repeat: int, only: str = None) -> t.Dict[str, t.Any]:
+    results = {}
+
+    for workload in workloads():
+        if only and only not in workload.name:
+            continue
+
+        results[workload.name] = measurement = measure(workload, repeat)
+        print(
+            f'{workload.name:40} {measurement["wall_time"]:8.3f} s '
+            f'{measurement["instructions_per_second"]:12,.0f} instr/s '
+            f'{measurement["peak_memory"] / 1024:10,.0f} KiB'
+        )
+
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(
+        baseline: t.Dict[str, t.Any], current: t.Dict[str, t.Any], tolerance: float = DEFAULT_TOLERANCE
+) -> t.List[str]:
+    """Descriptions of workloads slower or using more memory than in baseline, beyond tolerance.
+
+    Differences must exceed NOISE_FLOORS as well, so short workloads are not flagged by noise.
+    Workloads missing from baseline are reported as well, they need a baseline recorded first.
+    """
+    regressions = []
+
+    for name, measurement in current['results'].items():
+        reference = baseline['results'].get(name)
+        if not reference:
+            regressions.append(f'{name}: missing from baseline')
+            continue
+
+        for key in ('wall_time', 'peak_memory'):
+            difference = measurement[key] - reference[key]
+            if difference > reference[key] * tolerance and difference > NOISE_FLOORS[key]:
+                change = measurement[key] / reference[key] - 1
+                regressions.append(f'{name}: {key} {reference[key]:.4g} -> {measurement[key]:.4g} (+{change:.0%})')
+
+    return regressions
+
+
+def main(args: t.List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks of the Intcode engines and day solutions.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run benchmarks and write results as JSON')
+    run_parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    run_parser.add_argument('--repeat', type=int, default=3, help='timed runs per workload, best one counts')
+    run_parser.add_argument('--only', help='run only workloads containing this text')
+
+    compare_parser = commands.add_parser('compare', help='flag regressions against a baseline')
+    compare_parser.add_argument('baseline', nargs='?', default=DEFAULT_BASELINE)
+    compare_parser.add_argument('results', nargs='?', default=DEFAULT_OUTPUT)
+    compare_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+
+    arguments = parser.parse_args(args)
+
+    if arguments.command == 'run':
+        results = run_benchmarks(arguments.repeat, arguments.only)
+        pathlib.Path(arguments.output).write_text(json.dumps(results, indent=2))
+        return 0
+
+    baseline = json.loads(pathlib.Path(arguments.baseline).read_text())
+    results = json.loads(pathlib.Path(arguments.results).read_text())
+    regressions = compare(baseline, results, arguments.tolerance)
+    for regression in regressions:
+        print('REGRESSION', regression)
+    if not regressions:
+        print('No regressions.')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Breadth first flood fill over rectangular maps stored one byte per cell."""
+import array
+import typing as t
+
+# distance of cells not reached by a fill:
+UNREACHED = -1
+
+Position = t.Tuple[int, int]
+
+
+class Grid:
+    """Rectangular map of ASCII characters, stored row by row in a bytearray."""
+
+    def __init__(self, width: int, height: int, cells: bytearray = None):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(b' ' * (width * height)) if cells is None else cells
+
+        if len(self.cells) != width * height:
+            raise ValueError('cells do not match size of grid', width, height, len(self.cells))
+
+    @classmethod
+    def from_rows(cls, rows: t.Sequence[str]) -> 'Grid':
+        width = max((len(row) for row in rows), default=0)
+        cells = bytearray(''.join(row.ljust(width) for row in rows).encode('ascii'))
+        return cls(width, len(rows), cells)
+
+    def __getitem__(self, position: Position) -> str:
+        return chr(self.cells[self.index(position)])
+
+    def __setitem__(self, position: Position, char: str):
+        self.cells[self.index(position)] = ord(char)
+
+    def index(self, position: Position) -> int:
+        x, y = position
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError('position outside of grid', position)
+        return y * self.width + x
+
+    def position(self, index: int) -> Position:
+        y, x = divmod(index, self.width)
+        return x, y
+
+    def find(self, char: str) -> t.List[Position]:
+        """Positions of all cells holding char, row by row."""
+        code = ord(char)
+        found = []
+        index = self.cells.find(code)
+        while index >= 0:
+            found.append(self.position(index))
+            index = self.cells.find(code, index + 1)
+        return found
+
+    def render(self, fill: 'Fill' = None, filled: str = 'O', until: int = None) -> str:
+        """Map as text, with cells a fill reached (up to distance until) shown as filled."""
+        cells = bytearray(self.cells)
+        if fill is not None:
+            code = ord(filled)
+            for index, distance in enumerate(fill.distances):
+                if distance != UNREACHED and (until is None or distance <= until):
+                    cells[index] = code
+
+        text = cells.decode('ascii')
+        return '\n'.join(text[y * self.width:(y + 1) * self.width] for y in range(self.height))
+
+
+class Fill(t.NamedTuple):
+    width: int
+
+    # distance from the nearest source per cell row by row, UNREACHED for cells not reached:
+    distances: t.Sequence[int]
+
+    # steps until the last cell was reached:
+    time: int
+
+    def distance(self, position: Position) -> int:
+        x, y = position
+        return self.distances[y * self.width + x]
+
+
+def flood_fill(
+        grid: Grid, sources: t.Iterable[Position], walls: str = '#', goal: Position = None
+) -> Fill:
+    """Fill grid from all sources at once, one step per time unit, through cells other than walls.
+
+    With a goal, filling stops as soon as the goal is reached, so its distance is the length of
+    the shortest path to it from any source.
+    """
+    width = grid.width
+    size = len(grid.cells)
+    cells = grid.cells
+    blocked = bytearray(256)
+    for wall in walls.encode('ascii'):
+        blocked[wall] = 1
+
+    distances = array.array('l', [UNREACHED]) * size
+    goal_index = grid.index(goal) if goal is not None else None
+
+    frontier = []
+    for source in sources:
+        index = grid.index(source)
+        if distances[index] == UNREACHED:
+            distances[index] = 0
+            frontier.append(index)
+
+    time = 0
+    while frontier:
+        if goal_index is not None and distances[goal_index] != UNREACHED:
+            break
+
+        step = time + 1
+        reached = []
+        for index in frontier:
+            x = index % width
+            if x > 0:
+                reached.append(index - 1)
+            if x < width - 1:
+                reached.append(index + 1)
+            if index >= width:
+                reached.append(index - width)
+            if index + width < size:
+                reached.append(index + width)
+
+        frontier = []
+        for index in reached:
+            if distances[index] == UNREACHED and not blocked[cells[index]]:
+                distances[index] = step
+                frontier.append(index)
+
+        if frontier:
+            time = step
+
+    return Fill(width, distances, time)
@@ -1,8 +1,13 @@
 import collections
+import collections.abc
+import copy
 import enum
+import itertools
 import pathlib
 import typing as t
 
+import intcode_cache
+
 
 @enum.unique
 class Opcode(enum.IntEnum):
@@ -29,6 +34,197 @@ class ParameterMode(enum.IntEnum):
         return cls(modes // pow(10, pos) % 10)
 
 
+PARAMETER_COUNTS = {
+    Opcode.EXIT: 0,
+    Opcode.ADD: 3,
+    Opcode.MULTIPLY: 3,
+    Opcode.INPUT: 1,
+    Opcode.OUTPUT: 1,
+    Opcode.JUMP_IF_TRUE: 2,
+    Opcode.JUMP_IF_FALSE: 2,
+    Opcode.LESS_THAN: 3,
+    Opcode.EQUALS: 3,
+    Opcode.ADJUST_RELATIVE_BASE: 1,
+}
+
+MNEMONICS = {
+    Opcode.EXIT: 'EXT',
+    Opcode.ADD: 'ADD',
+    Opcode.MULTIPLY: 'MUL',
+    Opcode.INPUT: 'INP',
+    Opcode.OUTPUT: 'OUT',
+    Opcode.JUMP_IF_TRUE: 'JNZ',
+    Opcode.JUMP_IF_FALSE: 'JZR',
+    Opcode.LESS_THAN: 'LSS',
+    Opcode.EQUALS: 'EQU',
+    Opcode.ADJUST_RELATIVE_BASE: 'ARB',
+}
+
+MAX_INSTRUCTION_LENGTH = 1 + max(PARAMETER_COUNTS.values())
+
+# opcodes writing their result to the address given by their last parameter:
+STORING_OPCODES = frozenset({
+    Opcode.ADD, Opcode.MULTIPLY, Opcode.INPUT, Opcode.LESS_THAN, Opcode.EQUALS
+})
+
+DEFAULT_TRACE_LENGTH = 100
+
+PAGE_BITS = 10
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+
+# contiguous memory kept behind the program image for the data it works on:
+FLAT_MARGIN = 4 * PAGE_SIZE
+
+
+class PagedMemory:
+    """Intcode memory: one flat list for the program image and the area around it, sparse pages beyond.
+
+    Reading an address never allocates anything, untouched cells read as zero. Copies share
+    flat memory and pages with the original until either side writes to them.
+    """
+
+    def __init__(self, image: t.Sequence[int] = ()):
+        self.flat: t.List[int] = []
+        self.flat_size = 0
+        self.size = 0
+        self._pages: t.Dict[int, t.List[int]] = {}
+
+        # flat memory and pages also referenced by copies of this memory:
+        self._flat_shared = False
+        self._shared_pages: t.Set[int] = set()
+
+        self.load(image)
+
+    def load(self, image: t.Sequence[int]):
+        """Reset memory to hold only the given program image."""
+        self.size = len(image)
+        self.flat_size = (self.size + FLAT_MARGIN + PAGE_MASK) & ~PAGE_MASK
+        self.flat = list(image)
+        self.flat.extend([0] * (self.flat_size - self.size))
+        self._pages = {}
+        self._flat_shared = False
+        self._shared_pages = set()
+
+    def copy(self) -> 'PagedMemory':
+        """Copy-on-write copy of this memory, sharing all cells until they are written."""
+        other = self.__class__.__new__(self.__class__)
+        other.flat = self.flat
+        other.flat_size = self.flat_size
+        other.size = self.size
+        other._pages = dict(self._pages)
+
+        self._flat_shared = other._flat_shared = True
+        self._shared_pages = set(self._pages)
+        other._shared_pages = set(self._pages)
+        return other
+
+    def unshare_flat(self) -> t.List[int]:
+        """Flat memory, copied first if shared with a copy, so it can be written directly."""
+        if self._flat_shared:
+            self.flat = self.flat[:]
+            self._flat_shared = False
+        return self.flat
+
+    def __len__(self):
+        """One past the highest address loaded or written."""
+        return self.size
+
+    def __getitem__(self, address: int) -> int:
+        if 0 <= address < self.flat_size:
+            return self.flat[address]
+
+        page = self._pages.get(address >> PAGE_BITS)
+        return 0 if page is None else page[address & PAGE_MASK]
+
+    def __setitem__(self, address: int, value: int):
+        if 0 <= address < self.flat_size:
+            if self._flat_shared:
+                self.unshare_flat()
+            self.flat[address] = value
+        else:
+            index = address >> PAGE_BITS
+            page = self._pages.get(index)
+            if page is None:
+                page = self._pages[index] = self._new_page()
+            elif index in self._shared_pages:
+                page = self._pages[index] = page[:]
+                self._shared_pages.discard(index)
+            page[address & PAGE_MASK] = value
+
+        if address >= self.size:
+            self.size = address + 1
+
+    def _new_page(self) -> t.MutableSequence[int]:
+        return [0] * PAGE_SIZE
+
+    def changes(self, image: t.Sequence[int]) -> t.List[t.Tuple[int, int]]:
+        """Cells differing from the given program image as (address, value).
+
+        The image must fit into flat memory, as it does for the loaded program, so pages only
+        hold cells written beyond it and are compared to zero.
+        """
+        changed = [
+            (address, value)
+            for address, (value, original) in enumerate(itertools.zip_longest(self.flat, image, fillvalue=0))
+            if value != original
+        ]
+
+        for index in sorted(self._pages):
+            base = index << PAGE_BITS
+            changed.extend((base + offset, value) for offset, value in enumerate(self._pages[index]) if value)
+        return changed
+
+    def view(self) -> 'MemoryView':
+        return MemoryView(self)
+
+
+class MemoryView(collections.abc.Sequence):
+    """Read-only sequence over the cells of a memory, without copying them."""
+
+    def __init__(self, memory: PagedMemory):
+        self._memory = memory
+
+    def __len__(self):
+        return len(self._memory)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._memory[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('memory address out of range', index)
+        return self._memory[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({list(self)!r})'
+
+    def diff(self, other: t.Sequence[int]) -> t.List[t.Tuple[int, int, int]]:
+        """Addresses with differing values as (address, own value, other value)."""
+        return [
+            (address, own, theirs)
+            for address, (own, theirs) in enumerate(itertools.zip_longest(self, other, fillvalue=0))
+            if own != theirs
+        ]
+
+
+class DecodedInstruction(t.NamedTuple):
+    """Instruction at a memory address, split into everything needed to execute it."""
+    opcode: Opcode
+    parameter_modes: int
+    modes: t.Tuple[ParameterMode, ...]
+    handler: t.Callable[['Intcode', t.Tuple[ParameterMode, ...]], None]
+    mnemonic: str
+    length: int
+
+
 class TraceItem:
     def __init__(self, address, relative_base):
         self.address: int = address
@@ -39,6 +235,32 @@ class TraceItem:
         self.arguments: t.List[str] = []
         self.result: t.Optional[str] = None
 
+    @classmethod
+    def from_record(
+            cls, address: int, relative_base: int, decoded: DecodedInstruction,
+            operands: t.Sequence[int], result: t.Optional[int]
+    ) -> 'TraceItem':
+        item = cls(address, relative_base)
+        item.opcode = decoded.opcode
+        item.parameter_mode = decoded.parameter_modes
+        item.mnemonic = decoded.mnemonic
+
+        arguments = list(zip(decoded.modes, operands))
+        if decoded.opcode in STORING_OPCODES:
+            *arguments, (mode, target) = arguments
+            if result is not None:
+                item.result = f'({target})={result}' if mode is ParameterMode.POSITION else f'/{target}/={result}'
+
+        for mode, value in arguments:
+            if mode is ParameterMode.IMMEDIATE:
+                item.arguments.append(str(value))
+            elif mode is ParameterMode.POSITION:
+                item.arguments.append(f'({value})')
+            else:
+                item.arguments.append(f'/{value}/')
+
+        return item
+
     def __str__(self):
         elements = [
             f'{self.address:05}',
@@ -54,29 +276,129 @@ class TraceItem:
         return ' '.join(elements)
 
 
+@enum.unique
+class State(enum.Enum):
+    READY = 'ready'
+    WAITING_FOR_INPUT = 'waiting for input'
+    HALTED = 'halted'
+
+
+class Tracer:
+    """Receives every executed instruction, the base class ignores them at no cost."""
+
+    #: Whether the computer hands executed instructions to this tracer at all.
+    enabled = False
+
+    def reset(self):
+        """Called when a new program run starts."""
+
+    def fork(self) -> 'Tracer':
+        """Tracer for a fork of the traced computer."""
+        return self
+
+    def record(
+            self, address: int, relative_base: int, decoded: DecodedInstruction,
+            operands: t.Sequence[int], result: t.Optional[int]
+    ):
+        """Called after an instruction executed, result is the value stored by it, if any."""
+
+    def __iter__(self) -> t.Iterator[tuple]:
+        """Recorded, unformatted instructions in order of execution."""
+        return iter(())
+
+
+class RingBufferTracer(Tracer):
+    """Keeps the last executed instructions only, so memory stays bounded."""
+
+    enabled = True
+
+    def __init__(self, length: int = DEFAULT_TRACE_LENGTH):
+        self._records = collections.deque(maxlen=length)
+
+    def reset(self):
+        self._records.clear()
+
+    def fork(self):
+        tracer = copy.copy(self)
+        tracer._records = collections.deque(self._records, maxlen=self._records.maxlen)
+        return tracer
+
+    def record(self, address, relative_base, decoded, operands, result):
+        self._records.append((address, relative_base, decoded, operands, result))
+
+    def __iter__(self):
+        return iter(self._records)
+
+
+class FullTracer(RingBufferTracer):
+    """Keeps every executed instruction."""
+
+    def __init__(self):
+        super().__init__(length=None)
+
+
 class Intcode:
     """An Elve Intcode computer."""
 
+    # most cells a decoded instruction may span:
+    max_decoded_length = MAX_INSTRUCTION_LENGTH
+
+    # type of memory, created empty and loaded with the program on reset():
+    memory_type: t.Type[PagedMemory] = PagedMemory
+
+    # attributes caching decoded code, shared by forks until one of them changes them:
+    _caches = ('_decoded', '_decoded_cells')
+
     def __init__(self, *instructions):
         self.program = list(instructions)
-        self._memory = collections.defaultdict(int)
+        self._memory = self.memory_type()
         self.ip = 0
         self.relative_base = 0
-        self.trace = []
-        self._trace_line = None
+        self.state = State.READY
+        self.tracer: Tracer = RingBufferTracer()
         self.stack_trace_on_error = True
 
+        # decoded instructions by address and the cells they were decoded from:
+        self._decoded: t.Dict[int, DecodedInstruction] = {}
+        self._decoded_cells: t.Set[int] = set()
+        self._caches_shared = False
+
+        self._inputs = collections.deque()
+        self._input_iter = None
+        self._outputs = []
+        self._output_limit = None
+        self._on_output = None
+
     @classmethod
-    def from_file(cls, path) -> 'Intcode':
-        return cls(*[int(c) for c in pathlib.Path(path).read_text().split(',')])
+    def from_file(cls, path, cache: bool = True) -> 'Intcode':
+        """Computer running the program in given file, parsed once and then loaded from a cache."""
+        if cache:
+            return cls(*intcode_cache.load_program(path))
+        return cls(*intcode_cache.parse(pathlib.Path(path).read_text()))
 
     @property
-    def memory(self) -> t.List[int]:
-        if not self._memory:
-            return []
+    def memory(self) -> MemoryView:
+        return self._memory.view()
 
-        max_index = max(self._memory.keys())
-        return [self._memory[i] for i in range(max_index + 1)]
+    @property
+    def halted(self) -> bool:
+        return self.state is State.HALTED
+
+    @property
+    def waiting_for_input(self) -> bool:
+        return self.state is State.WAITING_FOR_INPUT
+
+    @property
+    def trace(self) -> t.List[str]:
+        return [str(TraceItem.from_record(*record)) for record in self.tracer]
+
+    @property
+    def trace_execution(self) -> bool:
+        return isinstance(self.tracer, FullTracer)
+
+    @trace_execution.setter
+    def trace_execution(self, value: bool):
+        self.tracer = FullTracer() if value else RingBufferTracer()
 
     def print_trace(self):
         print('=============================================')
@@ -86,10 +408,52 @@ class Intcode:
         print('=============================================')
 
     def next_instruction(self):
-        instruction = self._memory[self.ip]
-
-        self.ip += 1
-        return instruction
+        ip = self.ip
+        self.ip = ip + 1
+
+        memory = self._memory
+        if 0 <= ip < memory.flat_size:
+            return memory.flat[ip]
+        return memory[ip]
+
+    def decode(self, address: int) -> DecodedInstruction:
+        """Decoded instruction at given address, served from the decode cache if possible."""
+        try:
+            return self._decoded[address]
+        except KeyError:
+            pass
+
+        self._own_caches()
+        decoded = self._decode_uncached(address)
+        self._decoded[address] = decoded
+        self._decoded_cells.update(range(address, address + decoded.length))
+        return decoded
+
+    def _decode_uncached(self, address: int) -> DecodedInstruction:
+        instruction = self._memory[address]
+        opcode = Opcode(instruction % 100)
+        parameter_modes = instruction // 100
+        length = 1 + PARAMETER_COUNTS[opcode]
+        modes = tuple(ParameterMode.from_modes(parameter_modes, pos) for pos in range(length - 1))
+
+        return DecodedInstruction(
+            opcode, parameter_modes, modes, self._HANDLERS[opcode], MNEMONICS[opcode], length
+        )
+
+    def _invalidate(self, address: int):
+        """Drop all cached instructions covering the given (just written) address."""
+        self._own_caches()
+        for start in range(address - self.max_decoded_length + 1, address + 1):
+            decoded = self._decoded.get(start)
+            if decoded and start + decoded.length > address:
+                del self._decoded[start]
+
+    def _own_caches(self):
+        """Copy the caches shared with forks before changing them."""
+        if self._caches_shared:
+            for name in self._caches:
+                setattr(self, name, copy.copy(getattr(self, name)))
+            self._caches_shared = False
 
     def __call__(self, *args, **kwargs):
         return self.run(inputs=args)
@@ -98,150 +462,263 @@ class Intcode:
             self, inputs: t.Iterable[int] = None,
             on_output: t.Callable[[int], None] = None
     ) -> t.List[int]:
-        self._memory.clear()
-        self._memory.update({i: v for i, v in enumerate(self.program)})
+        self.reset()
+
+        self._input_iter = iter(inputs or ())
+        self._on_output = on_output
+        try:
+            return self._execute()
+        finally:
+            self._input_iter = None
+            self._on_output = None
+
+    def stream(self, inputs: t.Iterable[int] = None, size: int = None) -> t.Iterator:
+        """Run the program, yielding outputs as they are produced instead of collecting them.
+
+        With size, tuples of that many consecutive outputs are yielded, e.g. screen updates of
+        (x, y, tile), the last one may be shorter if the stream ends within a group. Inputs are
+        taken from the iterable only when the program needs them, so they may depend on the
+        outputs so far. The stream ends when the program halts or needs input beyond the
+        exhausted iterable.
+        """
+        self.reset()
+        input_iter = iter(inputs or ())
+
+        # outputs of the group not complete yet, kept while the program waits for input:
+        pending = []
+        while True:
+            pending += self._execute((size or 1) - len(pending))
+            if self.state is State.HALTED:
+                if pending:
+                    yield tuple(pending) if size else pending[0]
+                return
+
+            if len(pending) == (size or 1):
+                yield tuple(pending) if size else pending[0]
+                pending = []
+
+            if self.state is State.WAITING_FOR_INPUT:
+                try:
+                    self._inputs.append(next(input_iter))
+                except StopIteration:
+                    if pending:
+                        yield tuple(pending)
+                    return
+
+    def fork(self) -> 'Intcode':
+        """Independent copy of this (paused) computer, which resumes from the same state.
+
+        Memory and the caches of decoded code are copied on write, so forks are cheap and share
+        all cells and instructions neither side changed.
+        """
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        other._memory = self._memory.copy()
+        self._caches_shared = other._caches_shared = True
+        other._inputs = collections.deque(self._inputs)
+        other._input_iter = None
+        other._outputs = []
+        other._on_output = None
+        other.tracer = self.tracer.fork()
+        return other
+
+    def snapshot(self) -> 'Intcode':
+        """Frozen copy of the current state to restore() later, possibly several times."""
+        return self.fork()
+
+    def restore(self, snapshot: 'Intcode'):
+        """Continue from a state captured earlier by snapshot()."""
+        state = snapshot.fork()
+        self.__dict__.update(state.__dict__)
+
+    def reset(self):
+        """Load the program and get ready to resume() execution from its start."""
+        self._memory.load(self.program)
+        for name in self._caches:
+            setattr(self, name, type(getattr(self, name))())
+        self._caches_shared = False
 
         self.ip = 0
         self.relative_base = 0
-        self.trace = []
-
-        input_iter = iter(inputs) if inputs else None
-        outputs = []
+        self.state = State.READY
+        self._inputs.clear()
+        self.tracer.reset()
 
-        opcode = None
-        while opcode is not Opcode.EXIT:
-            self._trace_line = TraceItem(self.ip, self.relative_base)
+    def resume(self, *inputs: int, max_outputs: int = None, max_instructions: int = None) -> t.List[int]:
+        """Continue execution where it stopped before, returning the outputs produced meanwhile.
 
-            instruction = self.next_instruction()
+        Execution stops when the program halts, waits for input beyond the given and earlier
+        unconsumed ones, when max_outputs values were output or when max_instructions were
+        executed. The reason is found in state, which stays READY in the latter two cases.
+        """
+        self._inputs.extend(inputs)
 
-            opcode = Opcode(instruction % 100)
-            parameter_modes = instruction // 100
-            self._trace_line.opcode = opcode
-            self._trace_line.parameter_mode = parameter_modes
-
-            try:
-
-                if opcode is Opcode.EXIT:
-                    self._trace_line.mnemonic = 'EXT'
-
-                elif opcode is Opcode.ADD:
-                    self._trace_line.mnemonic = 'ADD'
-                    self._add(parameter_modes)
-
-                elif opcode is Opcode.MULTIPLY:
-                    self._trace_line.mnemonic = 'MUL'
-                    self._multiply(parameter_modes)
-
-                elif opcode is Opcode.INPUT:
-                    self._trace_line.mnemonic = 'INP'
-                    value = next(input_iter)
-                    self._store(value, ParameterMode.from_modes(parameter_modes, 0))
-
-                elif opcode is Opcode.OUTPUT:
-                    self._trace_line.mnemonic = 'OUT'
-                    value = self._load(ParameterMode(parameter_modes))
-                    outputs.append(value)
-                    if on_output:
-                        on_output(value)
+        if self.state is State.HALTED:
+            return []
 
-                elif opcode is Opcode.JUMP_IF_TRUE:
-                    self._trace_line.mnemonic = 'JNZ'
-                    self._jump_if(True, parameter_modes)
+        return self._execute(max_outputs, max_instructions)
 
-                elif opcode is Opcode.JUMP_IF_FALSE:
-                    self._trace_line.mnemonic = 'JZR'
-                    self._jump_if(False, parameter_modes)
+    def _execute(self, max_outputs: int = None, max_instructions: int = None) -> t.List[int]:
+        self.state = State.READY
+        self._outputs = outputs = []
+        self._output_limit = max_outputs
 
-                elif opcode is Opcode.LESS_THAN:
-                    self._trace_line.mnemonic = 'LSS'
-                    self._less_than(parameter_modes)
+        memory = self._memory
+        record = self.tracer.record if self.tracer.enabled else None
+        remaining = -1 if max_instructions is None else max_instructions
 
-                elif opcode is Opcode.EQUALS:
-                    self._trace_line.mnemonic = 'EQU'
-                    self._equals(parameter_modes)
+        stop = False
+        while not stop and remaining:
+            remaining -= 1
+            address = self.ip
+            relative_base = self.relative_base
 
-                elif opcode is Opcode.ADJUST_RELATIVE_BASE:
-                    self._trace_line.mnemonic = 'ARB'
-                    self._adjust_relative_base(parameter_modes)
+            decoded = self.decode(address)
+            self.ip = address + 1
 
-                else:
-                    raise NotImplementedError('unexpected opcode', opcode)
+            if record is not None:
+                # read before execution, instructions may overwrite their own parameters:
+                operands = [memory[a] for a in range(address + 1, address + decoded.length)]
 
-                self.trace.append(str(self._trace_line))
+            try:
+                stop = decoded.handler(self, decoded.modes)
             except:
                 if self.stack_trace_on_error:
-                    print(f'Program execution failed:')
-                    self.print_trace()
-                    print(f'{self._trace_line} <-- FAILED')
+                    self._print_failure(address, relative_base, decoded)
                 raise
 
+            if record is not None and self.state is not State.WAITING_FOR_INPUT:
+                result = None
+                if decoded.opcode in STORING_OPCODES:
+                    target = operands[-1]
+                    if decoded.modes[-1] is ParameterMode.RELATIVE:
+                        target += relative_base
+                    result = memory[target]
+                record(address, relative_base, decoded, operands, result)
+
         return outputs
 
-    def _add(self, parameter_modes):
-        param1, param2 = self._load_multiple(2, parameter_modes)
-        self._store(param1 + param2, ParameterMode.from_modes(parameter_modes, 2))
+    def _step(self) -> bool:
+        """Execute the instruction at ip without tracing, returns whether execution has to stop."""
+        address = self.ip
+        relative_base = self.relative_base
+
+        decoded = self.decode(address)
+        self.ip = address + 1
+
+        try:
+            return decoded.handler(self, decoded.modes)
+        except:
+            if self.stack_trace_on_error:
+                self._print_failure(address, relative_base, decoded)
+            raise
+
+    def _print_failure(self, address: int, relative_base: int, decoded: DecodedInstruction):
+        operands = [self._memory[a] for a in range(address + 1, address + decoded.length)]
+        failed = TraceItem.from_record(address, relative_base, decoded, operands, None)
+
+        print(f'Program execution failed:')
+        self.print_trace()
+        print(f'{failed} <-- FAILED')
+
+    def _exit(self, modes):
+        self.ip -= 1
+        self.state = State.HALTED
+        return True
+
+    def _add(self, modes):
+        param1, param2 = self._load_multiple(modes[:2])
+        self._store(param1 + param2, modes[2])
+
+    def _multiply(self, modes):
+        param1, param2 = self._load_multiple(modes[:2])
+        self._store(param1 * param2, modes[2])
+
+    def _input(self, modes):
+        if self._inputs:
+            value = self._inputs.popleft()
+        elif self._input_iter is not None:
+            value = next(self._input_iter)
+        else:
+            self.ip -= 1
+            self.state = State.WAITING_FOR_INPUT
+            return True
+
+        self._store(value, modes[0])
 
-    def _multiply(self, parameter_modes):
-        param1, param2 = self._load_multiple(2, parameter_modes)
-        self._store(param1 * param2, ParameterMode.from_modes(parameter_modes, 2))
+    def _output(self, modes):
+        value = self._load(modes[0])
+        self._outputs.append(value)
+        if self._on_output:
+            self._on_output(value)
+        return len(self._outputs) == self._output_limit
 
     def _store(self, value: int, mode: ParameterMode):
         address = self.next_instruction()
 
-        if mode is ParameterMode.POSITION:
-            entry = f'({address})={value}'
-        elif mode is ParameterMode.RELATIVE:
-            entry = f'/{address}/={value}'
+        if mode is ParameterMode.RELATIVE:
             address = self.relative_base + address
-        else:
+        elif mode is not ParameterMode.POSITION:
             raise NotImplementedError('unsupported storage mode', mode)
 
-        self._trace_line.result = entry
         self._memory[address] = value
 
-    def _load_multiple(self, number: int, parameter_modes: int) -> t.List[int]:
-        values = []
-
-        while number:
-            mode = ParameterMode(parameter_modes % 10)
-            parameter_modes //= 10
-            number -= 1
-            values.append(self._load(mode))
+        if address in self._decoded_cells:
+            self._invalidate(address)
 
-        return values
+    def _load_multiple(self, modes: t.Iterable[ParameterMode]) -> t.List[int]:
+        return [self._load(mode) for mode in modes]
 
     def _load(self, mode: ParameterMode) -> int:
         value = self.next_instruction()
 
         if mode is ParameterMode.IMMEDIATE:
-            self._trace_line.arguments.append(str(value))
             return value
 
-        if mode is ParameterMode.POSITION:
-            self._trace_line.arguments.append(f'({value})')
-            return self._memory[value]
-
         if mode is ParameterMode.RELATIVE:
-            self._trace_line.arguments.append(f'/{value}/')
-            return self._memory[self.relative_base + value]
+            value += self.relative_base
+        elif mode is not ParameterMode.POSITION:
+            raise NotImplementedError('unknown parameter mode', mode)
 
-        raise NotImplementedError('unknown parameter mode', mode)
+        memory = self._memory
+        if 0 <= value < memory.flat_size:
+            return memory.flat[value]
+        return memory[value]
 
-    def _jump_if(self, condition: bool, parameter_modes: int):
-        value, address = self._load_multiple(2, parameter_modes)
+    def _jump_if(self, condition: bool, modes):
+        value, address = self._load_multiple(modes)
         if bool(value) is condition:
             self.ip = address
 
-    def _less_than(self, parameter_modes):
-        param1, param2 = self._load_multiple(2, parameter_modes)
+    def _jump_if_true(self, modes):
+        self._jump_if(True, modes)
+
+    def _jump_if_false(self, modes):
+        self._jump_if(False, modes)
+
+    def _less_than(self, modes):
+        param1, param2 = self._load_multiple(modes[:2])
         value = 1 if param1 < param2 else 0
-        self._store(value, ParameterMode.from_modes(parameter_modes, 2))
+        self._store(value, modes[2])
 
-    def _equals(self, parameter_modes):
-        param1, param2 = self._load_multiple(2, parameter_modes)
+    def _equals(self, modes):
+        param1, param2 = self._load_multiple(modes[:2])
         value = 1 if param1 == param2 else 0
-        self._store(value, ParameterMode.from_modes(parameter_modes, 2))
+        self._store(value, modes[2])
 
-    def _adjust_relative_base(self, parameter_modes):
-        adjustment = self._load(ParameterMode(parameter_modes))
+    def _adjust_relative_base(self, modes):
+        adjustment = self._load(modes[0])
         self.relative_base += adjustment
+
+    _HANDLERS = {
+        Opcode.EXIT: _exit,
+        Opcode.ADD: _add,
+        Opcode.MULTIPLY: _multiply,
+        Opcode.INPUT: _input,
+        Opcode.OUTPUT: _output,
+        Opcode.JUMP_IF_TRUE: _jump_if_true,
+        Opcode.JUMP_IF_FALSE: _jump_if_false,
+        Opcode.LESS_THAN: _less_than,
+        Opcode.EQUALS: _equals,
+        Opcode.ADJUST_RELATIVE_BASE: _adjust_relative_base,
+    }
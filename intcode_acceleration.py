@@ -0,0 +1,297 @@
+"""Fast-forwarding of Intcode counting loops, computing their final state in closed form."""
+import typing as t
+
+from intcode import Intcode, Opcode, ParameterMode, Tracer
+
+# affine expression over cells as they were at the start of an iteration, constant at None:
+Affine = t.Dict[t.Optional[int], int]
+
+ARITHMETIC_OPCODES = frozenset({Opcode.ADD, Opcode.MULTIPLY})
+COMPARE_OPCODES = frozenset({Opcode.LESS_THAN, Opcode.EQUALS})
+
+# conditions on a value to run another iteration:
+NONZERO = '!=0'
+ZERO = '==0'
+NEGATIVE = '<0'
+NOT_NEGATIVE = '>=0'
+
+CONDITIONS = {
+    # jump if true, jump if false, on the value itself:
+    None: (NONZERO, ZERO),
+    # on the difference of the compared values:
+    Opcode.LESS_THAN: (NEGATIVE, NOT_NEGATIVE),
+    Opcode.EQUALS: (ZERO, NONZERO),
+}
+
+
+class LoopPlan(t.NamedTuple):
+    """What one iteration of a loop does to the cells it writes."""
+    updates: t.Dict[int, Affine]
+    #: Value deciding whether to run another iteration, checked at the end of each.
+    condition_value: Affine
+    condition: str
+    #: Cell of a compare result the loop jumps on and its value once the loop is left.
+    flag: t.Optional[t.Tuple[int, int]]
+
+
+class _Loop(t.NamedTuple):
+    start: int
+    end: int
+    plan: LoopPlan
+
+
+class AcceleratingIntcode(Intcode):
+    """Intcode computer fast-forwarding loops which only count, instead of running every iteration.
+
+    Whenever a jump goes backwards, the instructions from its target up to the jump are checked
+    once: only additions and multiplications by constants of cells at fixed addresses, which
+    may be followed by a compare the jump depends on. No I/O, no other jumps, no changes of the
+    relative base and no writes into the loop itself. The value the loop condition depends on
+    must change by a constant each iteration. The number of iterations left is then computed
+    directly and all cells are updated by the power of the loop's affine map, as if every
+    iteration was executed. A fast-forwarded loop counts as a single instruction against
+    max_instructions. Loops are run as usual while the tracer is enabled. Loops which cannot
+    be fast-forwarded are remembered and not checked again, even after writes into them.
+    """
+
+    _caches = Intcode._caches + ('_loops', '_loop_keys', '_rejected_loops')
+
+    def __init__(self, *instructions):
+        super().__init__(*instructions)
+        self.tracer = Tracer()
+
+        # loops to fast-forward by address of their jump back and relative base:
+        self._loops: t.Dict[t.Tuple[int, int], _Loop] = {}
+        # keys of the loops covering each cell, replaced rather than changed as forks share them:
+        self._loop_keys: t.Dict[int, t.Tuple[t.Tuple[int, int], ...]] = {}
+        self._rejected_loops: t.Set[t.Tuple[int, int]] = set()
+
+    def _invalidate(self, address: int):
+        super()._invalidate(address)
+        for key in self._loop_keys.pop(address, ()):
+            loop = self._loops.pop(key)
+            for cell in range(loop.start, loop.end):
+                keys = tuple(k for k in self._loop_keys.get(cell, ()) if k != key)
+                if keys:
+                    self._loop_keys[cell] = keys
+                else:
+                    self._loop_keys.pop(cell, None)
+
+    def _jump_if(self, condition: bool, modes):
+        address = self.ip - 1
+        super()._jump_if(condition, modes)
+        if self.ip <= address and not self.tracer.enabled:
+            self._fast_forward(address)
+
+    def _fast_forward(self, jump_address: int):
+        key = jump_address, self.relative_base
+        loop = self._loops.get(key)
+        if loop is None:
+            if key in self._rejected_loops:
+                return
+            self._own_caches()
+            plan = self._analyze(self.ip, jump_address)
+            if plan is None:
+                self._rejected_loops.add(key)
+                return
+            loop = self._loops[key] = _Loop(self.ip, jump_address + 3, plan)
+            for cell in range(loop.start, loop.end):
+                self._loop_keys[cell] = self._loop_keys.get(cell, ()) + (key,)
+
+        plan = loop.plan
+
+        memory = self._memory
+        updates = plan.updates
+
+        # value checked after k more iterations is first + (k - 1) * step, it depends on counters only:
+        first = _evaluate(plan.condition_value, memory)
+        step = sum(
+            coefficient * (_evaluate(updates[cell], memory) - memory[cell])
+            for cell, coefficient in plan.condition_value.items() if cell in updates
+        )
+        iterations = _iterations(first - step, step, plan.condition)
+        if iterations is None:
+            return
+
+        for cell, value in _iterate(updates, memory, iterations).items():
+            self._write(cell, value)
+        if plan.flag is not None:
+            self._write(*plan.flag)
+        self.ip = loop.end
+
+    def _write(self, address: int, value: int):
+        self._memory[address] = value
+        if address in self._decoded_cells:
+            self._invalidate(address)
+
+    def _analyze(self, start: int, jump_address: int) -> t.Optional[LoopPlan]:
+        """Plan of the loop from start to the jump at jump_address, if it can be fast-forwarded."""
+        try:
+            jump = self.decode(jump_address)
+            body = []
+            address = start
+            while address < jump_address:
+                decoded = self.decode(address)
+                body.append((address, decoded))
+                address += decoded.length
+        except ValueError:
+            return None
+
+        if address != jump_address or jump.modes[1] is not ParameterMode.IMMEDIATE:
+            return None
+        jump_cell = self._address(jump_address + 1, jump.modes[0])
+        if jump_cell is None:
+            return None
+
+        compare = None
+        if body and body[-1][1].opcode in COMPARE_OPCODES and self._address(*_target(*body[-1])) == jump_cell:
+            compare = body.pop()
+
+        updates: t.Dict[int, Affine] = {}
+        read: t.Set[int] = set()
+
+        def load(address: int, mode: ParameterMode) -> t.Optional[Affine]:
+            if mode is ParameterMode.IMMEDIATE:
+                return {None: self._memory[address]}
+            cell = self._address(address, mode)
+            if cell is None:
+                return None
+            read.add(cell)
+            return updates.get(cell, {cell: 1})
+
+        for address, decoded in body:
+            if decoded.opcode not in ARITHMETIC_OPCODES:
+                return None
+
+            operands = [load(address + 1 + i, decoded.modes[i]) for i in range(2)]
+            if None in operands:
+                return None
+            value = _add(*operands) if decoded.opcode is Opcode.ADD else _multiply(*operands)
+            target = self._address(*_target(address, decoded))
+            if value is None or target is None:
+                return None
+            updates[target] = value
+
+        if compare is None:
+            condition_value = load(jump_address + 1, jump.modes[0])
+            flag = None
+        else:
+            address, decoded = compare
+            first, second = (load(address + 1 + i, decoded.modes[i]) for i in range(2))
+            if first is None or second is None:
+                return None
+            condition_value = _add(first, _multiply(second, {None: -1}))
+            flag = jump_cell, 0 if jump.opcode is Opcode.JUMP_IF_TRUE else 1
+            if jump_cell in read or jump_cell in updates:
+                return None
+
+        written = set(updates) | ({jump_cell} if flag else set())
+        if any(start <= cell < jump_address + 3 for cell in written):
+            return None
+
+        # the condition must depend on counters only, i.e. cells changing by a constant:
+        counters = [cell for cell in condition_value if cell in updates]
+        if not counters or any(
+                updates[cell].get(cell) != 1 or any(c in updates for c in updates[cell] if c != cell)
+                for cell in counters
+        ):
+            return None
+
+        condition = CONDITIONS[compare and compare[1].opcode][jump.opcode is Opcode.JUMP_IF_FALSE]
+        return LoopPlan(updates, condition_value, condition, flag)
+
+    def _address(self, address: int, mode: ParameterMode) -> t.Optional[int]:
+        """Cell the parameter at address refers to, None for immediate parameters."""
+        if mode is ParameterMode.POSITION:
+            return self._memory[address]
+        if mode is ParameterMode.RELATIVE:
+            return self.relative_base + self._memory[address]
+        return None
+
+
+def _target(address: int, decoded) -> t.Tuple[int, ParameterMode]:
+    return address + decoded.length - 1, decoded.modes[-1]
+
+
+def _add(first: Affine, second: Affine) -> Affine:
+    result = dict(first)
+    for cell, coefficient in second.items():
+        result[cell] = result.get(cell, 0) + coefficient
+    return {cell: coefficient for cell, coefficient in result.items() if coefficient or cell is None}
+
+
+def _multiply(first: Affine, second: Affine) -> t.Optional[Affine]:
+    """Product of both, None if neither is a constant, as the product would not be affine."""
+    if first.keys() - {None}:
+        if second.keys() - {None}:
+            return None
+        first, second = second, first
+
+    factor = first.get(None, 0)
+    return {cell: factor * coefficient for cell, coefficient in second.items() if factor or cell is None}
+
+
+def _evaluate(value: Affine, memory) -> int:
+    return sum(coefficient if cell is None else coefficient * memory[cell] for cell, coefficient in value.items())
+
+
+def _iterations(first: int, step: int, condition: str) -> t.Optional[int]:
+    """Iterations k >= 1 until first + k * step fails condition, None if it never does."""
+    if condition == NONZERO:
+        if step and -first % step == 0 and -first // step >= 1:
+            return -first // step
+        return None
+
+    if condition == ZERO:
+        if first + step:
+            return 1
+        return 2 if step else None
+
+    if condition == NEGATIVE:
+        if first + step >= 0:
+            return 1
+        return -(first // step) if step > 0 else None
+
+    if first + step < 0:
+        return 1
+    return first // -step + 1 if step < 0 else None
+
+
+def _iterate(updates: t.Dict[int, Affine], memory, iterations: int) -> t.Dict[int, int]:
+    """Values of the updated cells after running the given number of iterations."""
+    cells = list(updates)
+    index = {cell: i for i, cell in enumerate(cells)}
+    size = len(cells) + 1
+
+    # affine map on (cells..., 1), with cells only read folded into the constant:
+    matrix = [[0] * size for _ in range(size)]
+    matrix[-1][-1] = 1
+    for row, cell in enumerate(cells):
+        for other, coefficient in updates[cell].items():
+            if other is None:
+                matrix[row][-1] += coefficient
+            elif other in index:
+                matrix[row][index[other]] += coefficient
+            else:
+                matrix[row][-1] += coefficient * memory[other]
+
+    power = _power(matrix, iterations)
+    vector = [memory[cell] for cell in cells] + [1]
+    return {cell: sum(a * b for a, b in zip(power[row], vector)) for row, cell in enumerate(cells)}
+
+
+def _power(matrix: t.List[t.List[int]], exponent: int) -> t.List[t.List[int]]:
+    size = len(matrix)
+    result = [[int(row == column) for column in range(size)] for row in range(size)]
+    while exponent:
+        if exponent & 1:
+            result = _product(result, matrix)
+        exponent >>= 1
+        if exponent:
+            matrix = _product(matrix, matrix)
+    return result
+
+
+def _product(first: t.List[t.List[int]], second: t.List[t.List[int]]) -> t.List[t.List[int]]:
+    columns = list(zip(*second))
+    return [[sum(a * b for a, b in zip(row, column)) for column in columns] for row in first]
@@ -0,0 +1,76 @@
+"""Cooperative execution of many Intcode computers on an asyncio event loop."""
+import asyncio
+import typing as t
+
+from intcode import Intcode, State
+
+# instructions a machine executes before giving other tasks a turn:
+DEFAULT_QUANTUM = 1000
+
+# outputs a machine may get ahead of its consumer:
+DEFAULT_OUTPUT_BUFFER = 16
+
+
+class Machine:
+    """Intcode computer reading inputs from and writing outputs to asyncio queues.
+
+    A machine runs until it needs input nobody provided yet, its output queue is full or it
+    executed quantum instructions, then yields to the event loop. Machines are connected by
+    using one's outputs as the other's inputs.
+    """
+
+    def __init__(
+            self,
+            computer: Intcode,
+            inputs: asyncio.Queue = None,
+            outputs: asyncio.Queue = None,
+            quantum: int = DEFAULT_QUANTUM,
+    ):
+        self.computer = computer
+        self.inputs = asyncio.Queue() if inputs is None else inputs
+        self.outputs = asyncio.Queue(DEFAULT_OUTPUT_BUFFER) if outputs is None else outputs
+        self.quantum = quantum
+
+    async def run(self):
+        """Run the program from its start until it halts."""
+        computer = self.computer
+        computer.reset()
+
+        inputs = ()
+        while True:
+            # never produce more than fits into the queue, but at least one output to wait on:
+            free = self.outputs.maxsize - self.outputs.qsize() if self.outputs.maxsize else None
+            max_outputs = None if free is None else max(free, 1)
+
+            for value in computer.resume(*inputs, max_outputs=max_outputs, max_instructions=self.quantum):
+                await self.outputs.put(value)
+
+            if computer.state is State.HALTED:
+                return
+            if computer.state is State.WAITING_FOR_INPUT:
+                inputs = (await self.inputs.get(),)
+            else:
+                inputs = ()
+                await asyncio.sleep(0)
+
+
+def chain(*computers: Intcode, quantum: int = DEFAULT_QUANTUM, loop: bool = False) -> t.List[Machine]:
+    """Machines connected in a row, each feeding its outputs to the next, optionally in a loop."""
+    machines = []
+    for computer in computers:
+        inputs = machines[-1].outputs if machines else None
+        machines.append(Machine(computer, inputs, quantum=quantum))
+
+    if loop and machines:
+        machines[0].inputs = machines[-1].outputs
+    return machines
+
+
+async def run_machines(machines: t.Iterable[Machine]):
+    """Run machines concurrently until all of them halted, cancelling all if one fails."""
+    tasks = [asyncio.create_task(machine.run()) for machine in machines]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,267 @@
+"""Lockstep execution of many instances of one Intcode program over NumPy arrays."""
+import typing as t
+
+import numpy as np
+
+from intcode import Intcode, Opcode, PARAMETER_COUNTS, ParameterMode
+
+# cells behind the program image available to the vectorized instances:
+DEFAULT_MARGIN = 256
+
+# products of factors beyond this (in float) may not fit into int64:
+MULTIPLY_LIMIT = float(2 ** 62)
+
+
+class BatchResult(t.NamedTuple):
+    #: Final memory of all instances, one row each, dtype object if an instance needed big integers.
+    memory: np.ndarray
+    outputs: t.List[t.List[int]]
+    #: Exceptions of instances which failed, by instance index.
+    errors: t.Dict[int, Exception]
+
+
+class _Batch:
+    """State of all instances while running in lockstep."""
+
+    def __init__(self, program, count, patches, inputs, margin, instructions):
+        self.size = len(program) + margin
+        self.instructions = instructions
+
+        self.memory = np.zeros((count, self.size), dtype=np.int64)
+        self.memory[:, :len(program)] = program
+        for address, values in patches.items():
+            self.memory[:, address] = values
+
+        input_length = max((len(i) for i in inputs), default=0)
+        self.input_values = np.zeros((count, input_length), dtype=np.int64)
+        for index, values in enumerate(inputs):
+            self.input_values[index, :len(values)] = values
+        self.input_lengths = np.array([len(i) for i in inputs], dtype=np.int64)
+        self.input_pointer = np.zeros(count, dtype=np.int64)
+
+        self.ip = np.zeros(count, dtype=np.int64)
+        self.relative_base = np.zeros(count, dtype=np.int64)
+        self.running = np.ones(count, dtype=bool)
+        self.scalar = np.zeros(count, dtype=bool)
+        self.outputs = [[] for _ in range(count)]
+
+    def hand_to_scalar(self, rows):
+        self.running[rows] = False
+        self.scalar[rows] = True
+
+    def address(self, rows, ip, mode, position):
+        """Address referenced by a parameter of rows, None for immediate parameters."""
+        if mode is ParameterMode.IMMEDIATE:
+            return None
+
+        address = self.memory[rows, ip + 1 + position]
+        if mode is ParameterMode.RELATIVE:
+            address = address + self.relative_base[rows]
+        return address
+
+    def drop_out_of_range(self, rows, addresses):
+        """Hand rows accessing memory beyond the vectorized range to the scalar path."""
+        valid = np.ones(len(rows), dtype=bool)
+        for address in addresses:
+            if address is not None:
+                valid &= (address >= 0) & (address < self.size)
+
+        if valid.all():
+            return rows, addresses
+
+        self.hand_to_scalar(rows[~valid])
+        return rows[valid], [None if a is None else a[valid] for a in addresses]
+
+    def load(self, rows, ip, modes):
+        """Parameter values of rows, dropping rows that cannot be handled vectorized."""
+        addresses = [self.address(rows, ip, mode, position) for position, mode in enumerate(modes)]
+        rows, addresses = self.drop_out_of_range(rows, addresses)
+
+        values = [
+            self.memory[rows, ip + 1 + position] if address is None else self.memory[rows, address]
+            for position, address in enumerate(addresses)
+        ]
+        return rows, values
+
+    def store(self, rows, ip, mode, position, values):
+        address = self.address(rows, ip, mode, position)
+        if address is None:
+            self.hand_to_scalar(rows)
+            return
+
+        valid_rows, (address,) = self.drop_out_of_range(rows, [address])
+        if len(valid_rows) != len(rows):
+            values = values[np.isin(rows, valid_rows)]
+        self.memory[valid_rows, address] = values
+
+    def step(self, rows, ip, instruction):
+        """Execute instruction at ip for all rows, which share both."""
+        if self.instructions is not None and instruction not in self.instructions:
+            self.running[rows] = False
+            return
+
+        try:
+            opcode = Opcode(instruction % 100)
+        except ValueError:
+            self.hand_to_scalar(rows)
+            return
+
+        count = PARAMETER_COUNTS[opcode]
+        modes = [ParameterMode.from_modes(instruction // 100, pos) for pos in range(count)]
+        next_ip = ip + 1 + count
+
+        if opcode is Opcode.EXIT:
+            self.running[rows] = False
+            return
+
+        if opcode is Opcode.INPUT:
+            exhausted = self.input_pointer[rows] >= self.input_lengths[rows]
+            if exhausted.any():
+                self.hand_to_scalar(rows[exhausted])
+                rows = rows[~exhausted]
+            values = self.input_values[rows, self.input_pointer[rows]]
+            self.input_pointer[rows] += 1
+            self.store(rows, ip, modes[0], 0, values)
+            self.ip[rows] = next_ip
+            return
+
+        if opcode in (Opcode.ADD, Opcode.MULTIPLY, Opcode.LESS_THAN, Opcode.EQUALS):
+            rows, (param1, param2) = self.load(rows, ip, modes[:2])
+            if opcode is Opcode.ADD:
+                values = param1 + param2
+                overflow = ((param1 ^ values) & (param2 ^ values)) < 0
+            elif opcode is Opcode.MULTIPLY:
+                values = param1 * param2
+                overflow = np.abs(param1.astype(np.float64) * param2) >= MULTIPLY_LIMIT
+            elif opcode is Opcode.LESS_THAN:
+                values = (param1 < param2).astype(np.int64)
+                overflow = None
+            else:
+                values = (param1 == param2).astype(np.int64)
+                overflow = None
+
+            if overflow is not None and overflow.any():
+                self.hand_to_scalar(rows[overflow])
+                rows, values = rows[~overflow], values[~overflow]
+
+            # rows may still be handed over while storing, those never read their ip again:
+            self.ip[rows] = next_ip
+            self.store(rows, ip, modes[2], 2, values)
+            return
+
+        rows, params = self.load(rows, ip, modes)
+
+        if opcode is Opcode.OUTPUT:
+            for row, value in zip(rows.tolist(), params[0].tolist()):
+                self.outputs[row].append(value)
+            self.ip[rows] = next_ip
+
+        elif opcode in (Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE):
+            value, target = params
+            jump = value != 0 if opcode is Opcode.JUMP_IF_TRUE else value == 0
+            self.ip[rows] = np.where(jump, target, next_ip)
+
+        elif opcode is Opcode.ADJUST_RELATIVE_BASE:
+            self.relative_base[rows] += params[0]
+            self.ip[rows] = next_ip
+
+    def run(self):
+        while True:
+            running = np.flatnonzero(self.running)
+            if not len(running):
+                return
+
+            # instances sharing an instruction pointer (and instruction there) execute together:
+            ips = self.ip[running]
+            for ip in np.unique(ips).tolist():
+                rows = running[ips == ip]
+                if not 0 <= ip < self.size - 1 - max(PARAMETER_COUNTS.values()):
+                    self.hand_to_scalar(rows)
+                    continue
+
+                instructions = self.memory[rows, ip]
+                for instruction in np.unique(instructions).tolist():
+                    self.step(rows[instructions == instruction], ip, instruction)
+
+
+def run_batch(
+        program: t.Sequence[int],
+        count: int,
+        patches: t.Mapping[int, t.Sequence[int]] = None,
+        inputs: t.Sequence[t.Sequence[int]] = None,
+        margin: int = DEFAULT_MARGIN,
+        instructions: t.Collection[int] = None,
+) -> BatchResult:
+    """Run count instances of program in lockstep.
+
+    Instance i starts with memory patched by patches[address][i] and reads inputs[i]. Instances
+    leaving what the vectorized engine supports (values beyond int64, memory beyond the program
+    plus margin, missing input, invalid instructions) are rerun by the scalar Intcode instead.
+    With instructions, instances stop without error at any instruction not among them, like
+    the restricted computer of day 2.
+    """
+    inputs = list(inputs) if inputs is not None else [()] * count
+    patches = {address: np.broadcast_to(values, count) for address, values in (patches or {}).items()}
+
+    try:
+        batch = _Batch(np.array(program, dtype=np.int64), count, patches, inputs, margin, instructions)
+    except OverflowError:
+        return _run_scalar(program, count, patches, inputs, range(count))
+
+    batch.run()
+
+    memory = batch.memory
+    outputs = batch.outputs
+    errors = {}
+
+    scalar_rows = np.flatnonzero(batch.scalar).tolist()
+    if scalar_rows:
+        scalar = _run_scalar(program, count, patches, inputs, scalar_rows)
+        memory = _merge_memory(memory, scalar.memory, scalar_rows)
+        for row in scalar_rows:
+            outputs[row] = scalar.outputs[row]
+        errors = scalar.errors
+
+    return BatchResult(memory, outputs, errors)
+
+
+def _run_scalar(program, count, patches, inputs, rows) -> BatchResult:
+    """Run given instances one by one with the reference Intcode."""
+    memories = {}
+    outputs = [[] for _ in range(count)]
+    errors = {}
+
+    for row in rows:
+        computer = Intcode(*program)
+        for address, values in patches.items():
+            computer.program[address] = int(values[row])
+        computer.stack_trace_on_error = False
+
+        try:
+            outputs[row] = computer.run([int(v) for v in inputs[row]])
+        except Exception as e:
+            errors[row] = e
+        memories[row] = list(computer.memory)
+
+    size = max([len(program)] + [len(m) for m in memories.values()])
+    memory = np.zeros((count, size), dtype=object)
+    for row, cells in memories.items():
+        memory[row, :len(cells)] = cells
+
+    return BatchResult(memory, outputs, errors)
+
+
+def _merge_memory(memory: np.ndarray, scalar_memory: np.ndarray, rows: t.List[int]) -> np.ndarray:
+    size = max(memory.shape[1], scalar_memory.shape[1])
+    scalar_rows = scalar_memory[rows]
+
+    try:
+        scalar_rows = scalar_rows.astype(np.int64)
+    except OverflowError:
+        memory = memory.astype(object)
+
+    if size > memory.shape[1]:
+        memory = np.pad(memory, ((0, 0), (0, size - memory.shape[1])))
+    memory[rows] = 0
+    memory[rows, :scalar_rows.shape[1]] = scalar_rows
+    return memory
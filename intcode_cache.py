@@ -0,0 +1,124 @@
+"""On-disk cache of parsed Intcode programs, keyed by the content of their source files.
+
+Entries are stored as int64 arrays in a .intcode_cache directory next to the source and are
+memory mapped for loading. Values beyond int64 are escaped and stored as decimal text after
+the array. Since the key is a hash of the source text, changed sources never hit stale entries.
+"""
+import array
+import hashlib
+import mmap
+import os
+import pathlib
+import struct
+import sys
+import tempfile
+import typing as t
+
+CACHE_DIRECTORY = '.intcode_cache'
+
+# bump to invalidate all existing entries after format changes:
+FORMAT_VERSION = 1
+
+# magic, format version, number of values, number of escaped values:
+HEADER = struct.Struct('=4sIQQ')
+MAGIC = b'INTC'
+
+# escaped value: index, length of its decimal representation:
+ESCAPE = struct.Struct('=QI')
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+# stands for escaped values in the array:
+ESCAPED = INT64_MIN
+
+
+def parse(text: str) -> t.List[int]:
+    return [int(c) for c in text.split(',')]
+
+
+def load_program(path) -> t.List[int]:
+    """Program parsed from a source file, from the cache if it was parsed before."""
+    source = pathlib.Path(path).read_bytes()
+    entry = entry_path(path, source)
+
+    try:
+        return _read(entry)
+    except (OSError, ValueError, struct.error):
+        pass
+
+    program = parse(source.decode('ascii'))
+    try:
+        write_atomically(entry, _encode(program))
+    except OSError:
+        pass
+    return program
+
+
+def entry_path(path, source: bytes = None) -> pathlib.Path:
+    path = pathlib.Path(path)
+    if source is None:
+        source = path.read_bytes()
+
+    key = hashlib.sha256(source)
+    key.update(f'{FORMAT_VERSION}:{sys.byteorder}'.encode('ascii'))
+    return path.parent / CACHE_DIRECTORY / f'{key.hexdigest()[:32]}.bin'
+
+
+def write_atomically(path: pathlib.Path, data: bytes):
+    """Write atomically, so concurrent readers never see partial entries."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _encode(program: t.List[int]) -> bytes:
+    values = array.array('q', bytes(8 * len(program)))
+    escapes = []
+
+    for index, value in enumerate(program):
+        if INT64_MIN < value <= INT64_MAX:
+            values[index] = value
+        else:
+            values[index] = ESCAPED
+            escapes.append((index, str(value).encode('ascii')))
+
+    parts = [HEADER.pack(MAGIC, FORMAT_VERSION, len(program), len(escapes)), values.tobytes()]
+    for index, digits in escapes:
+        parts.append(ESCAPE.pack(index, len(digits)))
+        parts.append(digits)
+    return b''.join(parts)
+
+
+def _read(entry: pathlib.Path) -> t.List[int]:
+    with open(entry, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, version, count, escape_count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError('not an Intcode cache entry', entry)
+
+        offset = HEADER.size + 8 * count
+        if len(data) < offset:
+            raise ValueError('truncated Intcode cache entry', entry)
+
+        with memoryview(data) as view, view[HEADER.size:offset] as raw, raw.cast('q') as values:
+            program = values.tolist()
+
+        for _ in range(escape_count):
+            index, length = ESCAPE.unpack_from(data, offset)
+            offset += ESCAPE.size
+            if index >= count or offset + length > len(data):
+                raise ValueError('truncated Intcode cache entry', entry)
+            program[index] = int(data[offset:offset + length])
+            offset += length
+
+        if offset != len(data):
+            raise ValueError('Intcode cache entry of unexpected length', entry)
+
+    return program
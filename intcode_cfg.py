@@ -0,0 +1,632 @@
+"""Static analysis of Intcode programs: disassembly, basic blocks and control-flow graph.
+
+    python intcode_cfg.py input_09.txt
+
+Code is found by following all possible paths from address 0. Jumps with immediate targets
+give the edges of the graph. Targets of the other jumps are only known at runtime, they are
+taken to be immediates added or multiplied by the program, like return addresses stored before
+calls. Cells covered by no instruction found that way are data.
+
+Relative-mode parameters address the stack, which starts at the lowest cell they may address.
+It is found by interpreting the code with the relative base and values of cells known where
+they follow from the program, with functions interpreted on their own, relative to the lowest
+relative base they are called with. Programs writing their own code, or adjusting the relative
+base by values only known at runtime, may address any cell as stack.
+"""
+import collections
+import copy
+import math
+import sys
+import typing as t
+
+import intcode_cache
+from intcode import MNEMONICS, PARAMETER_COUNTS, STORING_OPCODES, Opcode, ParameterMode
+
+JUMP_OPCODES = frozenset({Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE})
+
+ARITHMETIC_OPCODES = frozenset({Opcode.ADD, Opcode.MULTIPLY})
+
+# instructions ending a basic block, execution never falls through some of them:
+TERMINATING_OPCODES = JUMP_OPCODES | {Opcode.EXIT}
+
+EVALUATE = {
+    Opcode.ADD: lambda a, b: a + b,
+    Opcode.MULTIPLY: lambda a, b: a * b,
+    Opcode.LESS_THAN: lambda a, b: 1 if a < b else 0,
+    Opcode.EQUALS: lambda a, b: 1 if a == b else 0,
+}
+
+# stands for the return address a function is called with, None for values only known at runtime:
+RETURN_ADDRESS = 'return address'
+
+Value = t.Union[int, str, None]
+
+
+class Instruction(t.NamedTuple):
+    address: int
+    opcode: Opcode
+    modes: t.Tuple[ParameterMode, ...]
+    operands: t.Tuple[int, ...]
+
+    @property
+    def length(self) -> int:
+        return 1 + len(self.operands)
+
+    @property
+    def end(self) -> int:
+        return self.address + self.length
+
+    @property
+    def cells(self) -> range:
+        return range(self.address, self.end)
+
+    def encode(self) -> t.List[int]:
+        modes = sum(mode * 10 ** (2 + i) for i, mode in enumerate(self.modes))
+        return [modes + self.opcode, *self.operands]
+
+    @property
+    def inputs(self) -> range:
+        """Indexes of the parameters read as values."""
+        return range(len(self.operands) - 1 if self.opcode in STORING_OPCODES else len(self.operands))
+
+    def reads(self) -> t.Iterator[int]:
+        """Cells read in position mode."""
+        return (self.operands[i] for i in self.inputs if self.modes[i] is ParameterMode.POSITION)
+
+    @property
+    def write(self) -> t.Optional[int]:
+        """Cell written in position mode, if any."""
+        if self.opcode in STORING_OPCODES and self.modes[-1] is ParameterMode.POSITION:
+            return self.operands[-1]
+        return None
+
+    @property
+    def reads_relative(self) -> bool:
+        return any(self.modes[i] is ParameterMode.RELATIVE for i in self.inputs)
+
+    @property
+    def writes_relative(self) -> bool:
+        return self.opcode in STORING_OPCODES and self.modes[-1] is ParameterMode.RELATIVE
+
+    @property
+    def jump_target(self) -> t.Optional[int]:
+        """Target of a jump given as immediate, if any."""
+        if self.opcode in JUMP_OPCODES and self.modes[1] is ParameterMode.IMMEDIATE:
+            return self.operands[1]
+        return None
+
+    @property
+    def condition(self) -> t.Optional[bool]:
+        """Whether a jump is taken, if known from an immediate condition."""
+        if self.opcode not in JUMP_OPCODES or self.modes[0] is not ParameterMode.IMMEDIATE:
+            return None
+        return bool(self.operands[0]) is (self.opcode is Opcode.JUMP_IF_TRUE)
+
+    @property
+    def falls_through(self) -> bool:
+        """Whether execution may continue with the following instruction."""
+        return self.opcode is not Opcode.EXIT and self.condition is not True
+
+    def __str__(self):
+        arguments = []
+        for mode, operand in zip(self.modes, self.operands):
+            if mode is ParameterMode.IMMEDIATE:
+                arguments.append(str(operand))
+            elif mode is ParameterMode.POSITION:
+                arguments.append(f'({operand})')
+            else:
+                arguments.append(f'/{operand}/')
+
+        elements = [f'{self.address:05}', f'{self.encode()[0] // 100:03}|{self.opcode.value:02}', MNEMONICS[self.opcode]]
+        if self.opcode in STORING_OPCODES:
+            *arguments, target = arguments
+            elements.extend([','.join(arguments), '-->', target])
+        else:
+            elements.append(','.join(arguments))
+        return ' '.join(element for element in elements if element)
+
+
+def decode(program: t.Sequence[int], address: int) -> t.Optional[Instruction]:
+    """Instruction at address, None if the cells there do not form a valid instruction."""
+    if not 0 <= address < len(program):
+        return None
+
+    value = program[address]
+    try:
+        opcode = Opcode(value % 100)
+        modes = tuple(ParameterMode.from_modes(value // 100, i) for i in range(PARAMETER_COUNTS[opcode]))
+    except ValueError:
+        return None
+
+    operands = tuple(program[address + 1:address + 1 + len(modes)])
+    if len(operands) < len(modes):
+        return None
+    if opcode in STORING_OPCODES and modes[-1] is ParameterMode.IMMEDIATE:
+        return None
+    return Instruction(address, opcode, modes, operands)
+
+
+class BasicBlock(t.NamedTuple):
+    start: int
+    instructions: t.Tuple[Instruction, ...]
+    #: Addresses execution may continue at after the block, as far as known.
+    successors: t.Tuple[int, ...]
+
+    @property
+    def end(self) -> int:
+        return self.instructions[-1].end
+
+    @property
+    def falls_through(self) -> bool:
+        return self.instructions[-1].falls_through
+
+    @property
+    def cells(self) -> range:
+        return range(self.start, self.end)
+
+
+class Call(t.NamedTuple):
+    """Jump to a function, storing the address execution returns to on the stack."""
+
+    function: int
+    return_address: int
+    #: Offset of the return address to the relative base the function starts with.
+    slot: int
+
+
+class ControlFlowGraph:
+    """Instructions and basic blocks of a program, with the cells it reads and writes as data."""
+
+    def __init__(self, program: t.Sequence[int]):
+        self.program = list(program)
+        self.instructions: t.Dict[int, Instruction] = {}
+        self.blocks: t.Dict[int, BasicBlock] = {}
+
+        #: Addresses of jumps with targets only known at runtime.
+        self.indirect_jumps: t.Set[int] = set()
+        #: Instructions whose addresses are used as immediates in arithmetic, possible indirect targets.
+        self.address_taken: t.Set[int] = set()
+
+        self.code_cells: t.Set[int] = set()
+        #: Cells read or written in position mode.
+        self.read_cells: t.Set[int] = set()
+        self.written_cells: t.Set[int] = set()
+
+        self._disassemble()
+        self._build_blocks()
+
+        #: Calls by start of the blocks making them.
+        self.calls: t.Dict[int, Call] = {}
+        self._find_calls()
+
+        #: Lowest cell relative-mode parameters may address, -inf for any, as with code written, inf for none.
+        self.stack_start = _StackAnalysis(self).stack_start()
+
+    @property
+    def stack_beyond_image(self) -> bool:
+        """Whether relative-mode parameters address cells beyond the program image only."""
+        return self.stack_start >= len(self.program)
+
+    def is_code(self, address: int) -> bool:
+        return address in self.code_cells
+
+    def is_data(self, address: int) -> bool:
+        return 0 <= address < len(self.program) and address not in self.code_cells
+
+    def is_stack(self, address: int) -> bool:
+        """Whether relative-mode parameters may address the cell."""
+        return address >= self.stack_start
+
+    def is_writable(self, address: int) -> bool:
+        """Whether the program may write the cell, in position mode or on the stack."""
+        return address in self.written_cells or self.is_stack(address)
+
+    def is_volatile(self, block: BasicBlock) -> bool:
+        """Whether the program reads or writes cells of the block as data."""
+        return any(
+            cell in self.read_cells or cell in self.written_cells or self.is_stack(cell) for cell in block.cells
+        )
+
+    def render(self) -> str:
+        lines = []
+        for start, block in sorted(self.blocks.items()):
+            flags = ' volatile' if self.is_volatile(block) else ''
+            flags += ' address taken' if start in self.address_taken else ''
+            successors = ', '.join(f'{s:05}' for s in block.successors)
+            lines.append(f'block {start:05} -> [{successors}]{flags}')
+            lines.extend(f'    {instruction}' for instruction in block.instructions)
+
+        data = sum(self.is_data(a) for a in range(len(self.program)))
+        lines.append(
+            f'{len(self.code_cells)} code cells, {data} data cells, {len(self.written_cells)} written cells, '
+            f'{len(self.indirect_jumps)} indirect jumps'
+        )
+        return '\n'.join(lines)
+
+    def _disassemble(self):
+        self._explore([0])
+
+        # indirect jumps go to addresses computed from immediates, like return addresses stored before calls:
+        explored = set()
+        while self.indirect_jumps:
+            candidates = set()
+            for instruction in list(self.instructions.values()):
+                if instruction.opcode in ARITHMETIC_OPCODES and instruction.address not in explored:
+                    explored.add(instruction.address)
+                    candidates.update(
+                        operand for i, operand in enumerate(instruction.operands[:2])
+                        if instruction.modes[i] is ParameterMode.IMMEDIATE and 0 <= operand < len(self.program)
+                    )
+            if not candidates - self.address_taken:
+                break
+            self.address_taken |= candidates
+            self._explore(sorted(candidates))
+        self.address_taken &= self.instructions.keys()
+
+        for instruction in self.instructions.values():
+            self.read_cells.update(instruction.reads())
+            if instruction.write is not None:
+                self.written_cells.add(instruction.write)
+
+    def _explore(self, roots: t.Iterable[int]):
+        pending = list(roots)[::-1]
+        while pending:
+            address = pending.pop()
+            if address in self.code_cells:
+                continue
+
+            instruction = decode(self.program, address)
+            if instruction is None or any(cell in self.code_cells for cell in instruction.cells):
+                continue
+
+            self.instructions[address] = instruction
+            self.code_cells.update(instruction.cells)
+
+            if instruction.opcode in JUMP_OPCODES:
+                if instruction.jump_target is None:
+                    self.indirect_jumps.add(address)
+                elif instruction.condition is not False:
+                    pending.append(instruction.jump_target)
+            if instruction.falls_through:
+                pending.append(instruction.end)
+
+    def _build_blocks(self):
+        starts = {0} | self.address_taken
+        ends = set()
+        for instruction in self.instructions.values():
+            ends.add(instruction.end)
+            if instruction.opcode in TERMINATING_OPCODES:
+                starts.add(instruction.end)
+            if instruction.jump_target is not None:
+                starts.add(instruction.jump_target)
+
+        # instructions no other one falls through to, only reached by jumps:
+        starts.update(self.instructions.keys() - ends)
+        starts &= self.instructions.keys()
+
+        for start in sorted(starts):
+            instructions = [self.instructions[start]]
+            while (
+                    instructions[-1].opcode not in TERMINATING_OPCODES
+                    and instructions[-1].end in self.instructions
+                    and instructions[-1].end not in starts
+            ):
+                instructions.append(self.instructions[instructions[-1].end])
+
+            last = instructions[-1]
+            successors = []
+            if last.jump_target is not None and last.condition is not False:
+                successors.append(last.jump_target)
+            if last.falls_through and last.end in self.instructions:
+                successors.append(last.end)
+            self.blocks[start] = BasicBlock(start, tuple(instructions), tuple(successors))
+
+    def _find_calls(self):
+        """Blocks jumping to a function after storing the start of a block on the stack, last thing before."""
+        for start, block in self.blocks.items():
+            *instructions, jump = block.instructions
+            if jump.condition is not True or jump.jump_target not in self.blocks:
+                continue
+
+            # relative base and cell of the return address, relative to the one at the start of the block:
+            base = 0
+            stored = None
+            for instruction in instructions:
+                if instruction.opcode is Opcode.ADJUST_RELATIVE_BASE:
+                    if instruction.modes[0] is not ParameterMode.IMMEDIATE:
+                        break
+                    base += instruction.operands[0]
+                elif instruction.opcode in STORING_OPCODES:
+                    stored = None
+                    if (
+                            instruction.writes_relative and instruction.opcode in EVALUATE
+                            and all(instruction.modes[i] is ParameterMode.IMMEDIATE for i in range(2))
+                    ):
+                        value = EVALUATE[instruction.opcode](*instruction.operands[:2])
+                        if value in self.blocks:
+                            stored = value, base + instruction.operands[-1]
+            else:
+                if stored is not None:
+                    return_address, cell = stored
+                    self.calls[start] = Call(jump.jump_target, return_address, cell - base)
+
+
+class _Unbounded(Exception):
+    """Relative-mode parameters may address any cell."""
+
+
+class _State:
+    """Relative base and values of cells at some point of the code, None for values only known at runtime.
+
+    The relative base is given relative to the one the code started with, as a lower bound unless
+    exact. Cells are addressed in position mode, those of the frame in relative mode, by offset to
+    the relative base the code started with. Values of cells beyond unknown_from are not known.
+    Cells not given hold their value in image, if any, else they are unknown as well.
+    """
+
+    def __init__(self, image: t.Optional[t.Sequence[int]]):
+        self.image = image
+        self.base = 0
+        self.exact = True
+        self.cells: t.Dict[int, Value] = {}
+        self.cells_unknown_from = math.inf
+        self.frame: t.Dict[int, Value] = {}
+        self.frame_unknown_from = math.inf
+
+    def copy(self) -> '_State':
+        other = copy.copy(self)
+        other.cells = dict(self.cells)
+        other.frame = dict(self.frame)
+        return other
+
+    def cell(self, address: int) -> Value:
+        if address >= self.cells_unknown_from:
+            return None
+        if address in self.cells or self.image is None:
+            return self.cells.get(address)
+        return self.image[address] if 0 <= address < len(self.image) else 0
+
+    def slot(self, offset: int) -> Value:
+        return self.frame.get(offset) if offset < self.frame_unknown_from else None
+
+    def load_relative(self, offset: int) -> Value:
+        """Value addressed by a relative-mode operand, code started with the relative base 0 sees cells."""
+        if not self.exact:
+            return None
+        return self.cell(self.base + offset) if self.image is not None else self.slot(self.base + offset)
+
+    def store_relative(self, offset: int, value: Value):
+        if not self.exact:
+            self.forget_relative(self.base + offset)
+        elif self.image is not None:
+            self.cells[self.base + offset] = value
+        else:
+            self.frame[self.base + offset] = value
+
+    def forget_relative(self, offset: int):
+        """Forget the values of cells from the one at the offset to the relative base the code started with."""
+        if self.image is not None:
+            self.cells_unknown_from = min(self.cells_unknown_from, offset)
+        else:
+            self.frame_unknown_from = min(self.frame_unknown_from, offset)
+
+    def merge(self, other: '_State') -> '_State':
+        merged = _State(self.image)
+        merged.base = min(self.base, other.base)
+        merged.exact = self.exact and other.exact and self.base == other.base
+        merged.cells_unknown_from = min(self.cells_unknown_from, other.cells_unknown_from)
+        merged.frame_unknown_from = min(self.frame_unknown_from, other.frame_unknown_from)
+        for address in self.cells.keys() | other.cells.keys():
+            value = self.cell(address)
+            merged.cells[address] = value if value == other.cell(address) else None
+        for offset in self.frame.keys() | other.frame.keys():
+            value = self.slot(offset)
+            merged.frame[offset] = value if value == other.slot(offset) else None
+        return merged
+
+    def __eq__(self, other):
+        return vars(self) == vars(other)
+
+
+class _Region:
+    """Accesses of a function or the code reached from address 0, relative to the relative base it starts with."""
+
+    def __init__(self):
+        #: Lowest offsets addressed and written in relative mode.
+        self.accessed = math.inf
+        self.written = math.inf
+        #: Cells addressed and written in position mode.
+        self.cells: t.Set[int] = set()
+        self.written_cells: t.Set[int] = set()
+        #: Lowest relative base functions are called with.
+        self.calls: t.Dict[int, float] = {}
+
+
+class _StackAnalysis:
+    """Interpretation of the code finding the lowest cell relative-mode parameters may address.
+
+    The code reached from address 0 starts with the relative base 0 and the program image in
+    memory. Functions start with a frame holding their return address only, the relative base
+    must be back where it started when they jump to it. Calls continue at their return address
+    right away, with all cells the function may write unknown. Loops lowering the relative base
+    without end, and adjustments or jumps by values only known at runtime, other than to blocks
+    whose addresses the program takes, leave the stack unbounded.
+    """
+
+    def __init__(self, cfg: ControlFlowGraph):
+        self.cfg = cfg
+        self.slots = {call.function: call.slot for call in cfg.calls.values()}
+
+        # lowest offsets written in relative mode and cells written in position mode by functions and their callees:
+        self.written = {function: math.inf for function in self.slots}
+        self.written_cells: t.Dict[int, t.Set[int]] = {function: set() for function in self.slots}
+
+    def stack_start(self) -> float:
+        cfg = self.cfg
+        # written code may address any cell, with operands only known at runtime:
+        if cfg.written_cells & cfg.code_cells:
+            return -math.inf
+        if not any(ParameterMode.RELATIVE in instruction.modes for instruction in cfg.instructions.values()):
+            return math.inf
+        try:
+            return self._stack_start()
+        except _Unbounded:
+            return -math.inf
+
+    def _stack_start(self) -> float:
+        cfg = self.cfg
+        if any(self.slots[call.function] != call.slot for call in cfg.calls.values()):
+            raise _Unbounded('return addresses in different slots')
+
+        # functions interpreted with what their callees may write, until that stays the same:
+        for _ in range(len(self.slots) + 2):
+            regions = {function: self._interpret(function) for function in [None, *self.slots]}
+            written = {function: self._written(regions[function]) for function in self.slots}
+            written_cells = {function: self._written_cells(regions[function]) for function in self.slots}
+            if (written, written_cells) == (self.written, self.written_cells):
+                break
+            self.written, self.written_cells = written, written_cells
+        else:
+            raise _Unbounded('writes of functions growing without end')
+
+        bases = self._bases(regions)
+        frames = min((bases[function] + regions[function].accessed for function in self.slots), default=math.inf)
+        if any(cell >= frames for function in self.slots for cell in regions[function].cells):
+            raise _Unbounded('functions addressing frames in position mode')
+
+        written = min([regions[None].written] + [bases[function] + self.written[function] for function in self.slots])
+        if written <= max(cfg.code_cells):
+            raise _Unbounded('code written')
+
+        return min(regions[None].accessed, frames)
+
+    def _written(self, region: _Region) -> float:
+        return min([region.written] + [base + self.written[function] for function, base in region.calls.items()])
+
+    def _written_cells(self, region: _Region) -> t.Set[int]:
+        return region.written_cells.union(*(self.written_cells[function] for function in region.calls))
+
+    def _bases(self, regions: t.Dict[t.Optional[int], _Region]) -> t.Dict[int, float]:
+        """Lowest relative base functions are called with, like in Bellman-Ford."""
+        bases = {function: math.inf for function in self.slots}
+        for _ in range(len(bases) + 1):
+            changed = False
+            for caller, region in regions.items():
+                offset = 0 if caller is None else bases[caller]
+                for function, base in region.calls.items():
+                    if offset + base < bases[function]:
+                        bases[function] = offset + base
+                        changed = True
+            if not changed:
+                return bases
+        raise _Unbounded('recursion lowering the relative base')
+
+    def _interpret(self, function: t.Optional[int]) -> _Region:
+        region = _Region()
+        start = 0 if function is None else function
+        state = _State(self.cfg.program if function is None else None)
+        if function is not None:
+            state.frame[self.slots[function]] = RETURN_ADDRESS
+
+        states = {start: state}
+        lowered = collections.Counter()
+        pending = collections.deque([start])
+        while pending:
+            address = pending.popleft()
+            for successor, state in self._step(region, self.cfg.blocks[address], states[address].copy()):
+                if successor in states:
+                    previous = states[successor]
+                    state = previous.merge(state)
+                    if state == previous:
+                        continue
+                    # more than one lower relative base per block means a loop lowering it:
+                    if (state.base, state.exact) != (previous.base, previous.exact):
+                        lowered[successor] += 1
+                        if lowered[successor] > len(self.cfg.blocks):
+                            raise _Unbounded('relative base lowered in a loop')
+                states[successor] = state
+                if successor not in pending:
+                    pending.append(successor)
+        return region
+
+    def _step(self, region: _Region, block: BasicBlock, state: _State) -> t.List[t.Tuple[int, _State]]:
+        """Interpret the block, giving the blocks execution may continue at and the state there."""
+        for instruction in block.instructions:
+            values = [self._load(region, state, instruction, i) for i in instruction.inputs]
+            opcode = instruction.opcode
+
+            if opcode is Opcode.ADJUST_RELATIVE_BASE:
+                value, = values
+                if type(value) is not int:
+                    raise _Unbounded('relative base adjusted by a value only known at runtime', instruction)
+                state.base += value
+            elif opcode in STORING_OPCODES:
+                if opcode in EVALUATE and all(type(value) is int for value in values):
+                    self._store(region, state, instruction, EVALUATE[opcode](*values))
+                else:
+                    self._store(region, state, instruction, None)
+
+        last = block.instructions[-1]
+        if block.start in self.cfg.calls:
+            call = self.cfg.calls[block.start]
+            region.calls[call.function] = min(region.calls.get(call.function, math.inf), state.base)
+            state.forget_relative(state.base + self.written[call.function])
+            for cell in self.written_cells[call.function]:
+                state.cells[cell] = None
+            return [(call.return_address, state)]
+
+        if last.opcode not in JUMP_OPCODES:
+            return [(block.end, state)] if last.falls_through and block.end in self.cfg.blocks else []
+
+        condition, target = values
+        taken = bool(condition) is (last.opcode is Opcode.JUMP_IF_TRUE) if type(condition) is int else None
+        successors = []
+        if taken is not False:
+            if type(target) is int:
+                if target not in self.cfg.blocks:
+                    raise _Unbounded('jump to unknown code', last)
+                successors.append(target)
+            elif target is RETURN_ADDRESS:
+                if not state.exact or state.base != 0:
+                    raise _Unbounded('return with another relative base', last)
+            else:
+                successors.extend(sorted(self.cfg.address_taken))
+        if taken is not True and block.end in self.cfg.blocks:
+            successors.append(block.end)
+        return [(successor, state) for successor in successors]
+
+    @staticmethod
+    def _load(region: _Region, state: _State, instruction: Instruction, index: int) -> Value:
+        mode, operand = instruction.modes[index], instruction.operands[index]
+        if mode is ParameterMode.IMMEDIATE:
+            return operand
+        if mode is ParameterMode.POSITION:
+            region.cells.add(operand)
+            return state.cell(operand)
+        region.accessed = min(region.accessed, state.base + operand)
+        return state.load_relative(operand)
+
+    @staticmethod
+    def _store(region: _Region, state: _State, instruction: Instruction, value: Value):
+        operand = instruction.operands[-1]
+        if instruction.modes[-1] is ParameterMode.POSITION:
+            region.cells.add(operand)
+            region.written_cells.add(operand)
+            state.cells[operand] = value
+        else:
+            region.accessed = min(region.accessed, state.base + operand)
+            region.written = min(region.written, state.base + operand)
+            state.store_relative(operand, value)
+
+
+def build_cfg(program: t.Sequence[int]) -> ControlFlowGraph:
+    return ControlFlowGraph(program)
+
+
+def main(args: t.List[str] = None):
+    path, = sys.argv[1:] if args is None else args
+    print(build_cfg(intcode_cache.load_program(path)).render())
+
+
+if __name__ == '__main__':
+    main()
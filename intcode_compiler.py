@@ -0,0 +1,255 @@
+"""Translation of Intcode basic blocks into specialized Python functions."""
+import collections
+import typing as t
+
+from intcode import DecodedInstruction, Intcode, Opcode, ParameterMode, State, Tracer
+
+# Compiled block: (computer, memory, flat memory, decoded cells) -> address to continue at,
+# the number of instructions it covers is found in its attribute instructions.
+Block = t.Callable[[Intcode, t.Any, t.List[int], t.Set[int]], int]
+
+# instructions left to the interpreter, blocks end right before them:
+INTERPRETED_OPCODES = frozenset({Opcode.INPUT, Opcode.OUTPUT, Opcode.EXIT})
+
+JUMP_OPCODES = frozenset({Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE})
+
+OPERATORS = {
+    Opcode.ADD: '{} + {}',
+    Opcode.MULTIPLY: '{} * {}',
+    Opcode.LESS_THAN: '1 if {} < {} else 0',
+    Opcode.EQUALS: '1 if {} == {} else 0',
+}
+
+
+class CompiledIntcode(Intcode):
+    """Intcode computer running straight-line code as compiled Python functions.
+
+    Code is split into basic blocks ending at jumps and I/O instructions. Each block is compiled
+    once into a function with all parameter modes resolved; I/O is left to the interpreter. A
+    write into compiled code ends the running block and drops all blocks covering that cell.
+    Parameters written that way are read from memory by later compilations, instructions
+    written that way are left to the interpreter. Executions with an enabled tracer are
+    interpreted.
+    """
+
+    _caches = Intcode._caches + ('_blocks', '_block_cells', '_baked_cells', '_volatile_cells')
+
+    def __init__(self, *instructions):
+        super().__init__(*instructions)
+        self.tracer = Tracer()
+
+        # compiled blocks (None if not compilable) by start address and the cells they cover:
+        self._blocks: t.Dict[int, t.Optional[Block]] = {}
+        self._block_cells: t.Dict[int, t.Set[int]] = {}
+
+        # number of compiled blocks depending on the value of a cell:
+        self._baked_cells: t.Dict[int, int] = collections.Counter()
+
+        # cells of compiled code written while running:
+        self._volatile_cells: t.Set[int] = set()
+
+    def _invalidate(self, address: int):
+        super()._invalidate(address)
+
+        if address not in self._baked_cells:
+            return
+
+        self._volatile_cells.add(address)
+        for start, cells in list(self._block_cells.items()):
+            if address in cells:
+                self._drop_block(start)
+
+    def _code_written(self, address: int) -> bool:
+        """Invalidate what was decoded from a written cell, returns whether compiled code changed."""
+        baked = address in self._baked_cells
+        self._invalidate(address)
+        return baked
+
+    def _drop_block(self, start: int):
+        del self._blocks[start]
+        for cell in self._block_cells.pop(start):
+            self._baked_cells[cell] -= 1
+            if not self._baked_cells[cell]:
+                del self._baked_cells[cell]
+
+    def _execute(self, max_outputs: int = None, max_instructions: int = None) -> t.List[int]:
+        if self.tracer.enabled:
+            return super()._execute(max_outputs, max_instructions)
+
+        self.state = State.READY
+        self._outputs = outputs = []
+        self._output_limit = max_outputs
+
+        # caches are bound to locals below, so they must not be replaced while running:
+        self._own_caches()
+        memory = self._memory
+        flat = memory.unshare_flat()
+        blocks = self._blocks
+        decoded_cells = self._decoded_cells
+
+        # blocks run to their end, so the limit may be exceeded by less than a block:
+        limited = max_instructions is not None
+        remaining = max_instructions
+
+        while not limited or remaining > 0:
+            try:
+                block = blocks[self.ip]
+            except KeyError:
+                block = self._compile(self.ip)
+
+            if block is not None:
+                self.ip = block(self, memory, flat, decoded_cells)
+                if limited:
+                    remaining -= block.instructions
+            elif self._step():
+                return outputs
+            elif limited:
+                remaining -= 1
+
+        return outputs
+
+    def _compile(self, start: int) -> t.Optional[Block]:
+        generator = _BlockGenerator(self._memory.flat_size, len(self.program))
+
+        address = start
+        while address not in self._volatile_cells:
+            try:
+                decoded = self.decode(address)
+            except ValueError:
+                break
+
+            if decoded.opcode in INTERPRETED_OPCODES:
+                break
+            if decoded.opcode in OPERATORS and decoded.modes[2] is ParameterMode.IMMEDIATE:
+                break
+
+            operands = [
+                None if a in self._volatile_cells else self._memory[a]
+                for a in range(address + 1, address + decoded.length)
+            ]
+            generator.add(address, decoded, operands)
+            address += decoded.length
+
+            if decoded.opcode in JUMP_OPCODES:
+                break
+
+        block = generator.build(start, address)
+        self._blocks[start] = block
+
+        if block is not None:
+            self._block_cells[start] = generator.baked_cells
+            self._baked_cells.update(generator.baked_cells)
+        return block
+
+
+class _BlockGenerator:
+    """Python source of one basic block."""
+
+    def __init__(self, flat_size: int, image_size: int):
+        self.flat_size = flat_size
+        self.image_size = image_size
+        self.lines: t.List[str] = []
+        self.baked_cells: t.Set[int] = set()
+        self.relative_base_changed = False
+        self.ended = False
+        self.instructions = 0
+
+    def add(self, address: int, decoded: DecodedInstruction, operands: t.List[t.Optional[int]]):
+        """Add instruction, operands are None where they have to be read at run time."""
+        self.baked_cells.add(address)
+        self.instructions += 1
+
+        # operand values as Python expressions:
+        parameters = []
+        for cell, operand in enumerate(operands, start=address + 1):
+            if operand is None:
+                parameters.append(self.read(str(cell), cell))
+            else:
+                parameters.append(repr(operand))
+                self.baked_cells.add(cell)
+
+        opcode = decoded.opcode
+        modes = decoded.modes
+        next_address = address + decoded.length
+
+        if opcode in OPERATORS:
+            value = OPERATORS[opcode].format(self.load(modes[0], parameters[0]), self.load(modes[1], parameters[1]))
+            self.store(modes[2], parameters[2], value, next_address)
+
+        elif opcode in JUMP_OPCODES:
+            condition = self.load(modes[0], parameters[0])
+            if opcode is Opcode.JUMP_IF_FALSE:
+                condition = f'not {condition}'
+            self.exit(f'{self.load(modes[1], parameters[1])} if {condition} else {next_address}')
+            self.ended = True
+
+        elif opcode is Opcode.ADJUST_RELATIVE_BASE:
+            self.lines.append(f'rb += {self.load(modes[0], parameters[0])}')
+            self.relative_base_changed = True
+
+        else:
+            raise NotImplementedError('cannot compile opcode', opcode)
+
+    def read(self, address: str, constant: int = None) -> str:
+        """Expression reading memory at address, a constant if given."""
+        if constant is not None:
+            return f'flat[{constant}]' if 0 <= constant < self.flat_size else f'mem[{constant}]'
+        return f'(flat[_r] if 0 <= (_r := {address}) < {self.flat_size} else mem[_r])'
+
+    def load(self, mode: ParameterMode, parameter: str) -> str:
+        if mode is ParameterMode.IMMEDIATE:
+            return parameter
+
+        if mode is ParameterMode.POSITION:
+            return self.read(parameter, _constant(parameter))
+
+        return self.read(f'rb + {parameter}')
+
+    def store(self, mode: ParameterMode, parameter: str, value: str, next_address: int):
+        constant = _constant(parameter) if mode is ParameterMode.POSITION else None
+
+        if constant is not None and 0 <= constant < self.flat_size:
+            address = parameter
+            self.lines.append(f'flat[{address}] = {value}')
+            if constant >= self.image_size:
+                self.lines.append(f'if mem.size <= {address}: mem.size = {constant + 1}')
+        else:
+            address = parameter if constant is not None else '_w'
+            if constant is None:
+                base = 'rb + ' if mode is ParameterMode.RELATIVE else ''
+                self.lines.append(f'_w = {base}{parameter}')
+            self.lines.append(f'mem[{address}] = {value}')
+
+        # continue interpreted after self-modification:
+        self.lines.append(f'if {address} in cells and vm._code_written({address}):')
+        self.exit(repr(next_address), indent='    ')
+
+    def exit(self, next_address: str, indent: str = ''):
+        if self.relative_base_changed:
+            self.lines.append(f'{indent}vm.relative_base = rb')
+        self.lines.append(f'{indent}return {next_address}')
+
+    def build(self, start: int, end: int) -> t.Optional[Block]:
+        if not self.lines:
+            return None
+
+        if not self.ended:
+            self.exit(repr(end))
+
+        source = '\n'.join(
+            ['def block(vm, mem, flat, cells):', '    rb = vm.relative_base']
+            + [f'    {line}' for line in self.lines]
+        )
+        namespace = {}
+        exec(compile(source, f'<intcode block {start}>', 'exec'), namespace)
+
+        block = namespace['block']
+        block.instructions = self.instructions
+        return block
+
+
+def _constant(parameter: str) -> t.Optional[int]:
+    try:
+        return int(parameter)
+    except ValueError:
+        return None
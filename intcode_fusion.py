@@ -0,0 +1,122 @@
+"""Fusion of common Intcode instruction sequences into single superinstructions."""
+import typing as t
+
+from intcode import DecodedInstruction, Intcode, Opcode, ParameterMode, Tracer
+
+ARITHMETIC_OPCODES = frozenset({Opcode.ADD})
+COMPARE_OPCODES = frozenset({Opcode.LESS_THAN, Opcode.EQUALS})
+JUMP_OPCODES = frozenset({Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE})
+
+# opcodes that may follow each other in a fused sequence, the latter reading the former's result:
+FUSIBLE = {
+    **{opcode: COMPARE_OPCODES for opcode in ARITHMETIC_OPCODES},
+    **{opcode: JUMP_OPCODES for opcode in COMPARE_OPCODES},
+}
+
+# add, compare and jump:
+MAX_FUSED_LENGTH = 4 + 4 + 3
+
+
+class FusingIntcode(Intcode):
+    """Intcode computer executing common instruction sequences as single superinstructions.
+
+    Fused are compares followed by a jump on their result, and additions followed by a compare
+    of their result, possibly followed by a jump again. All results are still stored, but one
+    dispatch runs the whole sequence. Sequences are only fused if their results go to fixed
+    addresses outside of the fused cells, a later write into them undoes the fusion. Fusion is
+    skipped while the tracer is enabled, so traces always show single instructions.
+    """
+
+    max_decoded_length = MAX_FUSED_LENGTH
+
+    def __init__(self, *instructions):
+        super().__init__(*instructions)
+        self.tracer = Tracer()
+
+    def decode(self, address: int) -> DecodedInstruction:
+        try:
+            return self._decoded[address]
+        except KeyError:
+            pass
+
+        decoded = super().decode(address)
+        if self.tracer.enabled or decoded.opcode not in FUSIBLE:
+            return decoded
+
+        fused = self._fuse(address, decoded)
+        if fused is None:
+            return decoded
+
+        self._decoded[address] = fused
+        return fused
+
+    def _fuse(self, address: int, decoded: DecodedInstruction) -> t.Optional[DecodedInstruction]:
+        parts = [decoded]
+        targets = []
+        end = address + decoded.length
+
+        while parts[-1].opcode in FUSIBLE:
+            previous = parts[-1]
+            if previous.modes[-1] is not ParameterMode.POSITION:
+                break
+            target = self._memory[end - 1]
+
+            # single instructions only, the cache may hold fused ones:
+            try:
+                following = self._decode_uncached(end)
+            except ValueError:
+                break
+            if following.opcode not in FUSIBLE[previous.opcode] or not self._reads(end, following, target):
+                break
+
+            parts.append(following)
+            targets.append(target)
+            end += following.length
+
+        # results must not change the fused instructions themselves:
+        while len(parts) > 1 and any(address <= target < end for target in targets):
+            end -= parts.pop().length
+            targets.pop()
+
+        if len(parts) == 1:
+            return None
+
+        self._decoded_cells.update(range(address, end))
+        return DecodedInstruction(
+            decoded.opcode,
+            decoded.parameter_modes,
+            decoded.modes,
+            _fused_handler(parts),
+            '+'.join(part.mnemonic for part in parts),
+            end - address,
+        )
+
+    def _reads(self, address: int, decoded: DecodedInstruction, cell: int) -> bool:
+        """Whether the instruction at address reads given cell as one of its inputs."""
+        inputs = decoded.modes[:1] if decoded.opcode in JUMP_OPCODES else decoded.modes[:2]
+        return any(
+            mode is ParameterMode.POSITION and self._memory[address + 1 + i] == cell
+            for i, mode in enumerate(inputs)
+        )
+
+
+def _fused_handler(parts: t.List[DecodedInstruction]) -> t.Callable:
+    if len(parts) == 2:
+        (handler1, modes1), (handler2, modes2) = ((p.handler, p.modes) for p in parts)
+
+        def fused(vm, modes):
+            handler1(vm, modes1)
+            vm.ip += 1
+            return handler2(vm, modes2)
+
+    else:
+        (handler1, modes1), (handler2, modes2), (handler3, modes3) = ((p.handler, p.modes) for p in parts)
+
+        def fused(vm, modes):
+            handler1(vm, modes1)
+            vm.ip += 1
+            handler2(vm, modes2)
+            vm.ip += 1
+            return handler3(vm, modes3)
+
+    return fused
@@ -0,0 +1,82 @@
+"""Intcode computer keeping memory in int64 buffers, with big integers only where needed."""
+import array
+import typing as t
+
+from intcode import FLAT_MARGIN, PAGE_BITS, PAGE_MASK, PAGE_SIZE, Intcode, PagedMemory
+
+
+class Int64Memory(PagedMemory):
+    """Paged memory with cells in int64 arrays, 8 bytes each instead of a Python int object.
+
+    Arrays reject values beyond int64, so stores need no check of their own. The first such
+    value promotes only the flat memory or the page holding its cell to a list of Python ints,
+    all other cells and copies made before stay in their arrays.
+    """
+
+    def __init__(self, image: t.Sequence[int] = ()):
+        #: Whether any cells had to switch to Python ints since the image was loaded.
+        self.promoted = False
+        super().__init__(image)
+
+    def load(self, image: t.Sequence[int]):
+        try:
+            cells = array.array('q', image)
+        except OverflowError:
+            super().load(image)
+            self.promoted = True
+            return
+
+        self.size = len(cells)
+        self.flat_size = (self.size + FLAT_MARGIN + PAGE_MASK) & ~PAGE_MASK
+        self.flat = array.array('q', [0]) * self.flat_size
+        self.flat[:self.size] = cells
+        self._pages = {}
+        self._flat_shared = False
+        self._shared_pages = set()
+        self.promoted = False
+
+    def copy(self) -> 'Int64Memory':
+        other = super().copy()
+        other.promoted = self.promoted
+        return other
+
+    def promote(self, address: int):
+        """Switch the flat memory or page holding address to Python ints, so it holds values of any size."""
+        if 0 <= address < self.flat_size:
+            if isinstance(self.flat, array.array):
+                self.flat = list(self.flat)
+                self._flat_shared = False
+        else:
+            index = address >> PAGE_BITS
+            page = self._pages.get(index)
+            if page is None or isinstance(page, array.array):
+                self._pages[index] = [0] * PAGE_SIZE if page is None else list(page)
+                self._shared_pages.discard(index)
+        self.promoted = True
+
+    def __setitem__(self, address: int, value: int):
+        try:
+            super().__setitem__(address, value)
+        except OverflowError:
+            self.promote(address)
+            super().__setitem__(address, value)
+
+    def _new_page(self) -> t.MutableSequence[int]:
+        return array.array('q', [0]) * PAGE_SIZE
+
+
+class Int64Intcode(Intcode):
+    """Intcode computer on Int64Memory, with results identical to Intcode for values of any size.
+
+    Memory is an int64 buffer for nearly all programs, typed code like NumPy can use it without
+    copying. Execution is not faster than Intcode, as every load still makes a Python int of its
+    cell. Results of additions and multiplications beyond int64 promote the memory around the
+    cell they are stored in to Python ints.
+    """
+
+    memory_type = Int64Memory
+
+    @property
+    def promoted(self) -> bool:
+        """Whether any memory had to switch to Python ints for values beyond int64."""
+        return self._memory.promoted
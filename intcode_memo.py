@@ -0,0 +1,168 @@
+"""Memoized Intcode runs: repeated runs of a program with the same inputs become lookups.
+
+Results are kept by a hash of program and inputs in a least recently used cache bounded by
+the number of cells they hold, and optionally as JSON files in a directory, so they survive
+process restarts. A hit leaves the computer in the same halted state as the run would have.
+"""
+import collections
+import hashlib
+import json
+import pathlib
+import typing as t
+
+import intcode_cache
+from intcode import Intcode, State
+
+# cells (outputs, written addresses and values) kept in memory by default:
+DEFAULT_MAX_CELLS = 1 << 20
+
+# bump to invalidate all persisted results after format changes:
+FORMAT_VERSION = 1
+
+
+class RunResult(t.NamedTuple):
+    outputs: t.List[int]
+    #: Cells differing from the program image after the run as (address, value).
+    writes: t.List[t.Tuple[int, int]]
+    memory_size: int
+    ip: int
+    relative_base: int
+
+    @property
+    def size(self) -> int:
+        """Cells held by this result, as counted against the cache size."""
+        return len(self.outputs) + 2 * len(self.writes) + 3
+
+
+class RunCache:
+    """Least recently used cache of run results, optionally backed by a directory."""
+
+    def __init__(self, max_cells: int = DEFAULT_MAX_CELLS, directory=None):
+        self.max_cells = max_cells
+        self.directory = None if directory is None else pathlib.Path(directory)
+        self.cells = 0
+        self.hits = 0
+        self.misses = 0
+        self._results: t.OrderedDict[str, RunResult] = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        """Forget all results held in memory, persisted ones are kept."""
+        self._results.clear()
+        self.cells = 0
+
+    def run(
+            self, computer: Intcode, inputs: t.Iterable[int] = None,
+            on_output: t.Callable[[int], None] = None
+    ) -> t.List[int]:
+        """Like computer.run(), but looked up if run with the same program and inputs before.
+
+        Runs reporting outputs to a callback, taking inputs from anything but a sequence or
+        tracing their execution in full are side effects of their own and always executed.
+        Only runs which halt are cached.
+        """
+        if on_output is not None or not isinstance(inputs, (list, tuple, type(None))) or computer.trace_execution:
+            return computer.run(inputs, on_output)
+
+        key = run_key(computer.program, inputs or ())
+        result = self._get(key)
+        if result is None:
+            self.misses += 1
+            outputs = computer.run(inputs)
+            if computer.state is State.HALTED:
+                self._put(key, _result(computer, outputs), persist=True)
+            return outputs
+
+        self.hits += 1
+        _apply(computer, result)
+        return list(result.outputs)
+
+    def _get(self, key: str) -> t.Optional[RunResult]:
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            return result
+
+        if self.directory is None:
+            return None
+
+        try:
+            result = _decode(json.loads(self._path(key).read_text()))
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+        self._put(key, result, persist=False)
+        return result
+
+    def _put(self, key: str, result: RunResult, persist: bool):
+        if persist and self.directory is not None:
+            try:
+                intcode_cache.write_atomically(self._path(key), json.dumps(_encode(result)).encode('ascii'))
+            except OSError:
+                pass
+
+        if result.size > self.max_cells:
+            return
+
+        self._results[key] = result
+        self.cells += result.size
+        while self.cells > self.max_cells:
+            _, evicted = self._results.popitem(last=False)
+            self.cells -= evicted.size
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f'{key}.json'
+
+
+def run_key(program: t.Sequence[int], inputs: t.Sequence[int]) -> str:
+    """Content hash identifying a run of program with given inputs."""
+    key = hashlib.sha256(','.join(map(str, program)).encode('ascii'))
+    key.update(f'|{",".join(map(str, inputs))}|{FORMAT_VERSION}'.encode('ascii'))
+    return key.hexdigest()[:32]
+
+
+def _result(computer: Intcode, outputs: t.List[int]) -> RunResult:
+    memory = computer._memory
+    return RunResult(list(outputs), memory.changes(computer.program), len(memory), computer.ip, computer.relative_base)
+
+
+def _apply(computer: Intcode, result: RunResult):
+    computer.reset()
+    memory = computer._memory
+    for address, value in result.writes:
+        memory[address] = value
+    memory.size = result.memory_size
+
+    computer.ip = result.ip
+    computer.relative_base = result.relative_base
+    computer.state = State.HALTED
+
+
+def _encode(result: RunResult) -> dict:
+    return {'version': FORMAT_VERSION, **result._asdict()}
+
+
+def _decode(data: dict) -> RunResult:
+    if not isinstance(data, dict) or data.pop('version', None) != FORMAT_VERSION:
+        raise ValueError('unsupported run result version')
+    if set(data) != set(RunResult._fields):
+        raise ValueError('unexpected run result fields', sorted(data))
+
+    outputs, writes = data['outputs'], data['writes']
+    if not isinstance(outputs, list) or not all(_is_int(output) for output in outputs):
+        raise ValueError('invalid run result outputs')
+    if not isinstance(writes, list) or not all(
+            isinstance(write, list) and len(write) == 2 and all(map(_is_int, write)) for write in writes
+    ):
+        raise ValueError('invalid run result writes')
+    if not all(_is_int(data[field]) for field in ('memory_size', 'ip', 'relative_base')):
+        raise ValueError('invalid run result registers')
+
+    data['writes'] = [tuple(write) for write in writes]
+    return RunResult(**data)
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
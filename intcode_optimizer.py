@@ -0,0 +1,224 @@
+"""Rewrite passes on Intcode programs, producing equivalent programs executing fewer instructions.
+
+    python intcode_optimizer.py input_09.txt 2
+
+Passes work on the basic blocks of intcode_cfg and leave blocks alone whose cells the program
+reads or writes as data, in position mode or on the stack relative-mode parameters may address.
+Instructions stay at their addresses unless instructions removed from a block make up for a
+jump over the freed cells, then the block is compacted. Programs are equivalent in their
+outputs; scratch cells whose stores were eliminated keep other values.
+"""
+import sys
+import typing as t
+
+import intcode_cache
+from intcode import Intcode, Opcode, ParameterMode
+from intcode_cfg import EVALUATE, ControlFlowGraph, Instruction, JUMP_OPCODES, build_cfg
+from intcode_profiler import Profiler
+
+
+class Rewrite:
+    """Instructions of the blocks passes may change, by block start, and instructions to remove."""
+
+    def __init__(self, cfg: ControlFlowGraph):
+        self.cfg = cfg
+        self.blocks: t.Dict[int, t.List[Instruction]] = {
+            start: list(block.instructions) for start, block in cfg.blocks.items() if not cfg.is_volatile(block)
+        }
+        self.removed: t.Set[int] = set()
+
+        # where execution continues after blocks falling through, if not right behind them:
+        self.fall_through_targets: t.Dict[int, int] = {}
+
+    def instructions(self) -> t.Iterator[Instruction]:
+        """Current version of all instructions, also those of blocks left alone."""
+        for start, block in self.cfg.blocks.items():
+            yield from self.blocks.get(start, block.instructions)
+
+    def layout(self, start: int) -> t.List[Instruction]:
+        """Instructions of a block at the addresses they are assembled to."""
+        instructions = self.blocks[start]
+        kept = [instruction for instruction in instructions if instruction.address not in self.removed]
+        falls_through = not kept or kept[-1].falls_through
+
+        saved = len(instructions) - len(kept) - falls_through
+        if saved <= 0:
+            return instructions
+
+        if falls_through:
+            target = self.fall_through_targets.get(start, self.cfg.blocks[start].end)
+            kept.append(_jump(0, target))
+
+        address = start
+        compacted = []
+        for instruction in kept:
+            compacted.append(instruction._replace(address=address))
+            address += instruction.length
+        return compacted
+
+    def assemble(self) -> t.List[int]:
+        program = list(self.cfg.program)
+        for start in self.blocks:
+            for instruction in self.layout(start):
+                program[instruction.address:instruction.end] = instruction.encode()
+        return program
+
+
+def propagate_constants(rewrite: Rewrite):
+    """Turn reads of cells with known values into immediates, removing jumps never taken.
+
+    Values are known for cells of the program never written and within a block for cells
+    stored to from immediates only.
+    """
+    cfg = rewrite.cfg
+    size = len(cfg.program)
+
+    for start, instructions in rewrite.blocks.items():
+        known: t.Dict[int, int] = {}
+
+        for index, instruction in enumerate(instructions):
+            modes = list(instruction.modes)
+            operands = list(instruction.operands)
+
+            for i in instruction.inputs:
+                if modes[i] is not ParameterMode.POSITION:
+                    continue
+
+                cell = operands[i]
+                if cell in known:
+                    value = known[cell]
+                elif 0 <= cell < size and not cfg.is_writable(cell):
+                    value = cfg.program[cell]
+                else:
+                    continue
+
+                # only targets known as jump targets are safe, others may be inside blocks:
+                if instruction.opcode in JUMP_OPCODES and i == 1 and value not in cfg.blocks:
+                    continue
+                modes[i], operands[i] = ParameterMode.IMMEDIATE, value
+
+            instruction = instructions[index] = instruction._replace(modes=tuple(modes), operands=tuple(operands))
+
+            if instruction.condition is False:
+                rewrite.removed.add(instruction.address)
+
+            if instruction.writes_relative:
+                known = {cell: value for cell, value in known.items() if not cfg.is_stack(cell)}
+
+            target = instruction.write
+            if target is not None:
+                known.pop(target, None)
+                if instruction.opcode in EVALUATE and all(modes[i] is ParameterMode.IMMEDIATE for i in range(2)):
+                    known[target] = EVALUATE[instruction.opcode](*operands[:2])
+
+
+def eliminate_dead_stores(rewrite: Rewrite):
+    """Remove computations stored to scratch cells which are never read.
+
+    Scratch cells are data cells of the program read by no instruction, or any cells overwritten
+    in the same block before they are read. Relative-mode reads may read any cell of the stack.
+    """
+    cfg = rewrite.cfg
+    size = len(cfg.program)
+    read = {cell for instruction in rewrite.instructions() for cell in instruction.reads()}
+
+    for instructions in rewrite.blocks.values():
+        # cells written later in the block before being read, by the next instruction:
+        overwritten: t.Set[int] = set()
+
+        for instruction in reversed(instructions):
+            target = instruction.write
+            if target is not None and instruction.opcode in EVALUATE:
+                unread = (
+                        0 <= target < size and target not in read
+                        and not cfg.is_code(target) and not cfg.is_stack(target)
+                )
+                if unread or target in overwritten:
+                    rewrite.removed.add(instruction.address)
+                    continue
+                overwritten.add(target)
+
+            if instruction.reads_relative:
+                overwritten = {cell for cell in overwritten if not cfg.is_stack(cell)}
+            overwritten.difference_update(instruction.reads())
+
+
+def remove_identity_stores(rewrite: Rewrite):
+    """Remove additions of 0 and multiplications by 1 storing the result back to the cell they read."""
+    neutral = {Opcode.ADD: 0, Opcode.MULTIPLY: 1}
+
+    for instructions in rewrite.blocks.values():
+        for instruction in instructions:
+            if instruction.opcode not in neutral:
+                continue
+
+            identity = ParameterMode.IMMEDIATE, neutral[instruction.opcode]
+            parameters = list(zip(instruction.modes, instruction.operands))
+            if parameters[2] in parameters[:2] and identity in parameters[:2]:
+                rewrite.removed.add(instruction.address)
+
+
+def thread_jumps(rewrite: Rewrite):
+    """Let jumps to unconditional jumps, or to blocks with all instructions removed, go to their final targets."""
+    cfg = rewrite.cfg
+
+    def final_target(target: int) -> int:
+        visited = set()
+        while target in rewrite.blocks and target not in visited:
+            visited.add(target)
+            if all(instruction.address in rewrite.removed for instruction in rewrite.blocks[target]):
+                if not cfg.blocks[target].falls_through:
+                    break
+                target = rewrite.fall_through_targets.get(target, cfg.blocks[target].end)
+                continue
+
+            first = rewrite.layout(target)[0]
+            if first.condition is not True or first.jump_target is None:
+                break
+            target = first.jump_target
+        return target
+
+    for start, instructions in rewrite.blocks.items():
+        for index, instruction in enumerate(instructions):
+            target = instruction.jump_target
+            if target is not None and instruction.address not in rewrite.removed:
+                threaded = final_target(target)
+                if threaded != target:
+                    operands = instruction.operands[0], threaded
+                    instructions[index] = instruction._replace(operands=operands)
+
+        block = cfg.blocks[start]
+        if block.falls_through:
+            threaded = final_target(block.end)
+            if threaded != block.end:
+                rewrite.fall_through_targets[start] = threaded
+
+
+PASSES = (propagate_constants, eliminate_dead_stores, remove_identity_stores, thread_jumps)
+
+
+def optimize(program: t.Sequence[int], passes: t.Sequence[t.Callable[[Rewrite], None]] = PASSES) -> t.List[int]:
+    rewrite = Rewrite(build_cfg(program))
+    for run_pass in passes:
+        run_pass(rewrite)
+    return rewrite.assemble()
+
+
+def _jump(address: int, target: int) -> Instruction:
+    return Instruction(address, Opcode.JUMP_IF_TRUE, (ParameterMode.IMMEDIATE,) * 2, (1, target))
+
+
+def main(args: t.List[str] = None):
+    path, *inputs = sys.argv[1:] if args is None else args
+    program = intcode_cache.load_program(path)
+    inputs = [int(i) for i in inputs]
+
+    for name, image in (('original', program), ('optimized', optimize(program))):
+        computer = Intcode(*image)
+        computer.tracer = profiler = Profiler()
+        outputs = computer.run(inputs)
+        print(f'{name:10} {profiler.total:12,} instructions, outputs {outputs}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Instruction level profiling of Intcode programs.
+
+    python intcode_profiler.py input_09.txt 2
+"""
+import collections
+import sys
+import typing as t
+
+from intcode import DecodedInstruction, Intcode, Opcode, Tracer
+
+JUMP_OPCODES = frozenset({Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE})
+
+
+class Profiler(Tracer):
+    """Counts executions per address and instruction, jump outcomes and loop iterations."""
+
+    enabled = True
+
+    def __init__(self):
+        # executions by (address, instruction) and the decoded instructions:
+        self.executions: t.Dict[t.Tuple[int, int], int] = collections.Counter()
+        self.instructions: t.Dict[int, DecodedInstruction] = {}
+
+        # executions of jump instructions by address, split into taken and not taken:
+        self.jumps_taken: t.Dict[int, int] = collections.Counter()
+        self.jumps_not_taken: t.Dict[int, int] = collections.Counter()
+
+        # taken jumps to lower addresses by (jump address, target):
+        self.back_edges: t.Dict[t.Tuple[int, int], int] = collections.Counter()
+
+        # jump executed last, with the address execution continues at if not taken:
+        self._jump: t.Optional[t.Tuple[int, int]] = None
+
+    def reset(self):
+        self.__init__()
+
+    def record(self, address, relative_base, decoded, operands, result):
+        if self._jump:
+            jump_address, fall_through = self._jump
+            if address == fall_through:
+                self.jumps_not_taken[jump_address] += 1
+            else:
+                self.jumps_taken[jump_address] += 1
+                if address <= jump_address:
+                    self.back_edges[jump_address, address] += 1
+
+        instruction = decoded.parameter_modes * 100 + decoded.opcode
+        key = address, instruction
+        self.executions[key] += 1
+        if instruction not in self.instructions:
+            self.instructions[instruction] = decoded
+
+        self._jump = (address, address + decoded.length) if decoded.opcode in JUMP_OPCODES else None
+
+    @property
+    def total(self) -> int:
+        return sum(self.executions.values())
+
+    def address_counts(self) -> t.Dict[int, int]:
+        counts = collections.Counter()
+        for (address, _), count in self.executions.items():
+            counts[address] += count
+        return counts
+
+    def instruction_histogram(self) -> t.Dict[int, int]:
+        """Executions by instruction, i.e. opcode and parameter modes."""
+        histogram = collections.Counter()
+        for (_, instruction), count in self.executions.items():
+            histogram[instruction] += count
+        return histogram
+
+    def hot_loops(self) -> t.List[t.Tuple[int, int, int, int]]:
+        """Loops as (jump address, target, iterations, executions in body), hottest first."""
+        counts = self.address_counts()
+        loops = [
+            (source, target, iterations, sum(c for a, c in counts.items() if target <= a <= source))
+            for (source, target), iterations in self.back_edges.items()
+        ]
+        return sorted(loops, key=lambda loop: loop[3], reverse=True)
+
+    def report(self, top: int = 20) -> str:
+        total = self.total or 1
+        lines = []
+
+        lines.append('=============================================')
+        lines.append('HOT ADDRESSES')
+        lines.append('ADDR      COUNT      %  INSTR  MNEMONIC')
+        lines.append('=============================================')
+        hot = sorted(self.executions.items(), key=lambda item: item[1], reverse=True)[:top]
+        for (address, instruction), count in hot:
+            lines.append(
+                f'{address:05} {count:10} {100 * count / total:6.2f} '
+                f'{instruction // 100:03}|{instruction % 100:02} {self._mnemonic(instruction)}'
+            )
+
+        lines.append('=============================================')
+        lines.append('INSTRUCTIONS')
+        lines.append('INSTR  MNEMONIC      COUNT      %')
+        lines.append('=============================================')
+        for instruction, count in sorted(self.instruction_histogram().items(), key=lambda i: i[1], reverse=True):
+            lines.append(
+                f'{instruction // 100:03}|{instruction % 100:02} {self._mnemonic(instruction):8} '
+                f'{count:10} {100 * count / total:6.2f}'
+            )
+
+        lines.append('=============================================')
+        lines.append('JUMPS')
+        lines.append('ADDR  MNEMONIC      TAKEN  NOT TAKEN')
+        lines.append('=============================================')
+        jumps = sorted(
+            set(self.jumps_taken) | set(self.jumps_not_taken),
+            key=lambda a: self.jumps_taken[a] + self.jumps_not_taken[a], reverse=True,
+        )[:top]
+        for address in jumps:
+            mnemonic = next(self._mnemonic(i) for a, i in self.executions if a == address)
+            lines.append(f'{address:05} {mnemonic:8} {self.jumps_taken[address]:10} {self.jumps_not_taken[address]:10}')
+
+        lines.append('=============================================')
+        lines.append('HOT LOOPS')
+        lines.append('FROM  TO     ITERATIONS  EXECUTIONS      %')
+        lines.append('=============================================')
+        for source, target, iterations, executions in self.hot_loops()[:top]:
+            lines.append(f'{source:05} {target:05} {iterations:10} {executions:11} {100 * executions / total:6.2f}')
+        lines.append('=============================================')
+
+        return '\n'.join(lines)
+
+    def _mnemonic(self, instruction: int) -> str:
+        return self.instructions[instruction].mnemonic
+
+
+def main(args: t.List[str] = None):
+    path, *inputs = sys.argv[1:] if args is None else args
+
+    computer = Intcode.from_file(path)
+    computer.tracer = profiler = Profiler()
+    computer.run([int(i) for i in inputs])
+
+    print(profiler.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""Recording of Intcode executions into binary files, for queries into their past.
+
+    computer.tracer = Recorder('trace.bin', computer.program)
+    computer.stack_trace_on_error = False
+    computer.run(...)
+    computer.tracer.writes_to(386), computer.tracer.memory_at(1_000_000)
+
+Every executed instruction becomes one fixed-size record. Records are buffered and appended
+to the file, queries run on the file, memory mapped by default, so long executions are never
+held in memory as a whole. Only the exact values of the rare cells beyond int64 and periodic
+copy-on-write checkpoints of memory are kept in memory.
+"""
+import functools
+import pathlib
+import struct
+import typing as t
+
+import numpy as np
+
+from intcode import DecodedInstruction, Intcode, MemoryView, PagedMemory, ParameterMode, STORING_OPCODES, Tracer
+
+# instructions between checkpoints of memory:
+DEFAULT_CHECKPOINT_INTERVAL = 100_000
+
+# records collected before they are written to the file:
+DEFAULT_BUFFER_RECORDS = 4096
+
+# ip, relative base, instruction, three operands, written address and value, flags:
+RECORD = struct.Struct('=9q')
+RECORD_DTYPE = np.dtype([
+    ('ip', 'i8'),
+    ('relative_base', 'i8'),
+    ('instruction', 'i8'),
+    ('operands', 'i8', (3,)),
+    ('target', 'i8'),
+    ('value', 'i8'),
+    ('flags', 'i8'),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+# flags of a record:
+WRITTEN = 1
+ESCAPED = 2
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+class Step(t.NamedTuple):
+    """Recorded instruction, target and value are None if it did not write to memory."""
+    ip: int
+    relative_base: int
+    instruction: int
+    operands: t.Tuple[int, ...]
+    target: t.Optional[int]
+    value: t.Optional[int]
+
+    @property
+    def decoded(self) -> DecodedInstruction:
+        return _decoded(self.instruction)
+
+
+class Recorder(Tracer):
+    """Records every executed instruction into a binary file and answers queries about them.
+
+    Steps are numbered from 0 in order of execution. Recordings follow a single line of
+    execution, so the recorded computer cannot be forked or snapshot, forks need their own
+    Recorder.
+    """
+
+    enabled = True
+
+    def __init__(
+            self, path, image: t.Sequence[int],
+            checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+            buffer_records: int = DEFAULT_BUFFER_RECORDS,
+            memory_map: bool = True,
+    ):
+        self.path = pathlib.Path(path)
+        self.image = list(image)
+        self.checkpoint_interval = checkpoint_interval
+        self.buffer_records = buffer_records
+        self.memory_map = memory_map
+
+        self.steps = 0
+        self._file = open(self.path, 'wb')
+        self._buffer = bytearray()
+        self._buffered = 0
+
+        # exact values of steps with values beyond int64 by step:
+        self._escapes: t.Dict[int, Step] = {}
+
+        # memory as of the last step and after every checkpoint_interval steps:
+        self._memory = PagedMemory(self.image)
+        self._checkpoints: t.List[PagedMemory] = [self._memory.copy()]
+
+        # sorted keys and their steps by indexed column, along with the steps they cover:
+        self._indexes: t.Dict[str, t.Tuple[int, np.ndarray, np.ndarray]] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+            self._buffered = 0
+        self._file.flush()
+
+    def fork(self) -> Tracer:
+        raise NotImplementedError('recorded computers cannot be forked, record forks with their own Recorder')
+
+    def reset(self):
+        self._file.seek(0)
+        self._file.truncate()
+        self._buffer.clear()
+        self._buffered = 0
+
+        self.steps = 0
+        self._escapes.clear()
+        self._memory = PagedMemory(self.image)
+        self._checkpoints = [self._memory.copy()]
+        self._indexes.clear()
+
+    def record(self, address, relative_base, decoded, operands, result):
+        operands = tuple(operands)
+        instruction = decoded.parameter_modes * 100 + decoded.opcode
+
+        target = None
+        flags = 0
+        if result is not None and decoded.opcode in STORING_OPCODES:
+            target = operands[-1]
+            if decoded.modes[-1] is ParameterMode.RELATIVE:
+                target += relative_base
+            self._memory[target] = result
+            flags = WRITTEN
+
+        values = [address, relative_base, instruction, *operands, *(0,) * (3 - len(operands))]
+        values += (target, result) if flags else (0, 0)
+        if any(not INT64_MIN <= value <= INT64_MAX for value in values):
+            self._escapes[self.steps] = Step(address, relative_base, instruction, operands, target, result)
+            values = [value if INT64_MIN <= value <= INT64_MAX else 0 for value in values]
+            flags |= ESCAPED
+
+        self._buffer += RECORD.pack(*values, flags)
+        self._buffered += 1
+        if self._buffered >= self.buffer_records:
+            self.flush()
+
+        self.steps += 1
+        if self.steps % self.checkpoint_interval == 0:
+            self._checkpoints.append(self._memory.copy())
+
+    def __len__(self):
+        return self.steps
+
+    def __getitem__(self, step: int) -> Step:
+        if step < 0:
+            step += self.steps
+        if not 0 <= step < self.steps:
+            raise IndexError('step out of range', step)
+        return self._step(self.records()[step], step)
+
+    def __iter__(self) -> t.Iterator[tuple]:
+        records = self.records()
+        for step in range(self.steps):
+            item = self._step(records[step], step)
+            result = item.value if item.target is not None else None
+            yield item.ip, item.relative_base, item.decoded, item.operands, result
+
+    def records(self) -> np.ndarray:
+        """All records as structured array, memory mapped from the file unless disabled."""
+        self.flush()
+        if not self.steps:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        if self.memory_map:
+            return np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', shape=(self.steps,))
+        return np.fromfile(self.path, dtype=RECORD_DTYPE, count=self.steps)
+
+    def writes_to(self, address: int) -> t.List[int]:
+        """Steps which wrote to the given address."""
+        return self._lookup('target', address)
+
+    def steps_at(self, ip: int) -> t.List[int]:
+        """Steps executing the instruction at the given address."""
+        return self._lookup('ip', ip)
+
+    def memory_at(self, step: int) -> MemoryView:
+        """Memory after the given number of steps, i.e. right before step was executed."""
+        if not 0 <= step <= self.steps:
+            raise IndexError('step out of range', step)
+
+        checkpoint = step // self.checkpoint_interval
+        memory = self._checkpoints[checkpoint].copy()
+
+        start = checkpoint * self.checkpoint_interval
+        records = self.records()[start:step]
+        offsets = np.flatnonzero(records['flags'] & WRITTEN)
+        written = records[offsets]
+        for offset, target, value, flags in zip(
+                offsets.tolist(), written['target'].tolist(), written['value'].tolist(), written['flags'].tolist()
+        ):
+            if flags & ESCAPED:
+                escaped = self._escapes[start + offset]
+                target, value = escaped.target, escaped.value
+            memory[target] = value
+        return memory.view()
+
+    def _lookup(self, column: str, key: int) -> t.List[int]:
+        covered, keys, steps = self._indexes.get(column, (-1, None, None))
+        if covered != self.steps:
+            keys, steps = self._index(column)
+            self._indexes[column] = self.steps, keys, steps
+
+        return steps[np.searchsorted(keys, key, 'left'):np.searchsorted(keys, key, 'right')].tolist()
+
+    def _index(self, column: str) -> t.Tuple[np.ndarray, np.ndarray]:
+        records = self.records()
+        if column == 'target':
+            steps = np.flatnonzero(records['flags'] & WRITTEN)
+            values = records['target'][steps]
+        else:
+            steps = np.arange(len(records))
+            values = records[column]
+
+        order = np.argsort(values, kind='stable')
+        return np.asarray(values[order]), steps[order]
+
+    def _step(self, record, step: int) -> Step:
+        if record['flags'] & ESCAPED:
+            return self._escapes[step]
+
+        decoded = _decoded(int(record['instruction']))
+        operands = tuple(record['operands'][:decoded.length - 1].tolist())
+        if record['flags'] & WRITTEN:
+            target, value = int(record['target']), int(record['value'])
+        else:
+            target = value = None
+        return Step(int(record['ip']), int(record['relative_base']), int(record['instruction']), operands, target, value)
+
+
+@functools.lru_cache(maxsize=None)
+def _decoded(instruction: int) -> DecodedInstruction:
+    computer = Intcode(instruction, 0, 0, 0)
+    computer.reset()
+    return computer.decode(0)
@@ -0,0 +1,117 @@
+"""Search of parameter spaces of Intcode programs, split across a pool of processes."""
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import typing as t
+
+from intcode import Intcode
+
+DEFAULT_CHUNK_SIZE = 100
+
+Evaluate = t.Callable[..., t.Any]
+
+# worker state, set once per process by _init_worker():
+_evaluate: Evaluate = None
+_program: t.List[int] = None
+_first_found = None
+
+
+def run_intcode(program: t.List[int], *inputs: int) -> t.List[int]:
+    """Outputs of program run with given inputs."""
+    computer = Intcode(*program)
+    computer.stack_trace_on_error = False
+    return computer.run(inputs)
+
+
+def search(
+        evaluate: Evaluate,
+        program: t.List[int],
+        grid: t.Iterable[t.Tuple[int, ...]],
+        target: t.Any,
+        first_match: bool = True,
+        workers: int = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> t.List[t.Tuple[int, ...]]:
+    """Parameters from grid for which evaluate(program, *parameters) returns target.
+
+    With first_match, only the first matching parameters in grid order are returned and
+    all work on later parameters is cancelled as soon as a match is known. evaluate must be
+    picklable, i.e. a module level function like solution_02.run_with or run_intcode.
+    """
+    chunks = list(_chunked(grid, chunk_size))
+
+    # index of the earliest chunk known to contain a match, later ones need not be searched:
+    first_found = multiprocessing.Value('q', len(chunks))
+
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        _init_worker(evaluate, program, first_found)
+        results = {i: _search_chunk(i, chunk, target, first_match) for i, chunk in enumerate(chunks)}
+    else:
+        results = _search_parallel(evaluate, program, chunks, target, first_match, workers, first_found)
+
+    matches = []
+    for index in sorted(results):
+        if results[index]:
+            matches.extend(results[index])
+            if first_match:
+                return matches[:1]
+    return matches
+
+
+def _search_parallel(evaluate, program, chunks, target, first_match, workers, first_found):
+    results = {}
+
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(evaluate, program, first_found)
+    ) as executor:
+        futures = {
+            executor.submit(_search_chunk, index, chunk, target, first_match): index
+            for index, chunk in enumerate(chunks)
+        }
+
+        for future in concurrent.futures.as_completed(futures):
+            if future.cancelled():
+                continue
+
+            index = futures[future]
+            results[index] = future.result()
+
+            if first_match and results[index]:
+                for other, other_index in futures.items():
+                    if other_index > index:
+                        other.cancel()
+
+    return results
+
+
+def _init_worker(evaluate: Evaluate, program: t.List[int], first_found):
+    global _evaluate, _program, _first_found
+    _evaluate = evaluate
+    _program = program
+    _first_found = first_found
+
+
+def _search_chunk(index: int, chunk, target, first_match: bool):
+    matches = []
+
+    for parameters in chunk:
+        if first_match and _first_found.value < index:
+            return None
+
+        if _evaluate(_program, *parameters) == target:
+            matches.append(parameters)
+
+            if first_match:
+                with _first_found.get_lock():
+                    _first_found.value = min(_first_found.value, index)
+                break
+
+    return matches
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := tuple(itertools.islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,276 @@
+"""Symbolic execution of Intcode programs, to solve for inputs instead of searching them."""
+import collections
+import itertools
+import typing as t
+
+import numpy as np
+
+from intcode import MNEMONICS, DecodedInstruction, Intcode, Opcode, ParameterMode, Tracer
+from intcode_batch import run_batch
+
+# monomial as sorted names of its variables, with repetitions:
+Monomial = t.Tuple[str, ...]
+
+Value = t.Union[int, 'Expression']
+
+# stands for instructions outside of the ones a computer executes:
+HALT = DecodedInstruction(Opcode.EXIT, 0, (), Intcode._exit, MNEMONICS[Opcode.EXIT], 1)
+
+
+class SymbolicError(Exception):
+    """Execution depends on the value of a symbolic expression."""
+
+
+class Expression:
+    """Polynomial with integer coefficients over named variables."""
+
+    __slots__ = ('terms',)
+
+    def __init__(self, terms: t.Mapping[Monomial, int]):
+        self.terms: t.Dict[Monomial, int] = {m: c for m, c in terms.items() if c}
+
+    @classmethod
+    def variable(cls, name: str) -> 'Expression':
+        return cls({(name,): 1})
+
+    @property
+    def variables(self) -> t.Set[str]:
+        return {v for monomial in self.terms for v in monomial}
+
+    @property
+    def degree(self) -> int:
+        return max(len(m) for m in self.terms)
+
+    def coefficient(self, *variables: str) -> int:
+        return self.terms.get(tuple(sorted(variables)), 0)
+
+    def evaluate(self, values: t.Mapping[str, t.Any]):
+        """Value for given variable values, which may also be NumPy arrays."""
+        result = 0
+        for monomial, coefficient in self.terms.items():
+            term = coefficient
+            for variable in monomial:
+                term = term * values[variable]
+            result = result + term
+        return result
+
+    def __add__(self, other: Value) -> Value:
+        terms = collections.Counter(self.terms)
+        terms.update(_terms(other))
+        return _simplified(terms)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> 'Expression':
+        return Expression({m: -c for m, c in self.terms.items()})
+
+    def __sub__(self, other: Value) -> Value:
+        return self + -_expression(other)
+
+    def __rsub__(self, other: Value) -> Value:
+        return -self + other
+
+    def __mul__(self, other: Value) -> Value:
+        terms = collections.Counter()
+        for (m1, c1), (m2, c2) in itertools.product(self.terms.items(), _terms(other).items()):
+            terms[tuple(sorted(m1 + m2))] += c1 * c2
+        return _simplified(terms)
+
+    __rmul__ = __mul__
+
+    def _difference(self, other: Value) -> int:
+        """Constant difference to other, if it is known regardless of the variables' values."""
+        difference = self - other
+        if isinstance(difference, Expression):
+            raise SymbolicError('comparison depends on variables', self, other)
+        return difference
+
+    def __eq__(self, other):
+        if not isinstance(other, (int, Expression)):
+            return NotImplemented
+        return self._difference(other) == 0
+
+    def __lt__(self, other: Value) -> bool:
+        return self._difference(other) < 0
+
+    def __le__(self, other: Value) -> bool:
+        return self._difference(other) <= 0
+
+    def __gt__(self, other: Value) -> bool:
+        return self._difference(other) > 0
+
+    def __ge__(self, other: Value) -> bool:
+        return self._difference(other) >= 0
+
+    def __hash__(self):
+        return hash(frozenset(self.terms.items()))
+
+    def __bool__(self):
+        raise SymbolicError('truth value depends on variables', self)
+
+    def __index__(self):
+        raise SymbolicError('used as address or instruction', self)
+
+    def __mod__(self, other):
+        raise SymbolicError('used as instruction', self)
+
+    def __repr__(self):
+        terms = []
+        for monomial, coefficient in sorted(self.terms.items(), key=lambda term: (-len(term[0]), term[0])):
+            factors = ([str(coefficient)] if coefficient != 1 or not monomial else []) + list(monomial)
+            terms.append(' * '.join(factors))
+        return ' + '.join(terms)
+
+
+def _terms(value: Value) -> t.Dict[Monomial, int]:
+    return value.terms if isinstance(value, Expression) else {(): value}
+
+
+def _expression(value: Value) -> 'Expression':
+    return value if isinstance(value, Expression) else Expression({(): value})
+
+
+def _simplified(terms: t.Mapping[Monomial, int]) -> Value:
+    expression = Expression(terms)
+    if not expression.terms:
+        return 0
+    if list(expression.terms) == [()]:
+        return expression.terms[()]
+    return expression
+
+
+class SymbolicIntcode(Intcode):
+    """Intcode computer whose memory cells and inputs may hold symbolic expressions.
+
+    Arithmetic builds expressions. Loads from symbolic addresses yield an opaque variable named
+    after the address, everything else (stores, instructions, jumps, comparisons) must not
+    depend on symbolic values or raises SymbolicError.
+    """
+
+    def __init__(self, *instructions):
+        super().__init__(*instructions)
+        self.tracer = Tracer()
+        self.stack_trace_on_error = False
+
+        #: Instruction words executed, the program halts at any other one, None for all.
+        self.instructions: t.Optional[t.Collection[int]] = None
+
+    def decode(self, address: int):
+        if self.instructions is not None and self._memory[address] not in self.instructions:
+            return HALT
+        return super().decode(address)
+
+    def run_symbolic(
+            self, variables: t.Mapping[int, str], inputs: t.Iterable[Value] = None
+    ) -> t.List[Value]:
+        """Run with given memory cells replaced by variables of given names."""
+        program = self.program
+        self.program = list(program)
+        for address, name in variables.items():
+            self.program[address] = Expression.variable(name)
+
+        try:
+            return self.run(inputs)
+        finally:
+            self.program = program
+
+    def _load(self, mode: ParameterMode) -> Value:
+        if mode is ParameterMode.IMMEDIATE:
+            return self.next_instruction()
+
+        address = self.next_instruction()
+        if mode is ParameterMode.RELATIVE:
+            address = self.relative_base + address
+
+        if isinstance(address, Expression):
+            return Expression.variable(f'mem[{address}]')
+        return self._memory[address]
+
+
+def solve(
+        expression: Value, target: int, domains: t.Mapping[str, t.Sequence[int]]
+) -> t.Optional[t.Dict[str, int]]:
+    """First variable values in order of domains for which expression equals target.
+
+    Affine expressions are solved for one variable directly, others are evaluated for all
+    combinations of values.
+    """
+    names = list(domains)
+
+    if not isinstance(expression, Expression):
+        return {name: domains[name][0] for name in names} if expression == target else None
+
+    if expression.degree > 1:
+        return _solve_by_evaluation(expression, target, domains)
+
+    # solve for the last variable with a non-zero coefficient, enumerate the others:
+    solved = [name for name in names if expression.coefficient(name)][-1]
+    coefficient = expression.coefficient(solved)
+    solved_domain = set(domains[solved])
+    others = [name for name in names if name != solved]
+
+    solutions = []
+    for values in itertools.product(*(domains[name] for name in others)):
+        assignment = dict(zip(others, values))
+        assignment[solved] = 0
+        remainder = target - expression.evaluate(assignment)
+
+        if remainder % coefficient == 0 and remainder // coefficient in solved_domain:
+            assignment[solved] = remainder // coefficient
+            solutions.append(assignment)
+            if solved == names[-1]:
+                break
+
+    return min(solutions, key=lambda s: [s[name] for name in names], default=None)
+
+
+def _solve_by_evaluation(expression, target, domains):
+    names = list(domains)
+    grid = np.array(list(itertools.product(*domains.values())), dtype=object)
+    values = expression.evaluate({name: grid[:, i] for i, name in enumerate(names)})
+
+    for index in np.flatnonzero(values == target)[:1].tolist():
+        return {name: int(grid[index, i]) for i, name in enumerate(names)}
+    return None
+
+
+def solve_program(
+        program: t.List[int],
+        variables: t.Mapping[int, str],
+        domains: t.Mapping[str, t.Sequence[int]],
+        target: int,
+        result_address: int = 0,
+        instructions: t.Collection[int] = None,
+) -> t.Optional[t.Dict[str, int]]:
+    """Values for the variable memory cells making program leave target at result_address.
+
+    Programs whose control flow or result depends on the variables in ways not expressible as
+    polynomial are searched by running them for all combinations of values instead. With
+    instructions, the program halts at any other instruction, like in run_batch().
+    """
+    computer = SymbolicIntcode(*program)
+    computer.instructions = instructions
+    try:
+        computer.run_symbolic(variables)
+        expression = computer.memory[result_address]
+    except SymbolicError:
+        expression = None
+
+    if expression is None or isinstance(expression, Expression) and not expression.variables <= set(domains):
+        return _solve_by_search(program, variables, domains, target, result_address, instructions)
+
+    return solve(expression, target, domains)
+
+
+def _solve_by_search(program, variables, domains, target, result_address, instructions):
+    names = list(domains)
+    grid = np.array(list(itertools.product(*domains.values())))
+    patches = {address: grid[:, names.index(name)] for address, name in variables.items()}
+
+    result = run_batch(program, len(grid), patches=patches, instructions=instructions)
+    found = result.memory[:, result_address] == target
+    found[list(result.errors)] = False
+
+    for index in np.flatnonzero(found)[:1].tolist():
+        return {name: int(grid[index, i]) for i, name in enumerate(names)}
+    return None
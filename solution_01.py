@@ -1,4 +1,12 @@
-import pathlib
+import itertools
+import typing as t
+
+import numpy as np
+
+# masses read and computed at once by compute_fuel_totals():
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+INT64_MAX = 2 ** 63 - 1
 
 
 def compute_fuel(mass: int) -> int:
@@ -21,11 +29,56 @@ def compute_total_fuel_iterative(mass: int) -> int:
     return fuel
 
 
+class FuelTotals(t.NamedTuple):
+    fuel: int
+    total_fuel: int
+
+
+def read_masses(path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> t.Iterator[np.ndarray]:
+    """Masses from a file with one per line, in arrays of up to chunk_size masses.
+
+    Arrays are int64, or of Python ints if masses are beyond int64.
+    """
+    with open(path) as file:
+        lines = (line for line in file if line.strip())
+        while chunk := list(itertools.islice(lines, chunk_size)):
+            try:
+                yield np.array(chunk).astype(np.int64)
+            except OverflowError:
+                yield np.array([int(line) for line in chunk], dtype=object)
+
+
+def compute_fuel_totals(masses: t.Iterable[np.ndarray]) -> FuelTotals:
+    """Sums of compute_fuel() and compute_total_fuel() over chunks of masses.
+
+    Fuel for fuel is added in vector steps over the masses still needing fuel, until none does.
+    """
+    fuel_total = 0
+    total_fuel_total = 0
+
+    for chunk in masses:
+        fuel = chunk // 3 - 2
+        fuel_total += _sum(fuel)
+
+        while len(fuel := fuel[fuel > 0]):
+            total_fuel_total += _sum(fuel)
+            fuel = fuel // 3 - 2
+
+    return FuelTotals(fuel_total, total_fuel_total)
+
+
+def _sum(values: np.ndarray) -> int:
+    """Exact sum, in int64 only if that cannot overflow."""
+    if values.dtype != object and len(values) and int(np.abs(values).max()) * len(values) > INT64_MAX:
+        values = values.astype(object)
+    return int(values.sum())
+
+
 def main():
-    masses = [int(m) for m in pathlib.Path('input_01.txt').read_text().splitlines(keepends=False)]
+    totals = compute_fuel_totals(read_masses('input_01.txt'))
 
-    print('Fuel without fuel mass', sum(compute_fuel(m) for m in masses))
-    print('Fuel with fuel mass', sum(compute_total_fuel(m) for m in masses))
+    print('Fuel without fuel mass', totals.fuel)
+    print('Fuel with fuel mass', totals.total_fuel)
 
 
 if __name__ == '__main__':
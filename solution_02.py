@@ -4,6 +4,11 @@ import operator
 import pathlib
 import typing as t
 
+import numpy as np
+
+from intcode_batch import run_batch
+from intcode_symbolic import solve_program
+
 
 @enum.unique
 class Opcode(enum.IntEnum):
@@ -41,23 +46,52 @@ def run_with(program: t.List[int], noun: int, verb: int) -> int:
     return ram[0]
 
 
+# like run(), other instructions stop the program, keeping what it computed so far:
+INSTRUCTIONS = frozenset(OPERATIONS) | {Opcode.EXIT}
+
+
 def brute_force(program: t.List[int], output: int) -> t.Tuple[int, int]:
-    for noun in range(100):
-        for verb in range(100):
-            if run_with(program, noun, verb) == output:
-                print(f'program({noun}, {verb})={output}')
-                return noun, verb
+    nouns, verbs = np.divmod(np.arange(100 * 100), 100)
+    result = run_batch(program, len(nouns), patches={1: nouns, 2: verbs}, instructions=INSTRUCTIONS)
+
+    # instances handed to the full Intcode computer are checked again by run():
+    candidates = (result.memory[:, 0] == output) | np.isin(np.arange(len(nouns)), list(result.errors))
+
+    for index in np.flatnonzero(candidates).tolist():
+        noun, verb = int(nouns[index]), int(verbs[index])
+        if run_with(program, noun, verb) == output:
+            print(f'program({noun}, {verb})={output}')
+            return noun, verb
 
     print(f'No combination found to produce {output}.')
     return -1, -1
 
 
+def solve(program: t.List[int], output: int) -> t.Tuple[int, int]:
+    """Like brute_force(), but solving for noun and verb symbolically where possible."""
+    domains = {'noun': range(100), 'verb': range(100)}
+    values = solve_program(program, {1: 'noun', 2: 'verb'}, domains, output, instructions=INSTRUCTIONS)
+    if values is None:
+        print(f'No combination found to produce {output}.')
+        return -1, -1
+
+    if run_with(program, values['noun'], values['verb']) != output:
+        return brute_force(program, output)
+
+    print(f'program({values["noun"]}, {values["verb"]})={output}')
+    return values['noun'], values['verb']
+
+
+def load_program() -> t.List[int]:
+    return [int(c) for c in pathlib.Path('input_02.txt').read_text().split(',')]
+
+
 def main():
-    program = [int(c) for c in pathlib.Path('input_02.txt').read_text().split(',')]
+    program = load_program()
 
     print('Result with 1202 state:', run_with(program, 12, 2))
 
-    noun, verb = brute_force(program, 19690720)
+    noun, verb = solve(program, 19690720)
     print('Result code:', 100 * noun + verb)
 
 
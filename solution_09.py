@@ -1,10 +1,17 @@
-from intcode import Intcode
+import pathlib
+
+import intcode_cache
+from intcode_compiler import CompiledIntcode
+from intcode_memo import RunCache
+
+RUNS_DIRECTORY = pathlib.Path(intcode_cache.CACHE_DIRECTORY) / 'runs'
 
 
 def main():
-    boost = Intcode.from_file('input_09.txt')
-    print('BOOST keycode:', boost(1))
-    print('BOOST coordinates of the distress signal:', boost(2))
+    boost = CompiledIntcode.from_file('input_09.txt')
+    runs = RunCache(directory=RUNS_DIRECTORY)
+    print('BOOST keycode:', runs.run(boost, [1]))
+    print('BOOST coordinates of the distress signal:', runs.run(boost, [2]))
     # boost.print_trace()
 
 
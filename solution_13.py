@@ -1,8 +1,10 @@
-import collections
 import enum
 import typing as t
 
+import numpy as np
+
 from intcode import Intcode
+from intcode_compiler import CompiledIntcode
 
 
 @enum.unique
@@ -14,27 +16,107 @@ class TileId(enum.IntEnum):
     BALL = 4
 
 
-Vector = collections.namedtuple('Vector', 'x y')
+# screen position of score updates:
+SCORE_POSITION = (-1, 0)
 
+Position = t.Tuple[int, int]
 
-def track_screen(control_codes: t.Iterable[int], tracked_tile_id: TileId) -> t.Set[Vector]:
-    coordinates = set()
-    control_code_iter = iter(control_codes)
 
-    try:
-        while True:
-            vector = next(control_code_iter), next(control_code_iter)
-            tile_id = TileId(next(control_code_iter))
+class Screen:
+    """Framebuffer of tile ids, keeping score, tile counts and ball and paddle positions up to date.
 
-            if tile_id is tracked_tile_id:
-                coordinates.add(vector)
-            else:
-                try:
-                    coordinates.remove(vector)
-                except KeyError:
-                    pass
-    except StopIteration:
-        return coordinates
+    Tiles are stored row by row in a bytearray, tiles is a NumPy view on it for bulk access.
+    The screen grows as tiles beyond its size are drawn.
+    """
+
+    def __init__(self, width: int = 0, height: int = 0):
+        self.width = width
+        self.height = height
+        self._buffer = bytearray(width * height)
+        self.tiles = np.frombuffer(self._buffer, dtype=np.uint8).reshape(height, width)
+
+        self.counts = [width * height] + [0] * (len(TileId) - 1)
+        self.score = 0
+        self.ball: t.Optional[Position] = None
+        self.paddle: t.Optional[Position] = None
+
+    def count(self, tile_id: TileId) -> int:
+        return self.counts[tile_id]
+
+    def update(self, x: int, y: int, tile_id: int):
+        """Draw a single tile or update the score."""
+        if x == -1 and y == 0:
+            self.score = tile_id
+            return
+
+        if not 0 <= tile_id < len(self.counts):
+            raise ValueError('unknown tile id', tile_id)
+        if x < 0 or y < 0:
+            raise ValueError('position outside of screen', x, y)
+        if x >= self.width or y >= self.height:
+            self._grow(x + 1, y + 1)
+
+        index = y * self.width + x
+        counts = self.counts
+        counts[self._buffer[index]] -= 1
+        counts[tile_id] += 1
+        self._buffer[index] = tile_id
+
+        if tile_id == TileId.BALL:
+            self.ball = x, y
+        elif self.ball == (x, y):
+            self.ball = None
+
+        if tile_id == TileId.HPADDLE:
+            self.paddle = x, y
+        elif self.paddle == (x, y):
+            self.paddle = None
+
+    def update_all(self, values: t.Sequence[int]):
+        """Apply a sequence of flattened (x, y, tile id) triples at once, later ones winning."""
+        x, y, tile_ids = np.asarray(values, dtype=np.int64).reshape(-1, 3).T
+
+        is_score = (x == SCORE_POSITION[0]) & (y == SCORE_POSITION[1])
+        if is_score.any():
+            self.score = int(tile_ids[is_score][-1])
+        x, y, tile_ids = x[~is_score], y[~is_score], tile_ids[~is_score]
+        if not len(x):
+            return
+
+        if (tile_ids < 0).any() or (tile_ids >= len(self.counts)).any():
+            raise ValueError('unknown tile ids', np.unique(tile_ids))
+        if (x < 0).any() or (y < 0).any():
+            raise ValueError('positions outside of screen')
+        if x.max() >= self.width or y.max() >= self.height:
+            self._grow(int(x.max()) + 1, int(y.max()) + 1)
+
+        # last write of each position is the first one in reversed order:
+        indices, first = np.unique((y * self.width + x)[::-1], return_index=True)
+        pixels = self.tiles.reshape(-1)
+        pixels[indices] = tile_ids[::-1][first]
+
+        self.counts = np.bincount(pixels, minlength=len(TileId)).tolist()
+        self.ball = self._find(TileId.BALL)
+        self.paddle = self._find(TileId.HPADDLE)
+
+    def _find(self, tile_id: TileId) -> t.Optional[Position]:
+        found = np.flatnonzero(self.tiles.reshape(-1) == tile_id)
+        if not len(found):
+            return None
+        y, x = divmod(int(found[-1]), self.width)
+        return x, y
+
+    def _grow(self, width: int, height: int):
+        width = max(width, self.width)
+        height = max(height, self.height)
+
+        buffer = bytearray(width * height)
+        tiles = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width)
+        tiles[:self.height, :self.width] = self.tiles
+
+        self.counts[TileId.EMPTY] += width * height - self.width * self.height
+        self.width, self.height = width, height
+        self._buffer, self.tiles = buffer, tiles
 
 
 @enum.unique
@@ -47,24 +129,22 @@ class JoystickPosition(enum.IntEnum):
 class Player:
 
     def __init__(self):
-        self.score = 0
         self.game = None
 
         self.reset()
 
     def reset(self):
-        self._last_output = [0, 0, 0]
-        self._last_output_index = 0
-        self.width = 0
-        self.height = 0
+        self.screen = Screen()
         self.game_running = False
-        self.paddle_position = None
-        self.ball_position = None
+
+    @property
+    def score(self) -> int:
+        return self.screen.score
 
     @property
     def joystick(self):
         while True:
-            difference = self.paddle_position.x - self.ball_position.x
+            difference = self.screen.paddle[0] - self.screen.ball[0]
             if difference > 0:
                 yield JoystickPosition.LEFT
             elif difference < 0:
@@ -72,54 +152,35 @@ class Player:
             else:
                 yield JoystickPosition.NEUTRAL
 
-    def on_output(self, value):
-        self._last_output[self._last_output_index] = value
-        self._last_output_index += 1
-
-        if self._last_output_index == 3:
-            self._on_screen_instruction(*self._last_output)
-            self._last_output_index = 0
-
     def play(self, game: Intcode):
         self.game = game
         self.reset()
 
-        game.run(self.joystick, self.on_output)
+        for x, y, code in game.stream(self.joystick, size=3):
+            self._on_screen_instruction(x, y, code)
 
     def _on_screen_instruction(self, x, y, code):
-        if (x, y) == (-1, 0):
-            self.score = code
+        self.screen.update(x, y, code)
+
+        if (x, y) == SCORE_POSITION:
             print(f'New score: {self.score}')
 
             if not self.game_running:
                 self._on_game_started()
-        else:
-            self._on_tile(Vector(x, y), TileId(code))
-
-    def _on_tile(self, vector, tile_id):
-        self.width = max(self.width, vector.x)
-        self.height = max(self.height, vector.y)
-
-        if tile_id is TileId.BALL:
-            print('Ball: ', vector)
-            self.ball_position = vector
-        elif tile_id is TileId.HPADDLE:
-            # print('Paddle: ', vector)
-            self.paddle_position = vector
+        elif code == TileId.BALL:
+            print('Ball: ', self.screen.ball)
 
     def _on_game_started(self):
-        self.width += 1
-        self.height += 1
-
-        print(f'Game started with screen size {self.width} x {self.height}.')
+        print(f'Game started with screen size {self.screen.width} x {self.screen.height}.')
 
         self.game_running = True
 
 
 def main():
-    arcade = Intcode.from_file('input_13.txt')
-    screen_control_sequences = arcade()
-    print('number of block tiles:', len(track_screen(screen_control_sequences, TileId.BLOCK)))
+    arcade = CompiledIntcode.from_file('input_13.txt')
+    screen = Screen()
+    screen.update_all(arcade())
+    print('number of block tiles:', screen.count(TileId.BLOCK))
 
     arcade.program[0] = 2
     player = Player()
@@ -1,9 +1,14 @@
 import collections
+import concurrent.futures
 import enum
 import math
+import multiprocessing
+import multiprocessing.managers
+import threading
 import typing as t
 
-from intcode import Intcode
+from flood_fill import Grid, flood_fill
+from intcode import Intcode, Tracer
 
 
 @enum.unique
@@ -21,126 +26,242 @@ class Command(enum.IntEnum):
     EAST = 4
 
 
+OPPOSITE = {
+    Command.NORTH: Command.SOUTH,
+    Command.SOUTH: Command.NORTH,
+    Command.WEST: Command.EAST,
+    Command.EAST: Command.WEST,
+}
+
 Vector = collections.namedtuple('Vector', 'x y')
 
+START = Vector(0, 0)
 
-class HitWallError(Exception):
-    """Droid hit a wall."""
+WALL = '#'
+OPEN = '.'
+OXYGEN_SYSTEM = '*'
 
 
-class FoundGoal(Exception):
-    """Goal found."""
+def position_after_move(position: Vector, command: Command) -> Vector:
+    x, y = position
+    if command is Command.NORTH:
+        y += 1
+    elif command is Command.SOUTH:
+        y -= 1
+    elif command is Command.WEST:
+        x -= 1
+    elif command is Command.EAST:
+        x += 1
+    else:
+        raise NotImplementedError('unexpected command', command)
+    return Vector(x, y)
 
 
-class DroidController:
+class Maze:
+    """Cells discovered by the droid by position, unexplored cells are missing."""
 
     def __init__(self):
-        self.path: t.List[Vector] = [Vector(0, 0)]
-        self.commands = None
-
-    @property
-    def position(self):
-        return self.path[-1]
-
-    def position_after_move(self, command: Command):
-        x, y = self.position
-        if command is Command.NORTH:
-            y += 1
-        elif command is Command.SOUTH:
-            y -= 1
-        elif command is Command.WEST:
-            x -= 1
-        elif command is Command.EAST:
-            x += 1
+        self.cells: t.Dict[Vector, str] = {START: OPEN}
+        self.oxygen_system: t.Optional[Vector] = None
+
+    def __setitem__(self, position: Vector, cell: str):
+        self.cells[position] = cell
+        if cell == OXYGEN_SYSTEM:
+            self.oxygen_system = position
+
+    def grid_position(self, position: Vector) -> t.Tuple[int, int]:
+        """Position in to_grid(), which has north at the top."""
+        x_min = min(x for x, _ in self.cells)
+        y_max = max(y for _, y in self.cells)
+        return position.x - x_min, y_max - position.y
+
+    def to_grid(self) -> Grid:
+        x_min = min(x for x, _ in self.cells)
+        x_max = max(x for x, _ in self.cells)
+        y_min = min(y for _, y in self.cells)
+        y_max = max(y for _, y in self.cells)
+
+        return Grid.from_rows([
+            ''.join(self.cells.get(Vector(x, y), ' ') for x in range(x_min, x_max + 1))
+            for y in range(y_max, y_min - 1, -1)
+        ])
+
+    def oxygen_distance(self) -> float:
+        """Length of the shortest path from the start to the oxygen system."""
+        if self.oxygen_system is None:
+            return math.inf
+
+        goal = self.grid_position(self.oxygen_system)
+        fill = flood_fill(self.to_grid(), [self.grid_position(START)], walls=WALL + ' ', goal=goal)
+        return fill.distance(goal)
+
+    def render(self) -> str:
+        grid = self.to_grid()
+        grid[self.grid_position(START)] = '+'
+        return grid.render()
+
+
+def explore(droid: Intcode) -> Maze:
+    """Map the whole maze with a single droid, moving depth first and back again.
+
+    Every passage is walked at most twice, once forward and once back.
+    """
+    droid.reset()
+    maze = Maze()
+    position = START
+
+    # commands that led to position, reversed on the way back:
+    path: t.List[Command] = []
+
+    while True:
+        for command in Command:
+            next_position = position_after_move(position, command)
+            if next_position not in maze.cells:
+                break
         else:
-            raise NotImplementedError('unexpected command', command)
-        return Vector(x, y)
+            if not path:
+                return maze
 
-    def on_input(self):
-        for command in self.commands:
-            self.path.append(self.position_after_move(command))
-            yield command
+            command = OPPOSITE[path.pop()]
+            droid.resume(command, max_outputs=1)
+            position = position_after_move(position, command)
+            continue
 
-    def on_output(self, value):
-        output = Output(value)
+        output = Output(*droid.resume(command, max_outputs=1))
 
         if output is Output.HIT_WALL:
-            raise HitWallError()
+            maze[next_position] = WALL
+        else:
+            maze[next_position] = OXYGEN_SYSTEM if output is Output.MOVED_AND_FOUND else OPEN
+            position = next_position
+            path.append(command)
+
+
+# cells one worker probes before handing the rest of its branch back to the coordinator:
+DEFAULT_BUDGET = 200
+
+
+class Claims:
+    """Cells claimed for probing, growing with the maze, shared by processes through a manager."""
+
+    def __init__(self):
+        self._cells: t.Set[Vector] = set()
+        self._lock = threading.Lock()
+
+    def claim(self, position: Vector):
+        with self._lock:
+            self._cells.add(position)
+
+    def claim_neighbour(self, position: Vector) -> t.Optional[Command]:
+        """Claim the first neighbour of position not claimed before, returns the move to it."""
+        with self._lock:
+            for command in Command:
+                neighbour = position_after_move(position, command)
+                if neighbour not in self._cells:
+                    self._cells.add(neighbour)
+                    return command
+        return None
 
-        elif output is Output.MOVED_AND_FOUND:
-            distance = len(self.path) - 1
+    def finished(self, position: Vector) -> bool:
+        """Whether all neighbours of position are claimed, which they stay once they are."""
+        return all(position_after_move(position, command) in self._cells for command in Command)
 
-            print(f'Found goal at {self.position} after {distance} steps.')
-            raise FoundGoal()
 
-    def control(self, doid: Intcode, commands: t.Iterable[Command]):
-        self.commands = commands
-        doid.run(self.on_input(), self.on_output)
+class _ClaimsManager(multiprocessing.managers.BaseManager):
+    pass
 
 
-positions = dict()
+_ClaimsManager.register('Claims', Claims)
 
-x_min = 0
-x_max = 0
-y_min = 0
-y_max = 0
 
+def explore_parallel(droid: Intcode, workers: int = None, budget: int = DEFAULT_BUDGET) -> Maze:
+    """Map the whole maze with droids explored in parallel by a pool of worker processes.
 
-def find_shortest_path_length(commands, droid):
-    global x_min, x_max, y_min, y_max
+    The coordinator owns the map and a frontier of droids standing at cells with unexplored
+    neighbours. Each worker explores depth first from such a droid, up to budget cells, then
+    walks back and returns what it found together with snapshots of the droid at cells of its
+    branch left to explore. Cells are claimed in a set shared by all processes before they are
+    probed, so no cell is ever probed twice.
+    """
+    droid.reset()
 
-    controller = DroidController()
+    maze = Maze()
+    frontier = collections.deque([(START, droid.snapshot())])
 
-    try:
-        controller.control(droid, commands)
+    workers = workers or multiprocessing.cpu_count()
+    if workers == 1:
+        claims = Claims()
+        claims.claim(START)
+        while frontier:
+            _merge(maze, frontier, _explore_from(*frontier.popleft(), budget, claims))
+        return maze
 
-    except HitWallError:
-        positions[controller.position] = '#'
-        return math.inf
+    with _ClaimsManager() as manager, concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        claims = manager.Claims()
+        claims.claim(START)
+        pending = set()
 
-    except FoundGoal:
-        print(f'*** FOUND at {controller.position} ***')
-        positions[controller.position] = '*'
-        return len(controller.path)
+        while frontier or pending:
+            while frontier:
+                pending.add(executor.submit(_explore_from, *frontier.popleft(), budget, claims))
 
-    except StopIteration:
-        # ran out of commands, try next direction from here:
-        positions[controller.position] = '.'
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                _merge(maze, frontier, future.result())
 
-        distance = math.inf
-        for command in (Command.NORTH, Command.EAST, Command.SOUTH, Command.WEST):
-            next_position = controller.position_after_move(command)
-            if next_position not in controller.path:
-                positions[next_position] = '?'
-                x_min = min(next_position.x, x_min)
-                x_max = max(next_position.x, x_max)
-                y_min = min(next_position.y, y_min)
-                y_max = max(next_position.y, y_max)
-                distance = min(distance, find_shortest_path_length(commands + [command], droid))
-        return distance
+    return maze
 
-    finally:
-        print_map()
 
+def _merge(maze: Maze, frontier: t.Deque, result):
+    cells, unfinished = result
+    for position, cell in cells.items():
+        maze[position] = cell
+    frontier.extend(unfinished)
 
-def print_map():
-    for y in range(y_max, y_min - 1, -1):
-        row = ''
-        for x in range(x_min, x_max + 1):
-            if x == y == 0:
-                row += '+'
-            else:
-                tile = positions.get(Vector(x, y), ' ')
-                row += tile
-        print(row)
 
-    print('---------------------------------------------------')
+def _explore_from(position: Vector, droid: Intcode, budget: int, claims: Claims):
+    """Cells found exploring from position and droids at open cells left to explore."""
+    cells = {}
+    unfinished = []
+    branch: t.List[Command] = []
+
+    while True:
+        command = claims.claim_neighbour(position) if budget else None
+        if command is None:
+            if not budget and not claims.finished(position):
+                unfinished.append((position, droid.snapshot()))
+            if not branch:
+                return cells, unfinished
+
+            command = OPPOSITE[branch.pop()]
+            droid.resume(command, max_outputs=1)
+            position = position_after_move(position, command)
+            continue
+
+        budget -= 1
+        next_position = position_after_move(position, command)
+        output = Output(*droid.resume(command, max_outputs=1))
+
+        if output is Output.HIT_WALL:
+            cells[next_position] = WALL
+        else:
+            cells[next_position] = OXYGEN_SYSTEM if output is Output.MOVED_AND_FOUND else OPEN
+            position = next_position
+            branch.append(command)
+
+
+def find_shortest_path_length(droid: Intcode) -> float:
+    return explore(droid).oxygen_distance()
 
 
 def main():
     droid = Intcode.from_file('input_15.txt')
     droid.stack_trace_on_error = False
-    print('Shortest path length:', find_shortest_path_length([], droid) - 1)
+    droid.tracer = Tracer()
+
+    maze = explore(droid)
+    print('Shortest path length:', maze.oxygen_distance())
+    print(maze.render())
 
 
 if __name__ == '__main__':
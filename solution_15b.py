@@ -1,3 +1,5 @@
+from flood_fill import Grid, flood_fill
+
 RAW_MAP = [
     ' ### ### ############# # ########### ### ',
     '#   #   #             # #           #   #',
@@ -42,51 +44,31 @@ RAW_MAP = [
     ' ### ########### ####### ####### ####### ',
 ]
 
-MAP = [list(row) for row in RAW_MAP]
+MAP = Grid.from_rows(RAW_MAP)
 
 WIDTH = 41
 HEIGHT = 41
 
-assert len(MAP) == HEIGHT
-assert all(len(row) == WIDTH for row in MAP)
+assert (MAP.width, MAP.height) == (WIDTH, HEIGHT)
 
 
 def find_start():
-    for y in range(HEIGHT):
-        try:
-            return MAP[y].index('O'), y
-        except ValueError:
-            pass
-
-
-def print_map():
-    print('-----------------------------------------------')
-    for y in range(HEIGHT):
-        print(''.join(MAP[y]))
-
+    return MAP.find('O')[0]
 
-def fill(pos):
-    print_map()
 
-    duration = 0
+def fill(pos) -> int:
+    """Time for oxygen to spread from pos into all open cells."""
+    return flood_fill(MAP, [pos]).time
 
-    for delta_pos in ((-1, 0), (1, 0), (0, -1), (0, 1)):
-        x = pos[0] + delta_pos[0]
-        y = pos[1] + delta_pos[1]
 
-        if 0 <= x < WIDTH and 0 <= y < HEIGHT:
-            row = MAP[y]
-            if row[x] == ' ':
-                row[x] = 'O'
-                duration = max(duration, 1 + fill((x, y,)))
-
-    return duration
-
-
-def main():
+def main(render: bool = False):
     start = find_start()
     print(start)
-    print('Duration to fill', fill(start))
+
+    oxygen = flood_fill(MAP, [start])
+    if render:
+        print(MAP.render(oxygen))
+    print('Duration to fill', oxygen.time)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,10 @@
-from solution_01 import compute_fuel, compute_total_fuel, compute_total_fuel_iterative
+import random
+
+import numpy as np
+
+from solution_01 import (
+    compute_fuel, compute_fuel_totals, compute_total_fuel, compute_total_fuel_iterative, read_masses
+)
 
 
 def test__compute_fuel():
@@ -18,3 +24,40 @@ def test__compute_total_fuel_iterative():
     assert compute_total_fuel_iterative(14) == 2
     assert compute_total_fuel_iterative(1969) == 966
     assert compute_total_fuel_iterative(100756) == 50346
+
+
+def test__compute_fuel_totals():
+    rng = random.Random(1)
+    masses = [rng.randrange(-10, 10 ** 9) for _ in range(1000)] + [0, 1, 6, 8, 9, 14]
+    chunks = [np.array(masses[i:i + 100]) for i in range(0, len(masses), 100)]
+
+    assert compute_fuel_totals(chunks) == (
+        sum(compute_fuel(m) for m in masses),
+        sum(compute_total_fuel_iterative(m) for m in masses),
+    )
+
+
+def test__compute_fuel_totals__beyond_int64():
+    masses = [2 ** 62, 2 ** 62 + 5, 2 ** 62 - 7] * 10
+    assert compute_fuel_totals([np.array(masses)]) == (
+        sum(compute_fuel(m) for m in masses),
+        sum(compute_total_fuel_iterative(m) for m in masses),
+    )
+
+
+def test__read_masses(tmp_path):
+    path = tmp_path / 'masses.txt'
+    path.write_text('12\n14\n\n1969\n100756\n')
+
+    assert [chunk.tolist() for chunk in read_masses(path, chunk_size=3)] == [[12, 14, 1969], [100756]]
+    assert compute_fuel_totals(read_masses(path, chunk_size=3)) == (34241, 51316)
+
+
+def test__read_masses__big_ints(tmp_path):
+    path = tmp_path / 'masses.txt'
+    path.write_text(f'12\n{10 ** 30}\n')
+
+    assert compute_fuel_totals(read_masses(path)) == (
+        compute_fuel(12) + compute_fuel(10 ** 30),
+        compute_total_fuel_iterative(12) + compute_total_fuel_iterative(10 ** 30),
+    )
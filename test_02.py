@@ -1,4 +1,6 @@
-from solution_02 import run
+import pytest
+
+from solution_02 import brute_force, load_program, run, run_with, solve
 
 
 def test__run():
@@ -6,3 +8,18 @@ def test__run():
     assert run([2, 3, 0, 3, 99]) == [2, 3, 0, 6, 99]
     assert run([2, 4, 4, 5, 99, 0]) == [2, 4, 4, 5, 99, 9801]
     assert run([1, 1, 1, 4, 99, 5, 6, 0, 99]) == [30, 1, 1, 4, 2, 5, 6, 0, 99]
+
+
+@pytest.mark.parametrize('unknown_opcode', [98, 1001])
+def test__brute_force__stops_at_unknown_opcode(unknown_opcode):
+    # stops after memory[0] = memory[noun] + memory[verb], for noun = verb = 0 that is 1 + 1:
+    program = [1, 0, 0, 0, unknown_opcode, 0, 5, 0, 99]
+    assert run_with(program, 0, 0) == 2
+    assert brute_force(program, 2) == (0, 0)
+    assert solve(program, 2) == (0, 0)
+
+
+def test__brute_force():
+    program = load_program()
+    noun, verb = brute_force(program, 19690720)
+    assert run_with(program, noun, verb) == 19690720
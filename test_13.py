@@ -0,0 +1,43 @@
+import random
+
+from intcode import Intcode
+from solution_13 import Screen, TileId
+
+
+def test__screen__update():
+    screen = Screen()
+    screen.update(2, 1, TileId.BLOCK)
+    screen.update(0, 0, TileId.BALL)
+    screen.update(-1, 0, 42)
+    assert (screen.width, screen.height) == (3, 2)
+    assert screen.counts == [4, 0, 1, 0, 1]
+    assert screen.ball == (0, 0)
+    assert screen.score == 42
+
+    screen.update(0, 0, TileId.EMPTY)
+    assert screen.ball is None
+    assert screen.tiles.tolist() == [[0, 0, 0], [0, 0, 2]]
+
+
+def test__screen__update_all_matches_updates():
+    rng = random.Random(13)
+    values = []
+    for _ in range(500):
+        values.extend((rng.randrange(10), rng.randrange(5), rng.randrange(len(TileId))))
+    values.extend((-1, 0, 7))
+
+    screen = Screen()
+    for i in range(0, len(values), 3):
+        screen.update(*values[i:i + 3])
+
+    bulk = Screen()
+    bulk.update_all(values)
+    assert bulk.tiles.tolist() == screen.tiles.tolist()
+    assert bulk.counts == screen.counts
+    assert bulk.score == screen.score == 7
+
+
+def test__screen__day_13():
+    screen = Screen()
+    screen.update_all(Intcode.from_file('input_13.txt')())
+    assert screen.count(TileId.BLOCK) == 306
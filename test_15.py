@@ -0,0 +1,51 @@
+from flood_fill import flood_fill
+from intcode import Intcode
+from solution_15 import START, WALL, Command, explore, explore_parallel, position_after_move
+
+
+def test__explore():
+    droid = Intcode.from_file('input_15.txt')
+    maze = explore(droid)
+    assert maze.oxygen_distance() == 308
+
+    # all neighbours of open cells explored:
+    assert all(
+        position_after_move(position, command) in maze.cells
+        for position, cell in maze.cells.items() if cell != WALL
+        for command in Command
+    )
+
+    grid = maze.to_grid()
+    assert grid[maze.grid_position(START)] == '.'
+    assert flood_fill(grid, [maze.grid_position(maze.oxygen_system)], walls='# ').time == 328
+
+
+def test__explore_parallel():
+    droid = Intcode.from_file('input_15.txt')
+    expected = explore(droid.fork()).cells
+
+    assert explore_parallel(droid, workers=1, budget=100).cells == expected
+    assert explore_parallel(droid, workers=2, budget=100).cells == expected
+
+
+def corridor_droid(length: int) -> Intcode:
+    """Droid in a corridor leading east from the start, walls everywhere else."""
+    return Intcode(
+        3, 100,  # command to [100]
+        1008, 100, 4, 101, 1005, 101, 21,  # east?
+        1008, 100, 3, 101, 1005, 101, 35,  # west?
+        104, 0, 1105, 1, 0,  # hit wall
+        1007, 102, length, 101, 1006, 101, 16, 1001, 102, 1, 102, 1105, 1, 46,  # east unless at the end
+        1007, 102, 1, 101, 1005, 101, 16, 1001, 102, -1, 102,  # west unless at the start
+        104, 1, 1105, 1, 0,  # moved
+        *[0] * 53,
+    )
+
+
+def test__explore_parallel__large_maze():
+    droid = corridor_droid(1000)
+    expected = explore(droid.fork()).cells
+    assert max(x for x, _ in expected) == 1001
+
+    assert explore_parallel(droid, workers=1, budget=100).cells == expected
+    assert explore_parallel(droid, workers=2, budget=100).cells == expected
@@ -0,0 +1,30 @@
+from benchmark import compare, countdown_program, sum_of_squares_program
+from intcode import Intcode
+
+
+def test__countdown_program():
+    computer = Intcode(*countdown_program(10))
+    assert computer() == []
+    assert computer.memory[100] == 0
+
+
+def test__sum_of_squares_program():
+    assert Intcode(*sum_of_squares_program(10))() == [385]
+
+
+def test__compare():
+    baseline = {'results': {
+        'a': {'wall_time': 1.0, 'peak_memory': 100000},
+        'b': {'wall_time': 1.0, 'peak_memory': 1000},
+        'd': {'wall_time': 0.0002, 'peak_memory': 100000},
+    }}
+    current = {'results': {
+        'a': {'wall_time': 1.05, 'peak_memory': 200000},
+        'b': {'wall_time': 0.5, 'peak_memory': 1000},
+        'c': {'wall_time': 9.0, 'peak_memory': 9000},
+        'd': {'wall_time': 0.0003, 'peak_memory': 110000},
+    }}
+    assert compare(baseline, current, tolerance=0.1) == [
+        'a: peak_memory 1e+05 -> 2e+05 (+100%)',
+        'c: missing from baseline',
+    ]
@@ -0,0 +1,70 @@
+from flood_fill import UNREACHED, Grid, flood_fill
+from solution_15b import MAP, find_start
+
+ROWS = [
+    '#######',
+    '#  #  #',
+    '# ### #',
+    '#     #',
+    '### ###',
+]
+
+
+def test__grid():
+    grid = Grid.from_rows(['#.', '.#', '..'])
+    assert (grid.width, grid.height) == (2, 3)
+    assert grid.find('.') == [(1, 0), (0, 1), (0, 2), (1, 2)]
+
+    grid[1, 2] = 'O'
+    assert grid[1, 2] == 'O'
+    assert grid.render() == '#.\n.#\n.O'
+
+
+def test__flood_fill__single_source():
+    grid = Grid.from_rows(ROWS)
+    fill = flood_fill(grid, [(1, 1)])
+    assert fill.time == 9
+    assert fill.distance((4, 1)) == 9
+    assert fill.distance((3, 4)) == 5
+    assert fill.distance((3, 1)) == UNREACHED
+
+
+def test__flood_fill__multiple_sources():
+    grid = Grid.from_rows(ROWS)
+    fill = flood_fill(grid, [(1, 1), (4, 1)])
+    assert fill.time == 5
+    assert fill.distance((3, 3)) == 4
+    assert fill.distance((5, 3)) == 3
+
+
+def test__flood_fill__goal():
+    grid = Grid.from_rows(ROWS)
+    fill = flood_fill(grid, [(1, 1)], goal=(3, 3))
+    assert fill.time == 4
+    assert fill.distance((5, 1)) == UNREACHED
+
+
+def test__flood_fill__render():
+    grid = Grid.from_rows(ROWS)
+    assert grid.render(flood_fill(grid, [(1, 1)]), until=2).splitlines()[1:4] == [
+        '#OO#  #',
+        '#O### #',
+        '#O    #',
+    ]
+
+
+def test__flood_fill__large_map_without_recursion():
+    # serpentine corridor through all rows:
+    rows = []
+    for y in range(200):
+        if y % 2 == 0:
+            rows.append(' ' * 200)
+        else:
+            rows.append('#' * 199 + ' ' if y % 4 == 1 else ' ' + '#' * 199)
+
+    fill = flood_fill(Grid.from_rows(rows), [(0, 0)])
+    assert fill.time == 100 * 200 + 100 - 1
+
+
+def test__day_15b():
+    assert flood_fill(MAP, [find_start()]).time == 328
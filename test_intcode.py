@@ -1,4 +1,4 @@
-from intcode import ParameterMode
+from intcode import Intcode, PagedMemory, ParameterMode, RingBufferTracer, State, Tracer
 
 
 def test__parameter_mode__from_modes():
@@ -10,3 +10,197 @@ def test__parameter_mode__from_modes():
     assert ParameterMode.from_modes(1020, 1) == 2
     assert ParameterMode.from_modes(1010, 2) == 0
     assert ParameterMode.from_modes(1010, 3) == 1
+
+
+def test__decode__cached():
+    computer = Intcode(1101, 1, 2, 5, 99, 0)
+    computer()
+    assert computer.decode(0) is computer.decode(0)
+    assert computer.decode(0).modes == (ParameterMode.IMMEDIATE, ParameterMode.IMMEDIATE, ParameterMode.POSITION)
+
+
+def test__decode__invalidated_by_self_modification():
+    # first pass outputs immediate 5, then rewrites itself to output position 5:
+    computer = Intcode(104, 5, 1101, 0, 4, 0, 1001, 20, 1, 20, 1007, 20, 2, 21, 1005, 21, 0, 99, 0, 0, 0, 0)
+    assert computer() == [5, 0]
+
+
+def test__trace__ring_buffer_bounded():
+    computer = Intcode(1101, 0, 0, 8, 1005, 8, 0, 99, 0)
+    computer.tracer = RingBufferTracer(length=2)
+    computer()
+    assert computer.trace == [
+        '00004 /00000000/ 010|05 JNZ (8),0',
+        '00007 /00000000/ 000|99 EXT ',
+    ]
+
+
+def test__trace__full():
+    computer = Intcode(1101, 0, 0, 8, 1005, 8, 0, 99, 0)
+    computer.trace_execution = True
+    computer()
+    assert len(computer.trace) == 3
+    assert computer.trace[-1] == '00007 /00000000/ 000|99 EXT '
+
+
+def test__trace__disabled():
+    computer = Intcode(1101, 0, 0, 8, 1005, 8, 0, 99, 0)
+    computer.tracer = Tracer()
+    computer()
+    assert computer.trace == []
+
+
+def test__paged_memory__reads_do_not_allocate():
+    memory = PagedMemory([1, 2, 3])
+    assert memory[2] == 3
+    assert memory[100000] == 0
+    assert len(memory) == 3
+
+
+def test__paged_memory__far_writes():
+    memory = PagedMemory([1, 2, 3])
+    memory[100000] = 7
+    memory[-5] = 8
+    assert memory[100000] == 7
+    assert memory[-5] == 8
+    assert memory[100001] == 0
+    assert len(memory) == 100001
+
+
+def test__memory_view():
+    computer = Intcode(1101, 2, 3, 6, 99)
+    computer()
+    assert computer.memory == [1101, 2, 3, 6, 99, 0, 5]
+    assert computer.memory[-1] == 5
+    assert computer.memory[1:3] == [2, 3]
+    assert computer.memory.diff(computer.program) == [(6, 5, 0)]
+
+
+def test__resume__waits_for_input():
+    # echo inputs doubled until input is 0:
+    computer = Intcode(3, 13, 1002, 13, 2, 14, 4, 14, 1005, 13, 0, 99, 0, 0, 0)
+    computer.reset()
+    assert computer.resume() == []
+    assert computer.waiting_for_input
+    assert computer.resume(1, 2) == [2, 4]
+    assert computer.waiting_for_input
+    assert computer.resume(3) == [6]
+    assert computer.resume(0) == [0]
+    assert computer.halted
+    assert computer.resume(5) == []
+
+
+def test__resume__max_outputs():
+    computer = Intcode(104, 1, 104, 2, 104, 3, 99)
+    computer.reset()
+    assert computer.resume(max_outputs=2) == [1, 2]
+    assert computer.state is State.READY
+    assert computer.resume(max_outputs=2) == [3]
+    assert computer.halted
+
+
+def test__resume__max_instructions():
+    computer = Intcode(104, 1, 104, 2, 104, 3, 99)
+    computer.reset()
+    assert computer.resume(max_instructions=2) == [1, 2]
+    assert computer.state is State.READY
+    assert computer.resume(max_instructions=0) == []
+    assert computer.resume(max_instructions=5) == [3]
+    assert computer.halted
+
+
+def test__stream():
+    computer = Intcode(104, 1, 104, 2, 104, 3, 99)
+    stream = computer.stream()
+    assert next(stream) == 1
+    assert computer.state is State.READY
+    assert list(stream) == [2, 3]
+    assert computer.halted
+
+    assert list(computer.stream(size=2)) == [(1, 2), (3,)]
+
+
+def test__stream__input_within_group():
+    computer = Intcode(104, 1, 3, 13, 4, 13, 104, 3, 104, 4, 104, 5, 99, 0)
+    assert list(computer.stream([2], size=3)) == [(1, 2, 3), (4, 5)]
+
+    # out of input in the middle of the first group:
+    assert list(computer.stream(size=3)) == [(1,)]
+
+
+def test__stream__inputs_on_demand():
+    # doubles its inputs until input 0:
+    computer = Intcode(3, 11, 1002, 11, 2, 12, 4, 12, 1005, 11, 0, 0, 0)
+    inputs = []
+
+    def next_inputs():
+        yield 1
+        while inputs[-1] < 100:
+            yield inputs[-1] * 3
+
+    outputs = []
+    for value in computer.stream(next_inputs()):
+        outputs.append(value)
+        inputs.append(value)
+    assert outputs == [2, 12, 72, 432]
+    assert computer.waiting_for_input
+
+
+def test__run__restarts_after_resume():
+    computer = Intcode(3, 9, 4, 9, 1005, 9, 0, 99, 0, 0)
+    computer.reset()
+    assert computer.resume(8, 7) == [8, 7]
+    assert computer(4, 0) == [4, 0]
+    assert computer.halted
+
+
+def test__paged_memory__copy_on_write():
+    memory = PagedMemory([1, 2, 3])
+    memory[100000] = 4
+    other = memory.copy()
+    other[0] = 5
+    other[100000] = 6
+    memory[1] = 7
+    assert memory.view() == [1, 7, 3] + [0] * (100000 - 3) + [4]
+    assert (other[0], other[1], other[100000]) == (5, 2, 6)
+    assert (memory[0], memory[100000]) == (1, 4)
+
+
+def test__fork():
+    # output running sum of inputs:
+    computer = Intcode(3, 11, 1, 11, 12, 12, 4, 12, 1105, 1, 0, 0, 0)
+    computer.reset()
+    assert computer.resume(1, 2) == [1, 3]
+
+    fork = computer.fork()
+    assert computer.resume(10) == [13]
+    assert fork.resume(20) == [23]
+    assert computer.resume(1) == [14]
+
+
+def test__fork__shares_decoded_instructions():
+    # outputs the input, which it writes into its output instruction:
+    computer = Intcode(3, 3, 104, 0, 99)
+    computer.reset()
+    computer.decode(2)
+
+    fork = computer.fork()
+    assert fork._decoded is computer._decoded
+
+    assert computer.resume(5) == [5]
+    assert fork._decoded is not computer._decoded
+    assert 2 in fork._decoded
+    assert fork.resume(7) == [7]
+
+
+def test__snapshot_restore():
+    computer = Intcode(3, 11, 1, 11, 12, 12, 4, 12, 1105, 1, 0, 0, 0)
+    computer.reset()
+    computer.resume(5)
+    snapshot = computer.snapshot()
+
+    assert computer.resume(1) == [6]
+    computer.restore(snapshot)
+    assert computer.resume(2) == [7]
+    computer.restore(snapshot)
+    assert computer.resume(3) == [8]
@@ -0,0 +1,139 @@
+import typing as t
+
+import pytest
+
+from benchmark import countdown_program, sum_of_squares_program
+from intcode import FullTracer, Intcode
+from intcode_acceleration import AcceleratingIntcode
+
+
+def doubling_program(n: int) -> t.List[int]:
+    """Outputs 2 ** n - 1, doubling and incrementing a cell n times."""
+    return [
+        1101, n, 0, 100,  # mem[100] = n
+        1002, 101, 2, 101,  # mem[101] *= 2
+        1001, 101, 1, 101,  # mem[101] += 1
+        1001, 100, -1, 100,  # mem[100] -= 1
+        1005, 100, 4,  # loop while mem[100]
+        4, 101,
+        99,
+    ]
+
+
+# counts mem[100] up by 3 until it equals 30, adding mem[102] to mem[101] each time, in relative mode:
+COUNT_UP_TO = [
+    109, 50,
+    1001, 100, 3, 100,
+    22201, 51, 52, 51,
+    1008, 100, 30, 103,
+    1006, 103, 2,
+    4, 101,
+    99,
+] + [0] * 80 + [0, 0, 7, 0]
+
+# counts mem[100] down by 2 while not negative:
+COUNT_DOWN_BELOW_ZERO = [1001, 100, -2, 100, 1007, 100, 0, 101, 1006, 101, 0, 4, 100, 99] + [0] * 86 + [9, 0]
+
+
+def accelerated_loops(computer: AcceleratingIntcode) -> int:
+    return len(computer._loops)
+
+
+def assert_same_as_interpreted(program: t.List[int]) -> AcceleratingIntcode:
+    interpreted = Intcode(*program)
+    accelerated = AcceleratingIntcode(*program)
+    assert accelerated() == interpreted()
+    assert accelerated.memory == interpreted.memory
+    assert (accelerated.ip, accelerated.relative_base) == (interpreted.ip, interpreted.relative_base)
+    return accelerated
+
+
+@pytest.mark.parametrize('program', [
+    countdown_program(1000),
+    doubling_program(200),
+    COUNT_UP_TO,
+    COUNT_DOWN_BELOW_ZERO,
+])
+def test__accelerate__same_as_interpreted(program):
+    computer = assert_same_as_interpreted(program)
+    assert accelerated_loops(computer) == 1
+
+
+def test__accelerate__busy_loop():
+    computer = AcceleratingIntcode(*countdown_program(10 ** 15))
+    computer.reset()
+    computer.resume(max_instructions=100)
+    assert computer.halted
+    assert computer.memory[100] == 0
+
+
+def test__accelerate__outputs():
+    assert AcceleratingIntcode(*doubling_program(100))() == [2 ** 100 - 1]
+    assert AcceleratingIntcode(*COUNT_UP_TO)() == [70]
+    assert AcceleratingIntcode(*COUNT_DOWN_BELOW_ZERO)() == [-1]
+
+
+@pytest.mark.parametrize('program', [
+    # not affine:
+    sum_of_squares_program(100),
+    # output in the loop:
+    [4, 100, 1001, 100, -1, 100, 1005, 100, 0, 99] + [0] * 90 + [3],
+    # loop changing its own increment:
+    [1001, 100, 1, 100, 1001, 2, 1, 2, 1007, 100, 50, 101, 1005, 101, 0, 4, 100, 99] + [0] * 84,
+])
+def test__accelerate__not_loop(program):
+    computer = assert_same_as_interpreted(program)
+    assert accelerated_loops(computer) == 0
+
+
+def test__accelerate__undone_by_writes():
+    # counts mem[102] up while counting mem[100] down from 10, again once the decrement is -2:
+    program = [
+        1101, 10, 0, 100,
+        1001, 100, -1, 100,
+        1001, 102, 1, 102,
+        1005, 100, 4,
+        1005, 103, 33,
+        1101, 1, 0, 103,
+        1101, 0, -2, 6,
+        1101, 10, 0, 100,
+        1105, 1, 4,
+        4, 102,
+        99,
+    ] + [0] * 70
+    computer = assert_same_as_interpreted(program)
+    assert computer.run() == [15]
+    assert accelerated_loops(computer) == 1
+
+
+def test__accelerate__rejected_once():
+    # writes into the output in the loop on every iteration, which is not fast-forwarded:
+    program = [1101, 5, 0, 100, 1001, 100, -1, 100, 1001, 13, 0, 13, 4, 100, 1005, 100, 4, 99] + [0] * 83
+    analyzed = []
+
+    class Computer(AcceleratingIntcode):
+        def _analyze(self, start, jump_address):
+            analyzed.append(jump_address)
+            return super()._analyze(start, jump_address)
+
+    assert Computer(*program)() == [4, 3, 2, 1, 0]
+    assert analyzed == [14]
+
+
+def test__accelerate__not_while_tracing():
+    computer = AcceleratingIntcode(*countdown_program(10))
+    computer.tracer = FullTracer()
+    computer()
+    assert accelerated_loops(computer) == 0
+    assert len(computer.trace) == 1 + 2 * 10 + 1
+
+
+def test__day_09():
+    assert AcceleratingIntcode.from_file('input_09.txt')(2) == Intcode.from_file('input_09.txt')(2)
+
+
+def test__day_13():
+    arcade = Intcode.from_file('input_13.txt')
+    accelerated_arcade = AcceleratingIntcode.from_file('input_13.txt')
+    assert accelerated_arcade() == arcade()
+    assert accelerated_arcade.memory == arcade.memory
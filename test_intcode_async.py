@@ -0,0 +1,72 @@
+import asyncio
+
+from benchmark import countdown_program
+from intcode import Intcode
+from intcode_async import Machine, chain, run_machines
+
+# day 7 example: amplifier in feedback loop mode, first input is its phase setting
+AMPLIFIER = [
+    3, 26, 1001, 26, -4, 26, 3, 27, 1002, 27, 2, 27, 1, 27, 26, 27, 4, 27, 1001, 28, -1, 28, 1005, 28, 6, 99, 0, 0, 5
+]
+
+# outputs its input incremented by one, then halts
+INCREMENT = [3, 9, 1001, 9, 1, 9, 4, 9, 99, 0]
+
+# outputs its inputs until input 0
+ECHO = [3, 9, 4, 9, 1005, 9, 0, 99, 0, 0]
+
+
+def test__chain__feedback_loop():
+    async def amplify(phases):
+        machines = chain(*(Intcode(*AMPLIFIER) for _ in phases), loop=True)
+        for machine, phase in zip(machines, phases):
+            machine.inputs.put_nowait(phase)
+        machines[0].inputs.put_nowait(0)
+
+        await run_machines(machines)
+        return machines[-1].outputs.get_nowait()
+
+    assert asyncio.run(amplify([9, 8, 7, 6, 5])) == 139629729
+
+
+def test__chain__hundreds_of_machines():
+    async def pipeline(count):
+        machines = chain(*(Intcode(*INCREMENT) for _ in range(count)))
+        machines[0].inputs.put_nowait(0)
+        await run_machines(machines)
+        return machines[-1].outputs.get_nowait()
+
+    assert asyncio.run(pipeline(500)) == 500
+
+
+def test__machine__quantum():
+    async def interleave():
+        busy = Machine(Intcode(*countdown_program(10_000)), quantum=100)
+        echo = Machine(Intcode(*ECHO))
+
+        tasks = [asyncio.create_task(m.run()) for m in (busy, echo)]
+        echo.inputs.put_nowait(42)
+        assert await echo.outputs.get() == 42
+        assert not busy.computer.halted
+
+        echo.inputs.put_nowait(0)
+        await asyncio.gather(*tasks)
+        assert busy.computer.halted
+
+    asyncio.run(interleave())
+
+
+def test__machine__backpressure():
+    async def produce():
+        counter = Machine(Intcode(104, 1, 1105, 1, 0), outputs=asyncio.Queue(3))
+        task = asyncio.create_task(counter.run())
+
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert counter.outputs.full()
+
+        values = [await counter.outputs.get() for _ in range(10)]
+        task.cancel()
+        return values
+
+    assert asyncio.run(produce()) == [1] * 10
@@ -0,0 +1,46 @@
+from intcode import Intcode
+from intcode_batch import run_batch
+
+
+def test__run_batch__patches():
+    # memory[0] = memory[9] * memory[10] + 1
+    result = run_batch([2, 9, 10, 0, 1001, 0, 1, 0, 99, 0, 0], 3, patches={9: [4, 5, 6], 10: [7, 8, 9]})
+    assert result.memory[:, 0].tolist() == [29, 41, 55]
+    assert not result.errors
+
+
+def test__run_batch__diverging_inputs():
+    program = Intcode.from_file('input_05.txt').program
+    result = run_batch(program, 3, inputs=[[1], [5], [8]])
+    assert result.outputs == [[0, 0, 0, 0, 0, 0, 0, 0, 0, 5821753], [11956381], Intcode(*program)(8)]
+
+
+def test__run_batch__relative_mode():
+    program = Intcode.from_file('input_09.txt').program
+    assert run_batch(program, 2, inputs=[[1], [1]]).outputs == [[2932210790]] * 2
+
+
+def test__run_batch__overflow_handed_to_scalar():
+    result = run_batch([1002, 7, 0, 7, 4, 7, 99, 5], 2, patches={2: [3, 2 ** 61]})
+    assert result.outputs == [[15], [5 * 2 ** 61]]
+    assert result.memory[:, 7].tolist() == [15, 5 * 2 ** 61]
+
+
+def test__run_batch__big_integers():
+    result = run_batch([1102, 2 ** 40, 2 ** 40, 7, 4, 7, 99, 0], 2)
+    assert result.outputs == [[2 ** 80], [2 ** 80]]
+    assert result.memory[0, 7] == 2 ** 80
+
+
+def test__run_batch__errors():
+    result = run_batch([3, 0, 99], 2, inputs=[[1], []])
+    assert result.memory[:, 0].tolist() == [1, 3]
+    assert list(result.errors) == [1]
+
+
+def test__run_batch__restricted_instructions():
+    # memory[0] = memory[0] * 3, stopping before outputting:
+    result = run_batch([1002, 0, 3, 0, 4, 0, 99], 1, instructions={1002, 99})
+    assert result.memory[0, 0] == 3006
+    assert result.outputs == [[]]
+    assert not result.errors
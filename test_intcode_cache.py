@@ -0,0 +1,60 @@
+import pytest
+
+import intcode_cache
+from intcode import Intcode
+
+
+def test__load_program__cached(tmp_path):
+    source = tmp_path / 'program.txt'
+    source.write_text('1,-2,3,99')
+    assert intcode_cache.load_program(source) == [1, -2, 3, 99]
+
+    entry = intcode_cache.entry_path(source)
+    assert entry.exists()
+    assert intcode_cache._read(entry) == [1, -2, 3, 99]
+
+
+def test__load_program__big_ints(tmp_path):
+    source = tmp_path / 'program.txt'
+    program = [104, 2 ** 63, -2 ** 63, 2 ** 63 - 1, -10 ** 30, 99]
+    source.write_text(','.join(map(str, program)))
+
+    assert intcode_cache.load_program(source) == program
+    assert intcode_cache.load_program(source) == program
+
+
+def test__load_program__source_changed(tmp_path):
+    source = tmp_path / 'program.txt'
+    source.write_text('104,1,99')
+    assert intcode_cache.load_program(source) == [104, 1, 99]
+
+    source.write_text('104,2,99\n')
+    assert intcode_cache.load_program(source) == [104, 2, 99]
+
+
+def test__load_program__corrupt_entry(tmp_path):
+    source = tmp_path / 'program.txt'
+    source.write_text('104,1,99')
+    intcode_cache.load_program(source)
+
+    entry = intcode_cache.entry_path(source)
+    entry.write_bytes(entry.read_bytes()[:-4])
+    assert intcode_cache.load_program(source) == [104, 1, 99]
+    assert intcode_cache._read(entry) == [104, 1, 99]
+
+
+@pytest.mark.parametrize('change', [lambda data: data[:-3], lambda data: data + b'0'])
+def test__load_program__corrupt_escapes(tmp_path, change):
+    source = tmp_path / 'program.txt'
+    source.write_text(f'104,{-10 ** 30},99')
+    intcode_cache.load_program(source)
+
+    entry = intcode_cache.entry_path(source)
+    entry.write_bytes(change(entry.read_bytes()))
+    with pytest.raises(ValueError):
+        intcode_cache._read(entry)
+    assert intcode_cache.load_program(source) == [104, -10 ** 30, 99]
+
+
+def test__from_file():
+    assert Intcode.from_file('input_09.txt').program == Intcode.from_file('input_09.txt', cache=False).program
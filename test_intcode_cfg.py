@@ -0,0 +1,120 @@
+import math
+
+from benchmark import countdown_program
+from intcode_cfg import Call, Instruction, build_cfg, decode
+from intcode import Opcode, ParameterMode
+
+# stores a return address on the stack, calls a function storing 42 beside it, outputs it on return:
+CALL = [
+    109, 100,
+    21101, 0, 9, 0,
+    1105, 1, 12,
+    204, 1,
+    99,
+    21101, 0, 42, 1,
+    2105, 1, 0,
+]
+
+
+def test__decode():
+    assert decode([1002, 50, 3, 51], 0) == Instruction(
+        0, Opcode.MULTIPLY, (ParameterMode.POSITION, ParameterMode.IMMEDIATE, ParameterMode.POSITION), (50, 3, 51)
+    )
+    assert str(decode([1002, 50, 3, 51], 0)) == '00000 010|02 MUL (50),3 --> (51)'
+    assert decode([1002, 50, 3, 51], 0).encode() == [1002, 50, 3, 51]
+
+    assert decode([1002, 50, 3], 0) is None
+    assert decode([11101, 50, 3, 51], 0) is None
+    assert decode([42], 0) is None
+
+
+def test__blocks():
+    cfg = build_cfg(countdown_program(10))
+    assert {start: [i.address for i in block.instructions] for start, block in cfg.blocks.items()} == {
+        0: [0],
+        4: [4, 8],
+        11: [11],
+    }
+    assert cfg.blocks[4].successors == (4, 11)
+    assert cfg.blocks[11].successors == ()
+
+
+def test__code_and_data():
+    cfg = build_cfg(countdown_program(10) + [0] * 90)
+    assert cfg.is_code(0) and cfg.is_code(11)
+    assert cfg.is_data(12) and cfg.is_data(100)
+    assert cfg.is_writable(100) and not cfg.is_writable(99)
+    assert not any(cfg.is_volatile(block) for block in cfg.blocks.values())
+
+
+def test__indirect_jumps():
+    cfg = build_cfg(CALL)
+    assert cfg.indirect_jumps == {16}
+    assert 9 in cfg.address_taken
+    assert sorted(cfg.blocks) == [0, 9, 12]
+    assert cfg.blocks[0].successors == (12,)
+
+
+def test__stack_beyond_image():
+    assert build_cfg(CALL).stack_beyond_image
+    assert build_cfg(countdown_program(10)).stack_beyond_image
+
+    # stores to /20/, relative base 0 and 10, inside the image:
+    assert not build_cfg([21101, 7, 0, 20, 4, 20, 99] + [0] * 14).stack_beyond_image
+    assert not build_cfg([109, 10, 21101, 7, 0, 10, 4, 20, 99] + [0] * 14).stack_beyond_image
+
+    # relative base lowered in a loop, by a value read as input and by the image size:
+    assert not build_cfg([109, 100, 109, -1, 204, 0, 1105, 1, 2]).stack_beyond_image
+    assert not build_cfg([109, 100, 3, 20, 9, 20, 204, 0, 99] + [0] * 12).stack_beyond_image
+    assert not build_cfg([109, 100, 109, -95, 204, 0, 99]).stack_beyond_image
+
+
+def test__stack_start():
+    assert build_cfg(CALL).stack_start == 100
+    assert build_cfg([109, 100, 9, 0, 204, 0, 99]).stack_start == 209
+
+    cfg = build_cfg([21101, 7, 0, 20, 4, 20, 99] + [0] * 14)
+    assert cfg.stack_start == 20
+    assert cfg.is_stack(20) and not cfg.is_stack(19)
+    assert not cfg.is_volatile(cfg.blocks[0])
+
+    assert build_cfg([109, 10, 3, 20, 9, 20, 204, 0, 99] + [0] * 12).stack_start == -math.inf
+
+
+def test__calls():
+    assert build_cfg(CALL).calls == {0: Call(12, 9, 0)}
+
+    # a function calling itself while mem[30] is 0, with the relative base raised by 2 or lowered by 2 without end:
+    for adjustment, stack_start in ((2, 100), (-2, -math.inf)):
+        cfg = build_cfg([
+            109, 100,
+            21101, 0, 9, 0,
+            1105, 1, 12,
+            204, 1,
+            99,
+            109, adjustment,
+            1005, 30, 24,
+            21101, 0, 24, 0,
+            1105, 1, 12,
+            109, -adjustment,
+            2105, 1, 0,
+            0, 0,
+        ])
+        assert cfg.calls == {0: Call(12, 9, 0), 17: Call(12, 24, 0)}
+        assert cfg.stack_start == stack_start
+
+
+def test__self_modifying():
+    # turns the output at 8 into an output of its immediate operand:
+    cfg = build_cfg([1101, 100, 4, 8, 1101, 0, 7, 9, 4, 0, 99])
+    assert cfg.written_cells == {8, 9}
+    assert [cfg.is_volatile(block) for block in cfg.blocks.values()] == [True]
+
+
+def test__render():
+    assert build_cfg(CALL).render().splitlines()[:4] == [
+        'block 00000 -> [00012] address taken',
+        '    00000 001|09 ARB 100',
+        '    00002 211|01 ADD 0,9 --> /0/',
+        '    00006 011|05 JNZ 1,12',
+    ]
@@ -0,0 +1,64 @@
+from benchmark import countdown_program
+from intcode import Intcode, State
+from intcode_compiler import CompiledIntcode
+
+
+def test__run_from_02():
+    computer = CompiledIntcode(1, 1, 1, 4, 99, 5, 6, 0, 99)
+    computer()
+    assert computer.memory == [30, 1, 1, 4, 2, 5, 6, 0, 99]
+
+
+def test__day_05():
+    diagnostic = CompiledIntcode.from_file('input_05.txt')
+    assert diagnostic(1) == [0, 0, 0, 0, 0, 0, 0, 0, 0, 5821753]
+    assert diagnostic(5) == [11956381]
+
+
+def test__day_09():
+    boost = CompiledIntcode.from_file('input_09.txt')
+    assert boost(1) == [2932210790]
+    assert CompiledIntcode(109, 1, 204, -1, 1001, 100, 1, 100, 1008, 100, 16, 101, 1006, 101, 0, 99)() == [
+        109, 1, 204, -1, 1001, 100, 1, 100, 1008, 100, 16, 101, 1006, 101, 0, 99
+    ]
+
+
+def test__day_13__modified_parameters():
+    # the arcade program indexes its screen memory by writing instruction parameters:
+    arcade = Intcode.from_file('input_13.txt')
+    compiled_arcade = CompiledIntcode.from_file('input_13.txt')
+    assert compiled_arcade() == arcade()
+    assert compiled_arcade.memory == arcade.memory
+
+
+def test__modified_instruction():
+    # first pass outputs immediate 5, then rewrites itself to output position 5:
+    computer = CompiledIntcode(104, 5, 1101, 0, 4, 0, 1001, 20, 1, 20, 1007, 20, 2, 21, 1005, 21, 0, 99, 0, 0, 0, 0)
+    assert computer() == [5, 0]
+
+
+def test__modified_operator():
+    # the first pass turns ADD 1 to cell 20 into MULTIPLY it by cell 1:
+    computer = CompiledIntcode(1001, 20, 1, 20, 1101, 1, 1, 0, 1007, 20, 3, 21, 1005, 21, 0, 4, 20, 99, 0, 0, 1, 0)
+    assert computer() == [40]
+
+
+def test__fork():
+    computer = CompiledIntcode(3, 11, 1, 11, 12, 12, 4, 12, 1105, 1, 0, 0, 0)
+    computer.reset()
+    assert computer.resume(1, 2) == [1, 3]
+
+    fork = computer.fork()
+    assert computer.resume(10) == [13]
+    assert fork.resume(20) == [23]
+
+
+def test__resume__max_instructions():
+    computer = CompiledIntcode(*countdown_program(1000))
+    computer.reset()
+    assert computer.resume(max_instructions=100) == []
+    assert computer.state is State.READY
+    assert 900 < computer.memory[100] < 1000
+
+    computer.resume(max_instructions=10_000)
+    assert computer.halted
@@ -0,0 +1,90 @@
+from intcode import Intcode, RingBufferTracer
+from intcode_fusion import FusingIntcode
+
+# counts mem[20] up to 3, outputting each value:
+COUNTER = [1001, 20, 1, 20, 1007, 20, 3, 21, 1005, 21, 0, 4, 20, 99] + [0] * 6 + [0, 0]
+
+
+def test__fuse__add_compare_jump():
+    computer = FusingIntcode(*COUNTER)
+    assert computer() == [3]
+    assert computer.decode(0).mnemonic == 'ADD+LSS+JNZ'
+    assert computer.decode(0).length == 11
+    assert computer.memory[21] == 0
+
+
+def test__fuse__not_into_own_cells():
+    # compare stores its result over the target of the jump:
+    computer = FusingIntcode(1107, 1, 2, 6, 1006, 6, 9, 99)
+    assert computer() == []
+    assert computer.decode(0).mnemonic == 'LSS'
+
+
+def test__fuse__undone_by_writes():
+    # counts mem[40] up to 3, then turns the loop condition into mem[40] == 5 and counts on:
+    program = [
+        1001, 40, 1, 40,
+        1007, 40, 3, 41,
+        1005, 41, 0,
+        1008, 43, 0, 42,
+        1006, 42, 33,
+        1101, 0, 5, 6,
+        1101, 0, 1008, 4,
+        1101, 0, 1, 43,
+        1105, 1, 0,
+        4, 40,
+        99,
+    ] + [0] * 8
+    assert FusingIntcode(*program)() == Intcode(*program)() == [4]
+
+
+def test__fuse__single_instructions_only():
+    # fuses the compare at 9 first, the add at 5 in front of it must not fuse with that fused entry:
+    program = [
+        1105, 1, 9,
+        109, 0,
+        1001, 40, 1, 40,
+        1008, 40, 3, 41,
+        1006, 41, 3,
+        1005, 3, 22,
+        99, 0, 0,
+        4, 40, 99,
+    ] + [0] * 20
+    computer = FusingIntcode(*program)
+    assert computer() == Intcode(*program)() == [3]
+    assert computer.decode(5).mnemonic == 'ADD+EQU+JZR'
+
+
+def test__fuse__undone_by_writes_to_second_part():
+    # jumps to the increment at 11 until that changes the target of the fused jump to 22:
+    program = [
+        1007, 40, 3, 41,
+        1005, 41, 11,
+        4, 40, 99, 0,
+        1001, 40, 1, 40,
+        1101, 0, 22, 6,
+        1105, 1, 0,
+        104, 77, 99,
+    ] + [0] * 20
+    computer = FusingIntcode(*program)
+    assert computer() == Intcode(*program)() == [77]
+    assert computer.decode(0).mnemonic == 'LSS+JNZ'
+    assert computer.decode(0).length == 7
+
+
+def test__fuse__not_while_tracing():
+    computer = FusingIntcode(*COUNTER)
+    computer.tracer = RingBufferTracer()
+    computer()
+    assert computer.decode(0).mnemonic == 'ADD'
+
+
+def test__day_09():
+    assert FusingIntcode.from_file('input_09.txt')(1) == Intcode.from_file('input_09.txt')(1)
+
+
+def test__day_13():
+    arcade = Intcode.from_file('input_13.txt')
+    fused_arcade = FusingIntcode.from_file('input_13.txt')
+    assert fused_arcade() == arcade()
+    assert fused_arcade.memory == arcade.memory
@@ -0,0 +1,75 @@
+import array
+
+import pytest
+
+from intcode import PAGE_BITS, Intcode
+from intcode_int64 import Int64Intcode
+
+
+def assert_same_as_reference(program, *inputs) -> Int64Intcode:
+    reference = Intcode(*program)
+    computer = Int64Intcode(*program)
+    assert computer(*inputs) == reference(*inputs)
+    assert computer.memory == reference.memory
+    return computer
+
+
+def test__int64():
+    computer = assert_same_as_reference([1102, 34915192, 34915192, 7, 4, 7, 99, 0])
+    assert not computer.promoted
+    assert computer._memory.flat.itemsize == 8
+
+
+@pytest.mark.parametrize('program', [
+    [1102, 2 ** 62, 4, 7, 4, 7, 99, 0],
+    [1101, -2 ** 63, -1, 7, 4, 7, 99, 0],
+    [1102, 2 ** 62, 4, 100000, 4, 100000, 99],
+    [104, 2 ** 70, 99],
+])
+def test__promoted(program):
+    computer = assert_same_as_reference(program)
+    assert computer.promoted
+
+
+def test__promoted_page_only():
+    computer = assert_same_as_reference([1102, 2 ** 62, 4, 100000, 1101, 1, 2, 200000, 4, 100000, 99])
+    memory = computer._memory
+    assert computer.promoted
+    assert isinstance(memory._pages[100000 >> PAGE_BITS], list)
+    assert isinstance(memory._pages[200000 >> PAGE_BITS], array.array)
+    assert isinstance(memory.flat, array.array)
+
+
+def test__promoted_flat_only():
+    computer = assert_same_as_reference([1102, 2 ** 62, 4, 11, 1101, 1, 2, 100000, 4, 11, 99, 0])
+    memory = computer._memory
+    assert isinstance(memory.flat, list)
+    assert isinstance(memory._pages[100000 >> PAGE_BITS], array.array)
+
+
+def test__reset_after_promotion():
+    computer = Int64Intcode(1102, 2 ** 62, 4, 7, 4, 7, 99, 0)
+    computer()
+    computer.program[1] = 2
+    assert computer() == [8]
+    assert not computer.promoted
+
+
+def test__fork_promoted_alone():
+    computer = Int64Intcode(3, 9, 1002, 9, 4, 9, 4, 9, 99, 0)
+    computer.reset()
+    other = computer.fork()
+
+    assert other.resume(2 ** 62) == [2 ** 64]
+    assert other.promoted
+    assert computer.resume(3) == [12]
+    assert not computer.promoted
+
+
+def test__day_09():
+    assert_same_as_reference(Intcode.from_file('input_09.txt').program, 1)
+
+
+def test__day_13():
+    computer = assert_same_as_reference(Intcode.from_file('input_13.txt').program)
+    assert not computer.promoted
@@ -0,0 +1,90 @@
+import pytest
+
+from intcode import Intcode
+from intcode_memo import RunCache
+
+# outputs input + 1 and stores it far beyond the program image:
+PROGRAM = [3, 13, 1001, 13, 1, 13, 4, 13, 1101, 0, 13, 100000, 99, 0]
+
+
+def test__run__hit():
+    runs = RunCache()
+    assert runs.run(Intcode(*PROGRAM), [41]) == [42]
+    assert runs.run(Intcode(*PROGRAM), [41]) == [42]
+    assert runs.run(Intcode(*PROGRAM), (1,)) == [2]
+    assert (runs.hits, runs.misses) == (1, 2)
+
+
+def test__run__restores_state():
+    executed = Intcode(*PROGRAM)
+    executed(41)
+
+    runs = RunCache()
+    runs.run(Intcode(*PROGRAM), [41])
+    computer = Intcode(*PROGRAM)
+    assert runs.run(computer, [41]) == [42]
+    assert runs.hits == 1
+
+    assert computer.halted
+    assert (computer.ip, computer.relative_base) == (executed.ip, executed.relative_base)
+    assert computer.memory == executed.memory
+    assert computer.memory[100000] == 13
+    assert computer.resume() == []
+
+
+def test__run__bypass():
+    runs = RunCache()
+    outputs = []
+    runs.run(Intcode(*PROGRAM), [41], on_output=outputs.append)
+    runs.run(Intcode(*PROGRAM), [41], on_output=outputs.append)
+    runs.run(Intcode(*PROGRAM), iter([41]))
+    assert outputs == [42, 42]
+    assert (runs.hits, runs.misses, len(runs)) == (0, 0, 0)
+
+
+def test__run__failed():
+    runs = RunCache()
+    with pytest.raises(StopIteration):
+        runs.run(Intcode(*PROGRAM))
+    assert len(runs) == 0
+
+
+def test__run__eviction():
+    # one output and one written cell each:
+    runs = RunCache(max_cells=2 * (1 + 2 + 3))
+    runs.run(Intcode(3, 0, 4, 0, 99), [1])
+    runs.run(Intcode(3, 0, 4, 0, 99), [2])
+    runs.run(Intcode(3, 0, 4, 0, 99), [1])
+    runs.run(Intcode(3, 0, 4, 0, 99), [5])
+    assert len(runs) == 2
+
+    runs.run(Intcode(3, 0, 4, 0, 99), [1])
+    assert runs.hits == 2
+    runs.run(Intcode(3, 0, 4, 0, 99), [2])
+    assert runs.misses == 4
+
+
+def test__run__persisted(tmp_path):
+    RunCache(directory=tmp_path).run(Intcode(*PROGRAM), [41])
+
+    runs = RunCache(directory=tmp_path)
+    computer = Intcode(*PROGRAM)
+    assert runs.run(computer, [41]) == [42]
+    assert runs.hits == 1
+    assert computer.memory[100000] == 13
+
+
+@pytest.mark.parametrize('content', [
+    '{', '{}', '[]', '{"version": 1}', '{"version": 1, "writes": 1}',
+    '{"version": 1, "outputs": 5, "writes": [], "memory_size": 1, "ip": 0, "relative_base": 0}',
+    '{"version": 1, "outputs": [], "writes": [[1]], "memory_size": 1, "ip": 0, "relative_base": 0}',
+    '{"version": 1, "outputs": [], "writes": [], "memory_size": "1", "ip": 0, "relative_base": 0}',
+])
+def test__run__corrupt_persisted(tmp_path, content):
+    RunCache(directory=tmp_path).run(Intcode(*PROGRAM), [41])
+    for path in tmp_path.iterdir():
+        path.write_text(content)
+
+    runs = RunCache(directory=tmp_path)
+    assert runs.run(Intcode(*PROGRAM), [41]) == [42]
+    assert runs.misses == 1
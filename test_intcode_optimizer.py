@@ -0,0 +1,134 @@
+import typing as t
+
+import pytest
+
+import solution_13
+from benchmark import CountingTracer, countdown_program
+from intcode import Intcode
+from intcode_optimizer import (
+    eliminate_dead_stores, optimize, propagate_constants, remove_identity_stores, thread_jumps
+)
+
+# computes 5 * 3 through two scratch cells, outputs it and halts after jumping twice:
+SCRATCH = [
+    1101, 5, 0, 50,
+    1002, 50, 3, 51,
+    4, 51,
+    1105, 1, 16,
+    99,
+    0, 0,
+    1105, 1, 13,
+] + [0] * 33
+
+# like SCRATCH, but the output in a block of its own after a jump on a constant never taken:
+NEVER_TAKEN = [
+    1101, 5, 0, 50,
+    1002, 50, 3, 51,
+    1006, 52, 13,
+    4, 51,
+    99,
+] + [0] * 36 + [0, 0, 7]
+
+
+def executed(program: t.List[int], *inputs) -> t.Tuple[t.List[int], int]:
+    computer = Intcode(*program)
+    computer.tracer = tracer = CountingTracer()
+    return computer.run(inputs), tracer.count
+
+
+def test__optimize():
+    optimized = optimize(SCRATCH)
+    assert optimized[:4] == [104, 15, 1105, 1]
+    assert executed(SCRATCH) == ([15], 6)
+    assert executed(optimized) == ([15], 3)
+
+
+def test__optimize__never_taken():
+    assert executed(NEVER_TAKEN) == ([15], 5)
+    assert executed(optimize(NEVER_TAKEN)) == ([15], 4)
+
+
+def test__propagate_constants():
+    optimized = optimize(SCRATCH, [propagate_constants])
+    assert optimized[:10] == [1101, 5, 0, 50, 1102, 5, 3, 51, 104, 15]
+    assert executed(optimized) == ([15], 6)
+
+
+def test__eliminate_dead_stores():
+    # nothing is dead before reads turned into immediates:
+    assert optimize(SCRATCH, [eliminate_dead_stores]) == SCRATCH
+
+    # the first of two stores is dead:
+    program = [1101, 1, 2, 20, 1101, 3, 4, 20, 4, 20, 99] + [0] * 10
+    assert executed(program) == ([7], 4)
+    assert executed(optimize(program, [eliminate_dead_stores])) == ([7], 3)
+
+
+def test__thread_jumps():
+    optimized = optimize(SCRATCH, [thread_jumps])
+    assert optimized[10:13] == [1105, 1, 13]
+    assert executed(optimized) == ([15], 5)
+
+
+def test__remove_identity_stores():
+    program = [1101, 5, 0, 20, 1001, 20, 0, 20, 4, 20, 99] + [0] * 10
+    assert executed(program) == ([5], 4)
+    assert executed(optimize(program, [remove_identity_stores])) == ([5], 3)
+
+
+def test__thread_jumps__through_removed_instructions():
+    # jumps to an addition of 0 in a block of its own, falling through to the output:
+    program = [1005, 20, 6, 1105, 1, 10, 1001, 20, 0, 20, 4, 20, 99] + [0] * 7 + [1]
+    optimized = optimize(program, [remove_identity_stores, thread_jumps])
+    assert optimized[:3] == [1005, 20, 10]
+    assert executed(program) == ([1], 4)
+    assert executed(optimized) == ([1], 3)
+
+
+def test__loop():
+    assert executed(optimize(countdown_program(10))) == executed(countdown_program(10))
+
+
+def test__self_modifying():
+    program = [1101, 100, 4, 8, 1101, 0, 7, 9, 4, 0, 99]
+    assert optimize(program) == program
+
+
+@pytest.mark.parametrize('program', [
+    [21101, 7, 0, 20, 4, 20, 99] + [0] * 14,
+    [109, 10, 21101, 7, 0, 10, 4, 20, 99] + [0] * 14,
+])
+def test__relative_stores_into_image(program):
+    assert Intcode(*optimize(program))() == Intcode(*program)() == [7]
+
+
+@pytest.mark.parametrize('path, inputs', [
+    ('input_05.txt', [1]),
+    ('input_05.txt', [5]),
+    ('input_09.txt', [1]),
+    ('input_13.txt', []),
+])
+def test__same_outputs(path, inputs):
+    program = Intcode.from_file(path).program
+    outputs, count = executed(program, *inputs)
+    optimized_outputs, optimized_count = executed(optimize(program), *inputs)
+    assert optimized_outputs == outputs
+    assert optimized_count <= count
+
+
+def test__day_13_game(capsys):
+    arcade = Intcode.from_file('input_13.txt')
+    arcade.program[0] = 2
+    arcade.program = optimize(arcade.program)
+    player = solution_13.Player()
+    player.play(arcade)
+    assert player.score == 15328
+
+
+def test__day_09_fewer_instructions():
+    # the recursive function keeps its stack beyond the image, its base case skips an addition of 0:
+    program = Intcode.from_file('input_09.txt').program
+    outputs, count = executed(program, 2)
+    optimized_outputs, optimized_count = executed(optimize(program), 2)
+    assert optimized_outputs == outputs
+    assert optimized_count < count
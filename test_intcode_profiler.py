@@ -0,0 +1,31 @@
+from benchmark import countdown_program
+from intcode import Intcode
+from intcode_profiler import Profiler
+
+
+def profile(program, *inputs) -> Profiler:
+    computer = Intcode(*program)
+    computer.tracer = profiler = Profiler()
+    computer.run(inputs)
+    return profiler
+
+
+def test__executions():
+    profiler = profile(countdown_program(10))
+    assert profiler.total == 1 + 2 * 10 + 1
+    assert profiler.address_counts() == {0: 1, 4: 10, 8: 10, 11: 1}
+    assert profiler.instruction_histogram() == {1101: 1, 1001: 10, 1005: 10, 99: 1}
+
+
+def test__jumps():
+    profiler = profile(countdown_program(10))
+    assert profiler.jumps_taken == {8: 9}
+    assert profiler.jumps_not_taken == {8: 1}
+    assert profiler.back_edges == {(8, 4): 9}
+    assert profiler.hot_loops() == [(8, 4, 9, 20)]
+
+
+def test__report():
+    report = profile(countdown_program(10)).report()
+    assert '00004         10  45.45 010|01 ADD' in report
+    assert '00008 JNZ               9          1' in report
@@ -0,0 +1,102 @@
+import pytest
+
+from intcode import FullTracer, Intcode
+from intcode_recorder import Recorder, Step
+
+
+@pytest.fixture
+def record(tmp_path):
+    recorders = []
+
+    def record(program, *inputs, **kwargs) -> Recorder:
+        computer = Intcode(*program)
+        computer.tracer = Recorder(tmp_path / 'trace.bin', program, **kwargs)
+        recorders.append(computer.tracer)
+        computer.run(inputs)
+        return computer.tracer
+
+    yield record
+    for recorder in recorders:
+        recorder.close()
+
+
+def test__record__same_as_trace(tmp_path):
+    boost = Intcode.from_file('input_09.txt')
+    boost.tracer = FullTracer()
+    boost(1)
+
+    recorded = Intcode.from_file('input_09.txt')
+    with Recorder(tmp_path / 'trace.bin', recorded.program, buffer_records=5) as recorder:
+        recorded.tracer = recorder
+        recorded(1)
+
+        assert len(recorder) == len(boost.trace)
+        assert recorded.trace == boost.trace
+
+
+def test__record__reset(tmp_path):
+    computer = Intcode(1101, 1, 2, 0, 99)
+    with Recorder(tmp_path / 'trace.bin', computer.program) as recorder:
+        computer.tracer = recorder
+        computer()
+        computer()
+        assert len(recorder) == 2
+
+        recorder.flush()
+        assert (tmp_path / 'trace.bin').stat().st_size == 2 * 9 * 8
+
+
+def test__record__fork(tmp_path):
+    computer = Intcode(3, 0, 99)
+    with Recorder(tmp_path / 'trace.bin', computer.program) as recorder:
+        computer.tracer = recorder
+        computer.reset()
+        with pytest.raises(NotImplementedError):
+            computer.fork()
+        with pytest.raises(NotImplementedError):
+            computer.snapshot()
+
+
+def test__step(record):
+    recorder = record([109, 5, 21101, 3, 4, 5, 4, 10, 99, 0, 0])
+    assert recorder[1] == Step(2, 5, 21101, (3, 4, 5), 10, 7)
+    assert recorder[2] == Step(6, 5, 4, (10,), None, None)
+    assert recorder[-1].decoded.mnemonic == 'EXT'
+
+    with pytest.raises(IndexError):
+        recorder[4]
+
+
+@pytest.mark.parametrize('memory_map', [True, False])
+def test__queries(record, memory_map):
+    # counts mem[20] up to 3, outputting each value:
+    program = [1001, 20, 1, 20, 4, 20, 1007, 20, 3, 21, 1005, 21, 0, 99] + [0] * 8
+    recorder = record(program, memory_map=memory_map)
+
+    assert recorder.writes_to(20) == [0, 4, 8]
+    assert recorder.writes_to(21) == [2, 6, 10]
+    assert recorder.writes_to(0) == []
+    assert recorder.steps_at(4) == [1, 5, 9]
+    assert recorder.steps_at(13) == [12]
+
+
+def test__memory_at(record):
+    program = Intcode.from_file('input_09.txt').program
+    recorder = record(program, 1, checkpoint_interval=7, buffer_records=5)
+
+    for step in [0, 1, 6, 7, 8, 50, 123, len(recorder)]:
+        computer = Intcode(*program)
+        computer.reset()
+        computer.resume(1, max_instructions=step)
+        assert recorder.memory_at(step) == computer.memory, step
+
+    with pytest.raises(IndexError):
+        recorder.memory_at(len(recorder) + 1)
+
+
+def test__big_ints(record):
+    program = [1102, 2 ** 62, 8, 7, 4, 7, 99, 0]
+    recorder = record(program)
+    assert recorder[0] == Step(0, 0, 1102, (2 ** 62, 8, 7), 7, 2 ** 65)
+    assert recorder.writes_to(7) == [0]
+    assert recorder.memory_at(1)[7] == 2 ** 65
@@ -0,0 +1,28 @@
+import itertools
+import pathlib
+
+from intcode_search import run_intcode, search
+from solution_02 import run_with
+
+PROGRAM_02 = [int(c) for c in pathlib.Path('input_02.txt').read_text().split(',')]
+GRID_02 = list(itertools.product(range(100), range(100)))
+
+
+def test__search__first_match():
+    assert search(run_with, PROGRAM_02, GRID_02, 19690720, workers=1) == [(64, 17)]
+
+
+def test__search__first_match__parallel():
+    assert search(run_with, PROGRAM_02, GRID_02, 19690720, workers=2) == [(64, 17)]
+
+
+def test__search__all_matches():
+    program = [3, 9, 8, 9, 10, 9, 4, 9, 99, -1, 8]
+    grid = [(i,) for i in range(20)]
+    assert search(run_intcode, program, grid, [0], first_match=False, workers=2, chunk_size=3) == [
+        (i,) for i in range(20) if i != 8
+    ]
+
+
+def test__search__no_match():
+    assert search(run_with, PROGRAM_02, GRID_02[:50], -1, workers=2) == []
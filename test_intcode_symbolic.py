@@ -0,0 +1,63 @@
+import pathlib
+
+import pytest
+
+from intcode_symbolic import Expression, SymbolicError, SymbolicIntcode, solve, solve_program
+
+PROGRAM_02 = [int(c) for c in pathlib.Path('input_02.txt').read_text().split(',')]
+DOMAINS_02 = {'noun': range(100), 'verb': range(100)}
+
+x = Expression.variable('x')
+y = Expression.variable('y')
+
+
+def test__expression__arithmetic():
+    assert repr(3 * x + y * 2 + 1) == '3 * x + 2 * y + 1'
+    assert repr((x + 1) * (y - 1)) == 'x * y + -1 * x + y + -1'
+    assert (x + 5) - x == 5
+    assert (x + 1) * 0 == 0
+
+
+def test__expression__comparisons():
+    assert x + 1 > x
+    assert x == x + 0
+    assert x != x + 1
+
+    with pytest.raises(SymbolicError):
+        bool(x < y)
+    with pytest.raises(SymbolicError):
+        bool(x)
+
+
+def test__symbolic_intcode__day_2():
+    computer = SymbolicIntcode(*PROGRAM_02)
+    computer.run_symbolic({1: 'noun', 2: 'verb'})
+    assert repr(computer.memory[0]) == '303750 * noun + verb + 250703'
+
+
+def test__symbolic_intcode__symbolic_input():
+    computer = SymbolicIntcode(3, 9, 1002, 9, 3, 9, 4, 9, 99, 0)
+    assert repr(computer.run([x + 2])[0]) == '3 * x + 6'
+
+
+def test__solve__affine():
+    assert solve(3 * x + y, 20, {'x': range(10), 'y': range(10)}) == {'x': 4, 'y': 8}
+    assert solve(3 * x + y, 20, {'y': range(10), 'x': range(10)}) == {'y': 2, 'x': 6}
+    assert solve(2 * x, 5, {'x': range(10)}) is None
+    assert solve(7, 7, {'x': range(3, 10)}) == {'x': 3}
+
+
+def test__solve__polynomial():
+    assert solve(x * y + 1, 13, {'x': range(1, 10), 'y': range(1, 10)}) == {'x': 2, 'y': 6}
+
+
+def test__solve_program__day_2():
+    assert solve_program(PROGRAM_02, {1: 'noun', 2: 'verb'}, DOMAINS_02, 19690720) == {'noun': 64, 'verb': 17}
+    assert solve_program(PROGRAM_02, {1: 'noun', 2: 'verb'}, DOMAINS_02, -1) is None
+
+
+def test__solve_program__falls_back_to_search():
+    # mem[0] = 5 unless mem[1] < mem[2], jumping on a comparison of the variables:
+    program = [1107, 0, 0, 16, 1005, 16, 11, 1101, 0, 5, 0, 1101, 0, 0, 1, 99, 0]
+    assert solve_program(program, {1: 'a', 2: 'b'}, {'a': range(10), 'b': range(10)}, 5) == {'a': 0, 'b': 0}
+    assert solve_program(program, {1: 'a', 2: 'b'}, {'a': range(10), 'b': range(10)}, 1107) == {'a': 0, 'b': 1}